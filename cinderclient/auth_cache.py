@@ -0,0 +1,133 @@
+# Copyright 2012 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+On-disk cache of auth tokens and service catalogs, so that consecutive
+command line invocations can skip authentication.
+"""
+
+import contextlib
+import errno
+import hashlib
+import os
+import tempfile
+import time
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+try:
+    import fcntl
+except ImportError:
+    # NOTE: no advisory locking on this platform; writes are still atomic.
+    fcntl = None
+
+from cinderclient import utils
+
+
+class AuthCache(object):
+    """
+    Stores the token, management URL and raw service catalog of an
+    authenticated session, one file per auth_url/user/tenant/region.
+
+    Files are only readable by their owner, are replaced atomically and
+    are locked while being read or written so that concurrent processes
+    never see a partial entry.
+    """
+
+    def __init__(self, cache_dir=None):
+        if cache_dir is None:
+            cache_dir = utils.env('CINDERCLIENT_AUTH_CACHE_DIR',
+                                  default="~/.cinderclient/auth")
+        self.cache_dir = os.path.expanduser(cache_dir)
+
+    @staticmethod
+    def make_key(*parts):
+        """Build a cache key out of the identity of a session."""
+        return hashlib.sha1('\0'.join(str(p or '') for p in parts)).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def _ensure_dir(self):
+        try:
+            os.makedirs(self.cache_dir, 0700)
+        except OSError, e:
+            if e.errno != errno.EEXIST:
+                raise
+
+    @contextlib.contextmanager
+    def _locked(self, key, exclusive):
+        if fcntl is None:
+            yield
+            return
+
+        lock_file = open(self._path(key) + '.lock', 'a')
+        try:
+            os.chmod(lock_file.name, 0600)
+            fcntl.flock(lock_file,
+                        fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            lock_file.close()
+
+    def get(self, key):
+        """
+        Return the cached entry for ``key``, or None if there is none or
+        its token has expired.
+        """
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with self._locked(key, exclusive=False):
+                with open(path) as f:
+                    data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+
+        expires = data.get('expires')
+        if expires is not None and expires <= time.time():
+            self.delete(key)
+            return None
+        return data
+
+    def set(self, key, data):
+        """Atomically write ``data`` as the entry for ``key``."""
+        self._ensure_dir()
+        with self._locked(key, exclusive=True):
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir,
+                                            prefix='.tmp-')
+            try:
+                # NOTE: mkstemp creates the file with mode 0600 already.
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(data, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.rename(tmp_path, self._path(key))
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+
+    def delete(self, key):
+        """Forget the entry for ``key``."""
+        try:
+            with self._locked(key, exclusive=True):
+                os.unlink(self._path(key))
+        except (IOError, OSError):
+            pass
@@ -19,10 +19,12 @@
 Base utilities to build API operation managers and objects on top of.
 """
 
-import contextlib
-import hashlib
-import os
+import time
+import urllib
+
 from cinderclient import exceptions
+from cinderclient import executor
+from cinderclient import jsonstream
 from cinderclient import utils
 
 
@@ -45,6 +47,33 @@ def getid(obj):
         return obj
 
 
+class BatchResult(object):
+    """
+    Outcome of one item of a batch operation such as
+    :meth:`cinderclient.v1.volumes.VolumeManager.get_many`.
+
+    :param item: the ID or resource the operation was applied to
+    :param result: what the operation returned, if it succeeded
+    :param exception: the exception it raised, if it failed
+    :param elapsed: how long the operation took, in seconds
+    """
+
+    def __init__(self, item, result=None, exception=None, elapsed=None):
+        self.item = item
+        self.result = result
+        self.exception = exception
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.exception is None
+
+    def __repr__(self):
+        if self.ok:
+            return "<BatchResult %s: %r>" % (getid(self.item), self.result)
+        return "<BatchResult %s: %r>" % (getid(self.item), self.exception)
+
+
 class Manager(utils.HookableMixin):
     """
     Managers interact with a particular type of API (servers, flavors, images,
@@ -55,17 +84,53 @@ class Manager(utils.HookableMixin):
     def __init__(self, api):
         self.api = api
 
+    def _resource_type(self, obj_class=None):
+        """
+        The class to build resources with: ``obj_class`` or the manager's
+        ``resource_class``, in its compact variant if the client asked for
+        compact resources.
+        """
+        if obj_class is None:
+            obj_class = self.resource_class
+        if getattr(self.api, 'compact_resources', False):
+            obj_class = obj_class.compact_class()
+        return obj_class
+
     def _list(self, url, response_key, obj_class=None, body=None):
+        obj_class = self._resource_type(obj_class)
+
+        data = self._list_data(url, response_key, body=body)
+        objs = [obj_class(self, res, loaded=True) for res in data if res]
+        self._cache_completions(obj_class, objs, replace=True)
+        return objs
+
+    def _list_table(self, url, response_key, table_class):
+        """
+        Fetch a listing into a :class:`cinderclient.table.ResultTable` in a
+        single pass, without building a resource per item.
+
+        Tables do not update the completion cache.
+        """
+        return table_class(self._list_data(url, response_key))
+
+    def _list_data(self, url, response_key, body=None):
+        """
+        Fetch a listing and return the items under ``response_key``.
+
+        GET responses are decoded lazily: the result is then an iterator
+        that builds each item as it is consumed, rather than the whole
+        document tree at once.
+        """
         resp = None
         if body:
             resp, body = self.api.client.post(url, body=body)
         else:
-            resp, body = self.api.client.get(url)
-
-        if obj_class is None:
-            obj_class = self.resource_class
+            resp, body = self.api.client.get(url, stream=True)
 
-        data = body[response_key]
+        if isinstance(body, basestring):
+            data = jsonstream.load_member(body, response_key)
+        else:
+            data = body[response_key]
         # NOTE(ja): keystone returns values as list as {'values': [ ... ]}
         #           unlike other services which just return the list...
         if isinstance(data, dict):
@@ -73,76 +138,152 @@ class Manager(utils.HookableMixin):
                 data = data['values']
             except KeyError:
                 pass
+        return data
 
-        with self.completion_cache('human_id', obj_class, mode="w"):
-            with self.completion_cache('uuid', obj_class, mode="w"):
-                return [obj_class(self, res, loaded=True)
-                        for res in data if res]
-
-    @contextlib.contextmanager
-    def completion_cache(self, cache_type, obj_class, mode):
+    def _list_iter(self, url, response_key, qparams=None, page_size=1000,
+                   obj_class=None, cache_completions=False):
         """
-        The completion cache store items that can be used for bash
-        autocompletion, like UUIDs or human-friendly IDs.
+        Generator over a collection, fetched ``page_size`` items at a time
+        with ``limit``/``marker`` paging, so that only one page is held in
+        memory at once.
 
-        A resource listing will clear and repopulate the cache.
+        Only an empty page ends the collection. The server may cap
+        ``limit`` below ``page_size`` (osapi_max_limit), so a short page is
+        not the last one.
 
-        A resource create will append to the cache.
+        With ``cache_completions``, the completion cache is replaced once
+        the whole collection has been read; only the IDs are kept until
+        then.
+        """
+        obj_class = self._resource_type(obj_class)
+        completions = None
+        if cache_completions and getattr(self.api, 'completion_cache', None):
+            completions = ([], [])
+
+        qparams = dict(qparams or {})
+        marker = None
+        while True:
+            page_params = dict(qparams, limit=page_size)
+            if marker is not None:
+                page_params['marker'] = marker
+            page = [res for res in
+                    self._list_data("%s?%s" % (url,
+                                               urllib.urlencode(page_params)),
+                                    response_key)
+                    if res]
+
+            # NOTE: a server that does not understand markers hands back
+            # the same page again; stop rather than loop forever.
+            if not page or (marker is not None and
+                            page[-1].get('id') == marker):
+                break
+
+            for res in page:
+                obj = obj_class(self, res, loaded=True)
+                if completions is not None:
+                    self._add_completion_ids(obj, *completions)
+                yield obj
+
+            if 'id' not in page[-1]:
+                break
+            marker = page[-1]['id']
+
+        if completions is not None:
+            self.api.completion_cache.record(obj_class.__name__.lower(),
+                                             *completions, replace=True)
+
+    @staticmethod
+    def _add_completion_ids(obj, uuids, human_ids):
+        obj_id = getattr(obj, 'id', None)
+        if obj_id is not None and len(str(obj_id)) == 36:
+            uuids.append(obj_id)
+        if obj.human_id:
+            human_ids.append(obj.human_id)
+
+    def _cache_completions(self, obj_class, objs, replace):
+        """
+        Record UUIDs and human IDs for bash autocompletion, if the client
+        has a completion cache.
+
+        A resource listing will clear and repopulate the cache. A resource
+        create will append to the cache.
 
         Delete is not handled because listings are assumed to be performed
         often enough to keep the cache reasonably up-to-date.
         """
-        base_dir = utils.env('CINDERCLIENT_UUID_CACHE_DIR',
-                             default="~/.cinderclient")
-
-        # NOTE(sirp): Keep separate UUID caches for each username + endpoint
-        # pair
-        username = utils.env('OS_USERNAME', 'CINDER_USERNAME')
-        url = utils.env('OS_URL', 'CINDER_URL')
-        uniqifier = hashlib.md5(username + url).hexdigest()
+        cache = getattr(self.api, 'completion_cache', None)
+        if cache is None:
+            return
 
-        cache_dir = os.path.expanduser(os.path.join(base_dir, uniqifier))
+        uuids = []
+        human_ids = []
+        for obj in objs:
+            self._add_completion_ids(obj, uuids, human_ids)
+        cache.record(obj_class.__name__.lower(), uuids, human_ids,
+                     replace=replace)
 
-        try:
-            os.makedirs(cache_dir, 0755)
-        except OSError:
-            # NOTE(kiall): This is typicaly either permission denied while
-            #              attempting to create the directory, or the directory
-            #              already exists. Either way, don't fail.
-            pass
+    def write_to_completion_cache(self, cache_type, val):
+        """
+        Append one ``'uuid'`` or ``'human_id'`` value to this manager's
+        completion cache.
 
-        resource = obj_class.__name__.lower()
-        filename = "%s-%s-cache" % (resource, cache_type.replace('_', '-'))
-        path = os.path.join(cache_dir, filename)
+        Kept for callers of the old per-manager cache files; new code goes
+        through the client's
+        :class:`cinderclient.completion_cache.CompletionCache`.
+        """
+        cache = getattr(self.api, 'completion_cache', None)
+        ids = {'uuid': ([val], []), 'human_id': ([], [val])}.get(cache_type)
+        if cache is None or ids is None:
+            return
+        cache.record(self.resource_class.__name__.lower(), *ids,
+                     replace=False)
 
-        cache_attr = "_%s_cache" % cache_type
+    def _run_many(self, fn, items, concurrency=10):
+        """
+        Call ``fn(item)`` for every item on at most ``concurrency`` worker
+        threads. A failing item does not abort the batch; its exception is
+        recorded in its :class:`BatchResult` instead.
 
-        try:
-            setattr(self, cache_attr, open(path, mode))
-        except IOError:
-            # NOTE(kiall): This is typicaly a permission denied while
-            #              attempting to write the cache file.
-            pass
+        :rtype: list of :class:`BatchResult`, in the order of ``items``
+        :raises ValueError: if ``concurrency`` is less than 1
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1, not %r"
+                             % (concurrency,))
+        items = list(items)
+        if not items:
+            return []
 
-        try:
-            yield
-        finally:
-            cache = getattr(self, cache_attr, None)
-            if cache:
-                cache.close()
-                delattr(self, cache_attr)
+        elapsed = [None] * len(items)
 
-    def write_to_completion_cache(self, cache_type, val):
-        cache = getattr(self, "_%s_cache" % cache_type, None)
-        if cache:
-            cache.write("%s\n" % val)
+        def timed(i, item):
+            start = time.time()
+            try:
+                return fn(item)
+            finally:
+                elapsed[i] = time.time() - start
+
+        with executor.Executor(min(concurrency, len(items))) as pool:
+            futures = [pool.submit(timed, i, item)
+                       for i, item in enumerate(items)]
+            results = []
+            for i, (item, future) in enumerate(zip(items, futures)):
+                exc = future.exception()
+                if exc is None:
+                    results.append(BatchResult(item, result=future.result(),
+                                               elapsed=elapsed[i]))
+                else:
+                    results.append(BatchResult(item, exception=exc,
+                                               elapsed=elapsed[i]))
+            return results
 
     def _get(self, url, response_key=None):
         resp, body = self.api.client.get(url)
+        obj_class = self._resource_type()
         if response_key:
-            return self.resource_class(self, body[response_key], loaded=True)
+            return obj_class(self, body[response_key], loaded=True)
         else:
-            return self.resource_class(self, body, loaded=True)
+            return obj_class(self, body, loaded=True)
 
     def _create(self, url, body, response_key, return_raw=False, **kwargs):
         self.run_hooks('modify_body_for_create', body, **kwargs)
@@ -150,9 +291,10 @@ class Manager(utils.HookableMixin):
         if return_raw:
             return body[response_key]
 
-        with self.completion_cache('human_id', self.resource_class, mode="a"):
-            with self.completion_cache('uuid', self.resource_class, mode="a"):
-                return self.resource_class(self, body[response_key])
+        obj_class = self._resource_type()
+        obj = obj_class(self, body[response_key])
+        self._cache_completions(obj_class, [obj], replace=False)
+        return obj
 
     def _delete(self, url):
         resp, body = self.api.client.delete(url)
@@ -163,10 +305,49 @@ class Manager(utils.HookableMixin):
         return body
 
 
+class ResourceIndex(object):
+    """
+    Lookup table over a single listing, by ID and by the attributes that
+    users refer to resources by.
+    """
+    FIELDS = ('id', 'human_id', 'name', 'display_name')
+
+    def __init__(self, resources):
+        self._maps = dict((field, {}) for field in self.FIELDS)
+        for resource in resources:
+            for field in self.FIELDS:
+                value = getattr(resource, field, None)
+                if value is not None:
+                    self._maps[field].setdefault(utils.safe_unicode(value),
+                                                 []).append(resource)
+
+    def lookup(self, field, value):
+        """Return every resource whose ``field`` equals ``value``."""
+        return list(self._maps[field].get(utils.safe_unicode(value), []))
+
+
 class ManagerWithFind(Manager):
     """
     Like a `Manager`, but with additional `find()`/`findall()` methods.
     """
+    # Query parameter the server can filter listings by when looking a
+    # resource up by name, if any.
+    name_filter = None
+
+    def build_index(self, name=None):
+        """
+        Index one listing by id, human_id, name and display_name.
+
+        :param name: the name about to be looked up; when the manager has a
+                     ``name_filter`` only matching resources are listed.
+        :rtype: :class:`ResourceIndex`
+        """
+        if name is not None and self.name_filter:
+            resources = self.list(search_opts={self.name_filter: name})
+        else:
+            resources = self.list()
+        return ResourceIndex(resources)
+
     def find(self, **kwargs):
         """
         Find a single item with attributes matching ``**kwargs``.
@@ -225,25 +406,19 @@ class Resource(object):
         self._add_details(info)
         self._loaded = loaded
 
-        # NOTE(sirp): ensure `id` is already present because if it isn't we'll
-        # enter an infinite loop of __getattr__ -> get -> __init__ ->
-        # __getattr__ -> ...
-        if 'id' in self.__dict__ and len(str(self.id)) == 36:
-            self.manager.write_to_completion_cache('uuid', self.id)
-
-        human_id = self.human_id
-        if human_id:
-            self.manager.write_to_completion_cache('human_id', human_id)
-
     @property
     def human_id(self):
         """Subclasses may override this provide a pretty ID which can be used
         for bash completion.
         """
-        if 'name' in self.__dict__ and self.HUMAN_ID:
+        if 'name' in self._detail_keys() and self.HUMAN_ID:
             return utils.slugify(self.name)
         return None
 
+    def _detail_keys(self):
+        """Names of the attributes already present on this object."""
+        return self.__dict__
+
     def _add_details(self, info):
         for (k, v) in info.iteritems():
             try:
@@ -264,7 +439,7 @@ class Resource(object):
             return self.__dict__[k]
 
     def __repr__(self):
-        reprkeys = sorted(k for k in self.__dict__.keys() if k[0] != '_' and
+        reprkeys = sorted(k for k in self._detail_keys() if k[0] != '_' and
                           k != 'manager')
         info = ", ".join("%s=%s" % (k, getattr(self, k)) for k in reprkeys)
         return "<%s %s>" % (self.__class__.__name__, info)
@@ -280,7 +455,8 @@ class Resource(object):
             self._add_details(new._info)
 
     def __eq__(self, other):
-        if not isinstance(other, self.__class__):
+        # NOTE: compact variants compare like the class they were made from.
+        if not isinstance(other, _compact_base(self.__class__)):
             return False
         if hasattr(self, 'id') and hasattr(other, 'id'):
             return self.id == other.id
@@ -291,3 +467,86 @@ class Resource(object):
 
     def set_loaded(self, val):
         self._loaded = val
+
+    @classmethod
+    def compact_class(cls):
+        """
+        Return a variant of this class that keeps attributes in ``_info``
+        only, instead of copying each of them onto the instance.
+
+        Instances behave the same but take a fraction of the memory, which
+        matters for listings of tens of thousands of resources.
+        """
+        try:
+            return _compact_classes[cls]
+        except KeyError:
+            pass
+        if issubclass(cls, CompactResourceMixin):
+            return cls
+        compact = type(cls.__name__, (CompactResourceMixin, cls),
+                       {'__slots__': CompactResourceMixin.SLOTS,
+                        '__module__': cls.__module__,
+                        '_compact_base': cls})
+        _compact_classes[cls] = compact
+        return compact
+
+
+# Compact variant of each Resource class, built on first use.
+_compact_classes = {}
+
+
+def _compact_base(cls):
+    return getattr(cls, '_compact_base', None) or cls
+
+
+class CompactResourceMixin(object):
+    """
+    Attribute storage for :meth:`Resource.compact_class` variants.
+
+    Attributes are looked up in ``_info`` when they are read; the instance
+    only holds slots for the manager, the dict and the loaded flag, so no
+    per-instance ``__dict__`` is ever allocated. Other attributes assigned
+    later are kept in a small dict of their own, created on first use.
+    """
+    __slots__ = ()
+    SLOTS = ('manager', '_info', '_loaded', '_extra')
+    _compact_base = None
+
+    def __init__(self, manager, info, loaded=False):
+        _setattr = object.__setattr__
+        _setattr(self, 'manager', manager)
+        _setattr(self, '_info', info)
+        _setattr(self, '_loaded', loaded)
+        _setattr(self, '_extra', None)
+
+    def __setattr__(self, k, v):
+        if k in self.SLOTS or hasattr(self.__class__, k):
+            object.__setattr__(self, k, v)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[k] = v
+
+    def _detail_keys(self):
+        if self._extra:
+            return self._info.keys() + self._extra.keys()
+        return self._info
+
+    def _add_details(self, info):
+        merged = dict(self._info)
+        merged.update(info)
+        self._info = merged
+
+    def __getattr__(self, k):
+        if k.startswith('__') or k in self.SLOTS:
+            raise AttributeError(k)
+        if self._extra and k in self._extra:
+            return self._extra[k]
+        try:
+            return self._info[k]
+        except KeyError:
+            #NOTE(bcwaldon): disallow lazy-loading if already loaded once
+            if not self.is_loaded():
+                self.get()
+                return self.__getattr__(k)
+            raise AttributeError(k)
@@ -7,10 +7,13 @@
 OpenStack Client interface. Handles the REST calls and responses.
 """
 
-import httplib2
 import logging
 import os
+import socket
+import threading
+import time
 import urlparse
+import weakref
 
 try:
     import json
@@ -23,7 +26,11 @@ if not hasattr(urlparse, 'parse_qsl'):
     urlparse.parse_qsl = cgi.parse_qsl
 
 from cinderclient import exceptions
+from cinderclient import httplog
+from cinderclient import instrumentation
+from cinderclient import retry
 from cinderclient import service_catalog
+from cinderclient import transport
 from cinderclient import utils
 
 
@@ -34,16 +41,35 @@ if 'CINDERCLIENT_DEBUG' in os.environ and os.environ['CINDERCLIENT_DEBUG']:
     _logger.addHandler(ch)
 
 
-class HTTPClient(httplib2.Http):
+class HTTPClient(object):
 
     USER_AGENT = 'python-cinderclient'
 
+    # NOTE: a cinderclient.retry.RetryPolicy; failed requests are not
+    # retried when there is none.
+    retry_policy = None
+    # NOTE: cinderclient.instrumentation.Listener instances told about
+    # every request; none by default, which costs nothing.
+    listeners = ()
+    # NOTE: an httplog.RequestLog deciding how requests are logged at
+    # DEBUG level; by default credentials are masked and bodies cut to
+    # 4kB.
+    request_log = httplog.RequestLog()
+    # NOTE: a cinderclient.response_cache.ResponseCache; GETs always go to
+    # the server when there is none.
+    response_cache = None
+    # NOTE: a token is never renewed sooner than this many seconds after
+    # it was obtained, whatever token_refresh_margin says.
+    min_token_refresh_delay = 10
+
     def __init__(self, user, password, projectid, auth_url, insecure=False,
                  timeout=None, tenant_id=None, proxy_tenant_id=None,
                  proxy_token=None, region_name=None,
                  endpoint_type='publicURL', service_type=None,
-                 service_name=None, volume_service_name=None):
-        super(HTTPClient, self).__init__(timeout=timeout)
+                 service_name=None, volume_service_name=None,
+                 connection_pool=None, token_refresh_margin=None,
+                 auth_cache=None, rate_limiter=None, retry_policy=None,
+                 listeners=None, request_log=None, response_cache=None):
         self.user = user
         self.password = password
         self.projectid = projectid
@@ -58,34 +84,62 @@ class HTTPClient(httplib2.Http):
 
         self.management_url = None
         self.auth_token = None
+        self.auth_token_expires = None
+        # Refresh the token this many seconds before it expires; None
+        # leaves expiry to be discovered through a 401.
+        self.token_refresh_margin = token_refresh_margin
+        self._refresh_timer = None
+        # (auth_token_expires, time to renew that token or None)
+        self._refresh_at = (None, None)
+
+        self.auth_cache = auth_cache
+        self._auth_cache_key = None
+        if auth_cache:
+            self._auth_cache_key = auth_cache.make_key(
+                self.auth_url, user, projectid or tenant_id, region_name,
+                service_type, service_name, volume_service_name,
+                endpoint_type)
+
         self.proxy_token = proxy_token
         self.proxy_tenant_id = proxy_tenant_id
 
-        # httplib2 overrides
-        self.force_exception_to_status_code = True
-        self.disable_ssl_certificate_validation = insecure
+        # NOTE: a cinderclient.throttle.RateLimiter; requests are sent
+        # as soon as possible when there is none.
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.listeners = list(listeners or [])
+        if request_log is not None:
+            self.request_log = request_log
+        self.response_cache = response_cache
+
+        # NOTE: guards auth_token, management_url and service_catalog,
+        # which are shared by every thread using this client.
+        self._auth_lock = threading.RLock()
+
+        self.timeout = timeout
+        self.insecure = insecure
+        self.follow_all_redirects = False
+        # NOTE: connections are shared with every other client using the
+        # same pool, which by default is the process-wide one.
+        self.connection_pool = (connection_pool or
+                                transport.get_default_pool())
 
     def http_log(self, args, kwargs, resp, body):
         if not _logger.isEnabledFor(logging.DEBUG):
             return
-
-        string_parts = ['curl -i']
-        for element in args:
-            if element in ('GET', 'POST'):
-                string_parts.append(' -X %s' % element)
-            else:
-                string_parts.append(' %s' % element)
-
-        for element in kwargs['headers']:
-            header = ' -H "%s: %s"' % (element, kwargs['headers'][element])
-            string_parts.append(header)
-
-        _logger.debug("REQ: %s\n" % "".join(string_parts))
-        if 'body' in kwargs:
-            _logger.debug("REQ BODY: %s\n" % (kwargs['body']))
-        _logger.debug("RESP:%s %s\n", resp, body)
+        self.request_log.log(_logger, args, kwargs, resp, body)
 
     def request(self, *args, **kwargs):
+        """
+        Send a request and decode its JSON response body.
+
+        With ``stream=True`` a successful response body is returned as raw
+        JSON text for the caller to decode incrementally, e.g. with
+        :func:`cinderclient.jsonstream.load_member`.
+        """
+        follow_all_redirects = kwargs.pop('follow_all_redirects',
+                                          self.follow_all_redirects)
+        stream = kwargs.pop('stream', False)
         kwargs.setdefault('headers', kwargs.get('headers', {}))
         kwargs['headers']['User-Agent'] = self.USER_AGENT
         kwargs['headers']['Accept'] = 'application/json'
@@ -93,10 +147,27 @@ class HTTPClient(httplib2.Http):
             kwargs['headers']['Content-Type'] = 'application/json'
             kwargs['body'] = json.dumps(kwargs['body'])
 
-        resp, body = super(HTTPClient, self).request(*args, **kwargs)
+        try:
+            if self.listeners:
+                resp, body = self._instrumented_send(args, kwargs,
+                                                     follow_all_redirects)
+            else:
+                with self.connection_pool.connection(
+                        args[0], timeout=self.timeout,
+                        insecure=self.insecure) as http:
+                    http.follow_all_redirects = follow_all_redirects
+                    resp, body = http.request(*args, **kwargs)
+        except Exception, e:
+            if not transport.is_connection_error(e):
+                raise
+            code = 408 if isinstance(e, socket.timeout) else 400
+            raise exceptions.ConnectionError(code, str(e) or None, reason=e)
 
         self.http_log(args, kwargs, resp, body)
 
+        if stream and resp.status < 400:
+            return resp, body or None
+
         if body:
             try:
                 body = json.loads(body)
@@ -110,41 +181,181 @@ class HTTPClient(httplib2.Http):
 
         return resp, body
 
+    def add_listener(self, listener):
+        """Tell ``listener``, a :class:`instrumentation.Listener`, about
+        every request made from now on."""
+        self.listeners = self.listeners + [listener]
+
+    def remove_listener(self, listener):
+        self.listeners = [l for l in self.listeners if l is not listener]
+
+    def _instrumented_send(self, args, kwargs, follow_all_redirects):
+        url, method = args[0], args[1]
+        event = instrumentation.RequestEvent(
+            method, url, instrumentation.template_url(url,
+                                                      self.management_url),
+            bytes_out=len(kwargs.get('body') or ''),
+            retry=retry.current_attempt())
+        listeners = self.listeners
+        instrumentation.notify(listeners, 'before_request', event)
+
+        start = time.time()
+        try:
+            with self.connection_pool.connection(
+                    url, timeout=self.timeout,
+                    insecure=self.insecure) as http:
+                event.timings['connection'] = time.time() - start
+                event.connection_reused = bool(
+                    getattr(http, 'connections', None))
+                http.follow_all_redirects = follow_all_redirects
+                resp, body = http.request(*args, **kwargs)
+        except Exception, e:
+            event.error = e
+            raise
+        else:
+            event.status = resp.status
+            event.bytes_in = len(body or '')
+            event.request_id = resp.get('x-compute-request-id')
+            return resp, body
+        finally:
+            event.timings['total'] = time.time() - start
+            instrumentation.notify(listeners, 'after_request', event)
+
+    def _get_auth_state(self):
+        """Return a consistent (auth_token, management_url) pair,
+        authenticating first if that has not happened yet."""
+        with self._auth_lock:
+            if not self.management_url or self._token_expiring():
+                self.authenticate()
+            return self.auth_token, self.management_url
+
+    def _token_expiring(self):
+        if self.token_refresh_margin is None or not self.auth_token_expires:
+            return False
+        expires, refresh_at = self._refresh_at
+        if expires != self.auth_token_expires:
+            refresh_at = self.auth_token_expires - self.token_refresh_margin
+        return refresh_at is not None and time.time() >= refresh_at
+
+    def _schedule_token_refresh(self):
+        """Arrange for the token to be renewed in the background shortly
+        before it expires, so requests never have to wait on a 401."""
+        if self._refresh_timer:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+
+        if self.token_refresh_margin is None or not self.auth_token_expires:
+            return
+
+        now = time.time()
+        lifetime = self.auth_token_expires - now
+        if lifetime <= self.token_refresh_margin:
+            # NOTE: the new token is already inside the margin, which is
+            #       longer than its lifetime or our clock is off. Renewing
+            #       it early would only bring another such token, so leave
+            #       it to the 401 once it has expired.
+            self._refresh_at = (self.auth_token_expires, None)
+            return
+
+        delay = max(lifetime - self.token_refresh_margin,
+                    self.min_token_refresh_delay)
+        self._refresh_at = (self.auth_token_expires, now + delay)
+        # NOTE: only hold a weak reference so that a pending refresh does
+        # not keep an otherwise unused client alive.
+        self._refresh_timer = threading.Timer(delay, _background_refresh,
+                                              [weakref.ref(self)])
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _reauthenticate(self, stale_token):
+        """Replace an expired token, single-flight across threads.
+
+        Threads that fail with the same stale token queue up on the auth
+        lock; only the first one actually authenticates, the others find a
+        fresh token already in place and reuse it.
+        """
+        with self._auth_lock:
+            if self.auth_token == stale_token:
+                if self.auth_cache:
+                    self.auth_cache.delete(self._auth_cache_key)
+                self.authenticate()
+            return self.auth_token, self.management_url
+
     def _cs_request(self, url, method, **kwargs):
-        if not self.management_url:
-            self.authenticate()
+        auth_token, management_url = self._get_auth_state()
+        if self.rate_limiter:
+            self.rate_limiter.wait(method, url)
 
         # Perform the request once. If we get a 401 back then it
         # might be because the auth token expired, so try to
         # re-authenticate and try again. If it still fails, bail.
         try:
-            kwargs.setdefault('headers', {})['X-Auth-Token'] = self.auth_token
-            if self.projectid:
-                kwargs['headers']['X-Auth-Project-Id'] = self.projectid
-
-            resp, body = self.request(self.management_url + url, method,
-                                      **kwargs)
-            return resp, body
+            return self._cs_request_with_token(url, method, auth_token,
+                                               management_url, **kwargs)
         except exceptions.Unauthorized, ex:
             try:
-                self.authenticate()
-                resp, body = self.request(self.management_url + url, method,
-                                          **kwargs)
-                return resp, body
+                auth_token, management_url = self._reauthenticate(auth_token)
+                return self._cs_request_with_token(url, method, auth_token,
+                                                   management_url, **kwargs)
             except exceptions.Unauthorized:
                 raise ex
+        except exceptions.OverLimit:
+            # NOTE: our idea of the limits is off; fetch them again before
+            #       the next request.
+            if self.rate_limiter:
+                self.rate_limiter.invalidate()
+            raise
+
+    def _cs_request_with_token(self, url, method, auth_token, management_url,
+                               **kwargs):
+        kwargs['headers'] = dict(kwargs.get('headers') or {})
+        kwargs['headers']['X-Auth-Token'] = auth_token
+        if self.projectid:
+            kwargs['headers']['X-Auth-Project-Id'] = self.projectid
+
+        return self.request(management_url + url, method, **kwargs)
+
+    def _retried_request(self, url, method, **kwargs):
+        if self.retry_policy is None:
+            return self._cs_request(url, method, **kwargs)
+        return self.retry_policy.call(self._cs_request, url, method, **kwargs)
+
+    def _cache_scope(self):
+        """Who is asking: cached responses are only shared between
+        requests made with the same credentials to the same endpoint."""
+        management_url = getattr(self, 'management_url', None)
+        if not management_url:
+            # NOTE: the endpoint is only known once authenticated, and
+            #       clients differing in region alone must not share.
+            management_url = self._get_auth_state()[1]
+        return (getattr(self, 'auth_url', None),
+                getattr(self, 'region_name', None),
+                management_url,
+                getattr(self, 'user', None),
+                getattr(self, 'projectid', None),
+                getattr(self, 'tenant_id', None))
+
+    def _write_request(self, url, method, **kwargs):
+        try:
+            return self._retried_request(url, method, **kwargs)
+        finally:
+            if self.response_cache is not None:
+                self.response_cache.invalidate(url)
 
     def get(self, url, **kwargs):
-        return self._cs_request(url, 'GET', **kwargs)
+        if self.response_cache is None:
+            return self._retried_request(url, 'GET', **kwargs)
+        return self.response_cache.get(self._cache_scope(), url,
+                                       self._retried_request, **kwargs)
 
     def post(self, url, **kwargs):
-        return self._cs_request(url, 'POST', **kwargs)
+        return self._write_request(url, 'POST', **kwargs)
 
     def put(self, url, **kwargs):
-        return self._cs_request(url, 'PUT', **kwargs)
+        return self._write_request(url, 'PUT', **kwargs)
 
     def delete(self, url, **kwargs):
-        return self._cs_request(url, 'DELETE', **kwargs)
+        return self._write_request(url, 'DELETE', **kwargs)
 
     def _extract_service_catalog(self, url, resp, body, extract_token=True):
         """See what the auth service told us and process the response.
@@ -159,6 +370,8 @@ class HTTPClient(httplib2.Http):
 
                 if extract_token:
                     self.auth_token = self.service_catalog.get_token()
+                    self.auth_token_expires = \
+                        self.service_catalog.get_token_expiry()
 
                 management_url = self.service_catalog.url_for(
                     attr='region',
@@ -206,6 +419,48 @@ class HTTPClient(httplib2.Http):
                                              extract_token=False)
 
     def authenticate(self):
+        # NOTE: hold the auth lock so that no other thread observes a
+        # half-updated token/endpoint pair.
+        with self._auth_lock:
+            if not self._load_auth_cache():
+                self._authenticate_and_extract()
+                self._save_auth_cache()
+            self._schedule_token_refresh()
+
+    def _load_auth_cache(self):
+        """Restore a previously cached session. Returns True on success."""
+        if not self.auth_cache:
+            return False
+
+        data = self.auth_cache.get(self._auth_cache_key)
+        if not data:
+            return False
+
+        self.auth_token = data['auth_token']
+        self.auth_token_expires = data['expires']
+        self.management_url = data['management_url']
+        self.auth_url = data['auth_url']
+        if data['catalog'] is not None:
+            self.service_catalog = \
+                service_catalog.ServiceCatalog(data['catalog'])
+
+        # NOTE: a token about to expire is not worth restoring.
+        return not self._token_expiring()
+
+    def _save_auth_cache(self):
+        if not self.auth_cache:
+            return
+
+        catalog = getattr(self, 'service_catalog', None)
+        self.auth_cache.set(self._auth_cache_key, {
+            'auth_token': self.auth_token,
+            'expires': self.auth_token_expires,
+            'management_url': self.management_url,
+            'auth_url': self.auth_url,
+            'catalog': catalog.catalog if catalog else None,
+        })
+
+    def _authenticate_and_extract(self):
         magic_tuple = urlparse.urlsplit(self.auth_url)
         scheme, netloc, path, query, frag = magic_tuple
         port = magic_tuple.port
@@ -240,6 +495,7 @@ class HTTPClient(httplib2.Http):
                 # with the endpoints any more, we need to replace
                 # our service account token with the user token.
                 self.auth_token = self.proxy_token
+                self.auth_token_expires = None
         else:
             try:
                 while auth_url:
@@ -267,6 +523,7 @@ class HTTPClient(httplib2.Http):
                 mgmt_header = 'x-server-management-url'
                 self.management_url = resp[mgmt_header].rstrip('/')
                 self.auth_token = resp['x-auth-token']
+                self.auth_token_expires = None
                 self.auth_url = url
             except KeyError:
                 raise exceptions.AuthorizationFailure()
@@ -303,17 +560,24 @@ class HTTPClient(httplib2.Http):
         token_url = url + "/tokens"
 
         # Make sure we follow redirects when trying to reach Keystone
-        tmp_follow_all_redirects = self.follow_all_redirects
-        self.follow_all_redirects = True
-
-        try:
-            resp, body = self.request(token_url, "POST", body=body)
-        finally:
-            self.follow_all_redirects = tmp_follow_all_redirects
+        resp, body = self.request(token_url, "POST", body=body,
+                                  follow_all_redirects=True)
 
         return self._extract_service_catalog(url, resp, body)
 
 
+def _background_refresh(client_ref):
+    client = client_ref()
+    if client is None:
+        return
+    try:
+        client.authenticate()
+    except Exception:
+        # NOTE: the next request will refresh the token itself or fall
+        # back to re-authenticating on a 401.
+        _logger.debug("Background token refresh failed", exc_info=True)
+
+
 def get_client_class(version):
     version_map = {
         '1': 'cinderclient.v1.client.Client',
@@ -0,0 +1,128 @@
+# Copyright 2012 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+IDs and human-friendly names of resources, kept on disk for bash completion.
+"""
+
+import errno
+import hashlib
+import os
+import tempfile
+
+from cinderclient import utils
+
+
+class CompletionCache(object):
+    """
+    Stores the UUIDs and human IDs seen in listings and creates, one file per
+    resource type and kind of ID, e.g. ``volume-uuid-cache``.
+
+    A listing replaces the files and a create appends to them. Each update
+    writes a whole file at once and renames it into place, so readers never
+    see a partial file.
+
+    Failures to write are ignored: the cache is only a convenience.
+
+    :param base_dir: where to keep the cache, by default
+                     env[CINDERCLIENT_UUID_CACHE_DIR] or ~/.cinderclient
+    :param username: user the cache belongs to, by default env[OS_USERNAME]
+    :param url: endpoint the cache belongs to, by default env[OS_URL]
+    """
+
+    def __init__(self, base_dir=None, username=None, url=None):
+        self.base_dir = base_dir
+        self.username = username
+        self.url = url
+        self._cache_dir = None
+
+    @property
+    def cache_dir(self):
+        if self._cache_dir is None:
+            base_dir = self.base_dir or utils.env(
+                'CINDERCLIENT_UUID_CACHE_DIR', default="~/.cinderclient")
+            # NOTE(sirp): Keep separate UUID caches for each username +
+            # endpoint pair
+            username = self.username or utils.env('OS_USERNAME',
+                                                  'CINDER_USERNAME')
+            url = self.url or utils.env('OS_URL', 'CINDER_URL')
+            uniqifier = hashlib.md5(username + url).hexdigest()
+            self._cache_dir = os.path.expanduser(os.path.join(base_dir,
+                                                              uniqifier))
+        return self._cache_dir
+
+    def path(self, resource_name, cache_type):
+        filename = "%s-%s-cache" % (resource_name,
+                                    cache_type.replace('_', '-'))
+        return os.path.join(self.cache_dir, filename)
+
+    def record(self, resource_name, uuids, human_ids, replace=True):
+        """
+        Save the IDs of ``resource_name`` resources.
+
+        :param replace: True to drop what was cached before, as after a
+                        full listing; False to add to it, as after a create.
+        """
+        try:
+            os.makedirs(self.cache_dir, 0755)
+        except OSError, e:
+            if e.errno != errno.EEXIST:
+                # NOTE(kiall): This is typicaly a permission denied while
+                #              attempting to create the directory. Don't fail.
+                return
+
+        self._write(self.path(resource_name, 'uuid'), uuids, replace)
+        self._write(self.path(resource_name, 'human_id'), human_ids, replace)
+
+    def _write(self, path, values, replace):
+        if not values and not replace:
+            return
+
+        lines = []
+        if not replace:
+            try:
+                with open(path) as f:
+                    lines = f.read().splitlines()
+            except IOError:
+                pass
+        for value in values:
+            if isinstance(value, unicode):
+                value = value.encode('utf-8')
+            lines.append(str(value))
+
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path),
+                                            prefix='.tmp-')
+        except (IOError, OSError):
+            return
+        try:
+            with os.fdopen(fd, 'w') as f:
+                if lines:
+                    f.write('\n'.join(lines) + '\n')
+            os.chmod(tmp_path, 0644)
+            os.rename(tmp_path, path)
+        except (IOError, OSError):
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def load(self, resource_name, cache_type):
+        """Return the cached IDs of one kind, or an empty list."""
+        try:
+            with open(self.path(resource_name, cache_type)) as f:
+                return f.read().splitlines()
+        except IOError:
+            return []
@@ -3,6 +3,8 @@
 Exception definitions.
 """
 
+import time
+
 
 class UnsupportedVersion(Exception):
     """Indicates that the user is trying to use an unsupported
@@ -42,15 +44,56 @@ class AmbiguousEndpoints(Exception):
         return "AmbiguousEndpoints: %s" % repr(self.endpoints)
 
 
+class WaitTimeout(Exception):
+    """Resources did not reach a final status before the deadline."""
+    def __init__(self, pending=None):
+        self.pending = pending or []
+
+    def __str__(self):
+        return "Timed out waiting for %d resource(s) to settle" % \
+            len(self.pending)
+
+
+class ResourceInErrorState(Exception):
+    """A resource that was waited for settled in an error status."""
+    def __init__(self, resource=None, status=None):
+        self.resource = resource
+        self.status = status
+
+    def __str__(self):
+        return "%s is in status %s" % (getattr(self.resource, 'id',
+                                                self.resource), self.status)
+
+
+class QuotaExceeded(Exception):
+    """A batch would need more volumes or gigabytes than the quota has
+    left; nothing was created."""
+    def __init__(self, requested=None, available=None):
+        # Both map 'volumes' and 'gigabytes' to a count.
+        self.requested = requested or {}
+        self.available = available or {}
+
+    def __str__(self):
+        short = ["%s: %s requested, %s available" %
+                 (key, self.requested[key], self.available[key])
+                 for key in sorted(self.requested)
+                 if key in self.available and
+                 self.requested[key] > self.available[key]]
+        return "Quota exceeded (%s)" % "; ".join(short)
+
+
 class ClientException(Exception):
     """
     The base exception class for all exceptions this library raises.
     """
-    def __init__(self, code, message=None, details=None, request_id=None):
+    def __init__(self, code, message=None, details=None, request_id=None,
+                 retry_after=None):
         self.code = code
         self.message = message or self.__class__.message
         self.details = details
         self.request_id = request_id
+        # Seconds the server asked us to wait before trying again, if any.
+        self.retry_after = retry_after
 
     def __str__(self):
         formatted_string = "%s (HTTP %s)" % (self.message, self.code)
@@ -60,6 +103,20 @@ class ClientException(Exception):
         return formatted_string
 
 
+class ConnectionError(ClientException):
+    """
+    The request could not be sent or its response read: the connection
+    was refused, reset or timed out. ``code`` is 408 for a timeout and 400
+    otherwise, as httplib2 reported them, and ``reason`` the original
+    exception.
+    """
+    message = "Connection error"
+
+    def __init__(self, code, message=None, reason=None, **kwargs):
+        super(ConnectionError, self).__init__(code, message, **kwargs)
+        self.reason = reason
+
+
 class BadRequest(ClientException):
     """
     HTTP 400 - Bad request: you sent some malformed data.
@@ -134,6 +191,7 @@ def from_response(response, body):
     """
     cls = _code_map.get(response.status, ClientException)
     request_id = response.get('x-compute-request-id')
+    retry_after = _parse_retry_after(response.get('retry-after'))
     if body:
         message = "n/a"
         details = "n/a"
@@ -141,7 +199,30 @@ def from_response(response, body):
             error = body[body.keys()[0]]
             message = error.get('message', None)
             details = error.get('details', None)
+            if retry_after is None:
+                retry_after = _parse_retry_after(error.get('retryAfter'))
         return cls(code=response.status, message=message, details=details,
-                   request_id=request_id)
+                   request_id=request_id, retry_after=retry_after)
     else:
-        return cls(code=response.status, request_id=request_id)
+        return cls(code=response.status, request_id=request_id,
+                   retry_after=retry_after)
+
+
+def _parse_retry_after(value):
+    """
+    Seconds to wait from a Retry-After value, given either as a number of
+    seconds or as an HTTP date; None if there is no usable value.
+    """
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0)
+    except (TypeError, ValueError):
+        pass
+    # NOTE: the email package is slow to import and only needed for the
+    #       rare Retry-After given as a date.
+    import email.utils
+    date = email.utils.parsedate_tz(str(value))
+    if date is None:
+        return None
+    return max(email.utils.mktime_tz(date) - time.time(), 0)
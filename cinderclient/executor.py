@@ -0,0 +1,154 @@
+# Copyright 2012 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+A small bounded thread pool returning futures, used to run API calls
+concurrently.
+"""
+
+import Queue
+import sys
+import threading
+
+
+class Future(object):
+    """The eventual result of a call submitted to an :class:`Executor`."""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._result = None
+        self._exc_info = None
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def done(self):
+        return self._done.isSet()
+
+    def result(self, timeout=None):
+        """
+        Wait for the call to finish and return its result, re-raising its
+        exception if it failed.
+        """
+        self._wait(timeout)
+        if self._exc_info:
+            raise self._exc_info[0], self._exc_info[1], self._exc_info[2]
+        return self._result
+
+    def exception(self, timeout=None):
+        """Wait for the call to finish and return its exception, if any."""
+        self._wait(timeout)
+        if self._exc_info:
+            return self._exc_info[1]
+        return None
+
+    def add_done_callback(self, fn):
+        """Call ``fn(future)`` once the call has finished."""
+        with self._lock:
+            if not self.done():
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    def _wait(self, timeout):
+        self._done.wait(timeout)
+        if not self.done():
+            raise RuntimeError("Timed out waiting for result")
+
+    def _finish(self, result=None, exc_info=None):
+        with self._lock:
+            self._result = result
+            self._exc_info = exc_info
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            fn(self)
+
+
+class Executor(object):
+    """
+    Runs callables on at most ``max_workers`` threads.
+
+    Worker threads are started on demand and are daemonic, so an executor
+    that is never shut down does not keep the process alive.
+    """
+
+    def __init__(self, max_workers=10):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self._queue = Queue.Queue()
+        self._workers = []
+        self._idle = 0
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedule ``fn(*args, **kwargs)`` and return its :class:`Future`."""
+        future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("Cannot submit to a shut down executor")
+            self._queue.put((future, fn, args, kwargs))
+            if self._idle > 0:
+                self._idle -= 1
+            elif len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._work)
+                worker.daemon = True
+                self._workers.append(worker)
+                worker.start()
+        return future
+
+    def map(self, fn, iterable):
+        """Like the builtin map, but calls run concurrently. Results are
+        returned in order; the first failure is re-raised."""
+        futures = [self.submit(fn, item) for item in iterable]
+        return [future.result() for future in futures]
+
+    def shutdown(self, wait=True):
+        """Stop accepting work and let the workers exit once the queue is
+        drained."""
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            workers = list(self._workers)
+        for _worker in workers:
+            self._queue.put(None)
+        if wait:
+            for worker in workers:
+                worker.join()
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            future, fn, args, kwargs = item
+            try:
+                result = fn(*args, **kwargs)
+            except Exception:
+                future._finish(exc_info=sys.exc_info())
+            else:
+                future._finish(result=result)
+
+            with self._lock:
+                self._idle += 1
@@ -13,27 +13,214 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import errno
+import imp
+import os
+import sys
+import tempfile
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
 from cinderclient import base
 from cinderclient import utils
 
 
 class Extension(utils.HookableMixin):
-    """Extension descriptor."""
+    """
+    Extension descriptor.
+
+    Either wraps an imported ``module``, or is built from the summary an
+    :class:`ExtensionIndex` keeps of it, in which case the module is only
+    imported once one of its commands, hooks or its manager is needed.
+    """
 
     SUPPORTED_HOOKS = ('__pre_parse_args__', '__post_parse_args__')
 
-    def __init__(self, name, module):
+    def __init__(self, name, module=None, kind=None, location=None,
+                 summary=None):
         self.name = name
-        self.module = module
+        self.kind = kind
+        self.location = location
+        self._module = None
+        self._manager_class = None
+        self._summary = summary
+        if module is not None:
+            self._set_module(module)
+
+    @property
+    def module(self):
+        if self._module is None:
+            self._set_module(load_module(self.kind, self.name, self.location))
+        return self._module
+
+    def _set_module(self, module):
+        self._module = module
         self._parse_extension_module()
+        self._summary = None
 
     def _parse_extension_module(self):
-        self.manager_class = None
+        self._manager_class = None
         for attr_name, attr_value in self.module.__dict__.items():
             if attr_name in self.SUPPORTED_HOOKS:
                 self.add_hook(attr_name, attr_value)
             elif utils.safe_issubclass(attr_value, base.Manager):
-                self.manager_class = attr_value
+                self._manager_class = attr_value
+
+    @property
+    def manager_class(self):
+        if self._summary is not None and not self._summary['manager']:
+            return None
+        # NOTE: importing the module finds its manager class.
+        self.module
+        return self._manager_class
+
+    @property
+    def has_manager(self):
+        if self._summary is not None:
+            return self._summary['manager']
+        return self._manager_class is not None
+
+    @property
+    def commands(self):
+        """Names of the ``do_*`` functions the extension provides."""
+        if self._summary is not None:
+            return self._summary['commands']
+        return [a for a in dir(self.module) if a.startswith('do_')]
+
+    def summary(self):
+        """What :class:`ExtensionIndex` remembers about the module."""
+        if self._summary is not None:
+            return self._summary
+        return {'hooks': [h for h in self.SUPPORTED_HOOKS
+                          if h in self.module.__dict__],
+                'commands': self.commands,
+                'manager': self.has_manager}
+
+    def run_hooks(self, hook_type, *args, **kwargs):
+        if self._summary is not None and hook_type in self._summary['hooks']:
+            # NOTE: importing the module registers its hooks.
+            self.module
+        super(Extension, self).run_hooks(hook_type, *args, **kwargs)
 
     def __repr__(self):
         return "<Extension '%s'>" % self.name
+
+
+def load_module(kind, name, location):
+    """
+    Import extension module ``name``: from directory ``location`` for
+    extensions found on sys.path, or from package ``location`` for contrib
+    extensions.
+    """
+    if kind == 'contrib':
+        module_name = '%s.%s' % (location, name)
+        __import__(module_name)
+        return sys.modules[module_name]
+
+    if name in sys.modules:
+        return sys.modules[name]
+    fp, path, description = imp.find_module(name, [location])
+    try:
+        return imp.load_module(name, fp, path, description)
+    finally:
+        if fp:
+            fp.close()
+
+
+class ExtensionIndex(object):
+    """
+    Persisted result of extension discovery for one API version.
+
+    Scanning every sys.path entry for extensions is slow with many packages
+    installed, so the extensions found are recorded together with the
+    modification times of the directories that were searched and of the
+    extension files themselves. While none of them change, the recorded
+    extensions are used as is.
+
+    :param path: file to keep the index in, by default
+                 ``extensions-<version>.json`` in
+                 env[CINDERCLIENT_EXTENSION_CACHE_DIR] or ~/.cinderclient
+    """
+
+    def __init__(self, version, path=None):
+        if path is None:
+            cache_dir = utils.env('CINDERCLIENT_EXTENSION_CACHE_DIR',
+                                  default="~/.cinderclient")
+            path = os.path.join(os.path.expanduser(cache_dir),
+                                'extensions-%s.json' % version)
+        self.path = path
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
+
+    def _fingerprint(self, dirs, files):
+        return ([[d, self._mtime(d)] for d in dirs] +
+                [[f, self._mtime(f)] for f in files])
+
+    def load(self, dirs):
+        """
+        Return the recorded extensions as lazily imported
+        :class:`Extension` objects, or None if ``dirs`` or any extension
+        changed since the index was saved.
+        """
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (IOError, ValueError):
+            return None
+
+        try:
+            entries = data['extensions']
+            files = [entry['file'] for entry in entries]
+            if data['fingerprint'] != self._fingerprint(dirs, files):
+                return None
+            return [Extension(entry['name'], kind=entry['kind'],
+                              location=entry['location'],
+                              summary=entry['summary'])
+                    for entry in entries]
+        except (KeyError, TypeError):
+            return None
+
+    def save(self, dirs, extensions):
+        """Record ``extensions``, as found by searching ``dirs``."""
+        entries = []
+        for extension in extensions:
+            filename = getattr(extension.module, '__file__', None)
+            if not extension.kind or not filename:
+                # NOTE: can't reload what we don't know how to find again.
+                return
+            entries.append({'name': extension.name,
+                            'kind': extension.kind,
+                            'location': extension.location,
+                            'file': filename,
+                            'summary': extension.summary()})
+        data = {'fingerprint': self._fingerprint(
+                    dirs, [entry['file'] for entry in entries]),
+                'extensions': entries}
+
+        cache_dir = os.path.dirname(self.path)
+        try:
+            os.makedirs(cache_dir, 0755)
+        except OSError, e:
+            if e.errno != errno.EEXIST:
+                return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix='.tmp-')
+        except (IOError, OSError):
+            return
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.rename(tmp_path, self.path)
+        except (IOError, OSError):
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
@@ -0,0 +1,193 @@
+# Copyright 2012 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Streaming output of listings: rows are written as they are produced, in
+constant memory, as newline-delimited JSON, CSV or a fixed-width table.
+"""
+
+import csv
+import heapq
+import itertools
+import tempfile
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+
+def _unicode(value):
+    if value is None:
+        return u''
+    if isinstance(value, str):
+        return value.decode('utf-8', 'replace')
+    return unicode(value)
+
+
+def _text(value):
+    return _unicode(value).encode('utf-8')
+
+
+class JSONFormatter(object):
+    """One JSON object per line, keyed by field name."""
+
+    def __init__(self, fields, stream):
+        self.fields = fields
+        self.stream = stream
+
+    def write(self, rows):
+        for row in rows:
+            self.stream.write(json.dumps(dict(zip(self.fields, row)),
+                                         default=str))
+            self.stream.write('\n')
+
+
+class CSVFormatter(object):
+    """A header line, then one CSV line per row."""
+
+    def __init__(self, fields, stream):
+        self.fields = fields
+        self.writer = csv.writer(stream)
+
+    def write(self, rows):
+        self.writer.writerow(self.fields)
+        for row in rows:
+            self.writer.writerow([_text(value) for value in row])
+
+
+class TableFormatter(object):
+    """
+    A bordered table like the one prettytable draws, but printed row by
+    row.
+
+    Column widths are given, or computed from the headers and the first
+    ``sample_size`` rows; they never exceed ``max_width``. Longer values
+    are cut short and end in ``...``.
+    """
+
+    def __init__(self, fields, stream, widths=None, sample_size=100,
+                 max_width=60):
+        self.fields = fields
+        self.stream = stream
+        self.widths = widths
+        self.sample_size = sample_size
+        self.max_width = max_width
+
+    def _cell(self, value, width):
+        # NOTE: pad and cut characters rather than UTF-8 bytes.
+        text = _unicode(value).replace(u'\n', u' ')
+        if len(text) > width:
+            text = text[:max(width - 3, 0)] + u'...'[:width]
+        return text.ljust(width)
+
+    def _line(self, values, widths):
+        cells = [self._cell(value, width)
+                 for value, width in zip(values, widths)]
+        return (u'| %s |\n' % u' | '.join(cells)).encode('utf-8')
+
+    def write(self, rows):
+        rows = iter(rows)
+        sample = []
+        widths = self.widths
+        if widths is None:
+            sample = list(itertools.islice(rows, self.sample_size))
+            widths = [len(field) for field in self.fields]
+            for row in sample:
+                widths = [max(width, len(_unicode(value)))
+                          for width, value in zip(widths, row)]
+            widths = [min(width, self.max_width) for width in widths]
+
+        border = '+%s+\n' % '+'.join('-' * (width + 2) for width in widths)
+        self.stream.write(border)
+        self.stream.write(self._line(self.fields, widths))
+        self.stream.write(border)
+        for row in itertools.chain(sample, rows):
+            self.stream.write(self._line(row, widths))
+        self.stream.write(border)
+
+
+FORMATTERS = {
+    'json': JSONFormatter,
+    'csv': CSVFormatter,
+    'fixed': TableFormatter,
+}
+
+
+def _spill(chunk):
+    tmp = tempfile.TemporaryFile()
+    for item in chunk:
+        pickle.dump(item, tmp, pickle.HIGHEST_PROTOCOL)
+    tmp.seek(0)
+    return tmp
+
+
+def _unspill(tmp):
+    try:
+        while True:
+            try:
+                yield pickle.load(tmp)
+            except EOFError:
+                return
+    finally:
+        tmp.close()
+
+
+def sorted_rows(rows, key=0, chunk_size=10000):
+    """
+    Sort ``rows`` by column ``key`` without holding more than
+    ``chunk_size`` of them in memory.
+
+    Rows are sorted in chunks that are spilled to temporary files, then
+    merged back as they are read. Input that fits in one chunk is sorted in
+    memory.
+    """
+    spilled = []
+    counter = itertools.count()
+    rows = iter(rows)
+    while True:
+        # NOTE: the counter keeps the sort stable and stops ties from
+        #       comparing whole rows.
+        chunk = sorted((row[key], next(counter), row)
+                       for row in itertools.islice(rows, chunk_size))
+        if len(chunk) < chunk_size and not spilled:
+            return (row for _key, _n, row in chunk)
+        if chunk:
+            spilled.append(_spill(chunk))
+        if len(chunk) < chunk_size:
+            break
+    return (row for _key, _n, row in
+            heapq.merge(*[_unspill(tmp) for tmp in spilled]))
+
+
+def write(rows, fields, output_format, stream, sort=False, **kwargs):
+    """
+    Write ``rows``, sequences of values in the order of ``fields``, to
+    ``stream`` in ``output_format`` ('json', 'csv' or 'fixed').
+
+    :param sort: sort the rows by their first column first.
+    """
+    try:
+        formatter_class = FORMATTERS[output_format]
+    except KeyError:
+        raise ValueError("Unknown output format: %s" % output_format)
+    if sort:
+        rows = sorted_rows(rows)
+    formatter_class(fields, stream, **kwargs).write(rows)
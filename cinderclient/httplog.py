@@ -0,0 +1,226 @@
+# Copyright 2012 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Debug logging of HTTP requests that is cheap for the thread making them.
+
+Log messages are only formatted when a handler emits them, credentials
+are masked, and bodies are cut short. With a :class:`QueueHandler` the
+formatting and writing happen on a background thread.
+"""
+
+import logging
+import Queue
+import random
+import re
+import threading
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+
+MASK = '***'
+
+REDACTED_HEADERS = ('x-auth-token', 'x-auth-key', 'x-subject-token',
+                    'x-storage-token')
+
+# Keys masked wherever they appear in a JSON body; the "id" of a "token"
+# object, Keystone's token, is masked as well.
+SECRET_KEYS = ('password', 'apiKey', 'api_key')
+
+_secret_hint_re = re.compile(r'"(?:password|apiKey|api_key|token)"')
+
+# Used for bodies that are not valid JSON, e.g. cut short.
+_body_secret_res = [
+    re.compile(r'("(?:password|apiKey|api_key)"\s*:\s*)"(?:[^"\\]|\\.)*"'),
+    re.compile(r'("token"\s*:\s*\{[^{}]*?"id"\s*:\s*)"(?:[^"\\]|\\.)*"'),
+]
+
+
+def redact_headers(headers, redacted=REDACTED_HEADERS):
+    """A copy of ``headers`` with the credentials masked."""
+    return dict((name, MASK if name.lower() in redacted else value)
+                for name, value in headers.iteritems())
+
+
+def _redact(data):
+    """Mask the secrets in decoded JSON ``data``, in place."""
+    if isinstance(data, list):
+        for item in data:
+            _redact(item)
+    elif isinstance(data, dict):
+        for key, value in data.iteritems():
+            if key in SECRET_KEYS and value is not None:
+                data[key] = MASK
+            elif key == 'token' and isinstance(value, dict):
+                if 'id' in value:
+                    value['id'] = MASK
+                _redact(value)
+            else:
+                _redact(value)
+
+
+def redact_body(body):
+    """``body``, a JSON string, with passwords and tokens masked."""
+    if not _secret_hint_re.search(body):
+        return body
+    try:
+        data = json.loads(body)
+    except ValueError:
+        for regex in _body_secret_res:
+            body = regex.sub(r'\1"%s"' % MASK, body)
+        return body
+    _redact(data)
+    return json.dumps(data)
+
+
+def truncate(text, limit):
+    """``text`` cut to ``limit`` characters, saying how much was left
+    out; never cut if ``limit`` is None."""
+    if limit is None or len(text) <= limit:
+        return text
+    return '%s... (%d more bytes)' % (text[:limit], len(text) - limit)
+
+
+class _Lazy(object):
+    """Calls ``func`` only when logging turns the message into text."""
+
+    __slots__ = ('func', 'args')
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+
+    def __str__(self):
+        return '%s' % (self.func(*self.args),)
+
+
+class RequestLog(object):
+    """
+    How :meth:`cinderclient.client.HTTPClient.http_log` logs requests.
+
+    :param max_body: longest request or response body logged, in bytes;
+                     None logs them whole.
+    :param sample_rate: fraction of successful requests to log; failed
+                        ones are always logged.
+    :param structured: log one JSON object per request instead of
+                       curl-like lines.
+    :param redact: mask tokens and passwords in headers and bodies.
+    """
+
+    def __init__(self, max_body=4096, sample_rate=1.0, structured=False,
+                 redact=True):
+        self.max_body = max_body
+        self.sample_rate = sample_rate
+        self.structured = structured
+        self.redact = redact
+
+    def _headers(self, headers):
+        if self.redact:
+            return redact_headers(headers)
+        return dict(headers)
+
+    def _body(self, body):
+        if body is None:
+            return None
+        if self.redact:
+            body = redact_body(body)
+        return truncate(body, self.max_body)
+
+    def format_request(self, url, method, headers):
+        parts = ['curl -i %s -X %s' % (url, method)]
+        for name, value in sorted(self._headers(headers).iteritems()):
+            parts.append('-H "%s: %s"' % (name, value))
+        return ' '.join(parts)
+
+    def format_json(self, url, method, headers, body, resp, resp_body):
+        return json.dumps({
+            'method': method,
+            'url': url,
+            'headers': self._headers(headers),
+            'body': self._body(body),
+            'status': resp.status,
+            'response_headers': self._headers(resp),
+            'response_body': self._body(resp_body),
+        }, sort_keys=True)
+
+    def log(self, logger, args, kwargs, resp, body):
+        if (self.sample_rate < 1 and resp.status < 400 and
+                random.random() >= self.sample_rate):
+            return
+        url, method = args[0], args[1]
+        headers = kwargs.get('headers') or {}
+        req_body = kwargs.get('body')
+
+        # NOTE: only references are taken here; the strings are built in
+        #       whichever thread the handler emits the record from.
+        if self.structured:
+            logger.debug("%s", _Lazy(self.format_json, url, method, headers,
+                                     req_body, resp, body))
+            return
+        logger.debug("REQ: %s\n", _Lazy(self.format_request, url, method,
+                                        headers))
+        if req_body is not None:
+            logger.debug("REQ BODY: %s\n", _Lazy(self._body, req_body))
+        logger.debug("RESP: [%s] %s %s\n", resp.status,
+                     _Lazy(self._headers, resp), _Lazy(self._body, body))
+
+
+class QueueHandler(logging.Handler):
+    """
+    Hands records to ``target``, another handler, on a background thread.
+
+    At most ``maxsize`` records wait in the queue; further ones are dropped
+    and counted in ``dropped`` rather than blocking the logging thread.
+    """
+
+    def __init__(self, target, maxsize=10000):
+        logging.Handler.__init__(self)
+        self.target = target
+        self.queue = Queue.Queue(maxsize)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run,
+                                        name='cinderclient-log')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def emit(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except Queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            record = self.queue.get()
+            try:
+                if record is None:
+                    return
+                self.target.handle(record)
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        """Wait until every queued record has been handled."""
+        self.queue.join()
+        self.target.flush()
+
+    def close(self):
+        if self._thread.is_alive():
+            self.queue.put(None)
+            self._thread.join()
+        logging.Handler.close(self)
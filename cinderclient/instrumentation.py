@@ -0,0 +1,195 @@
+# Copyright 2012 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Hooks to observe every HTTP request a client makes, and an in-process
+latency histogram built on them.
+
+    >>> histogram = instrumentation.LatencyHistogram()
+    >>> cs = client.Client(..., listeners=[histogram])
+    >>> cs.volumes.list()
+    >>> histogram.report()
+    [{'method': 'GET', 'url': '/volumes/detail', 'count': 1, ...}]
+"""
+
+import bisect
+import logging
+import re
+import threading
+import urlparse
+
+
+_logger = logging.getLogger(__name__)
+
+_id_re = re.compile(r'^(\d+|[0-9a-fA-F]{32}|'
+                    r'[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-'
+                    r'[0-9a-fA-F]{4}-[0-9a-fA-F]{12})$')
+
+
+def template_url(url, base_url=None):
+    """
+    The path of ``url``, relative to ``base_url`` if it is below it, with
+    the query string dropped and IDs replaced by ``{id}``, e.g.
+    ``/volumes/{id}/action``.
+    """
+    if base_url and url.startswith(base_url):
+        path = url[len(base_url):]
+    else:
+        path = urlparse.urlparse(url)[2]
+    path = path.split('?', 1)[0]
+    return '/'.join(_id_re.sub('{id}', segment)
+                    for segment in path.split('/'))
+
+
+class RequestEvent(object):
+    """
+    What is known about one HTTP request.
+
+    ``timings`` holds seconds spent waiting for a pooled connection
+    (``connection``) and in the whole request (``total``). httplib2 reads
+    the response in one go, so there is no separate connect or first byte
+    time; ``connection_reused`` tells whether a new connection had to be
+    opened. ``retry`` is the number of earlier attempts made by the retry
+    policy, ``error`` the exception raised while sending, if any.
+    """
+
+    __slots__ = ('method', 'url', 'template', 'status', 'bytes_out',
+                 'bytes_in', 'timings', 'connection_reused', 'retry',
+                 'request_id', 'error')
+
+    def __init__(self, method, url, template, bytes_out=0, retry=0):
+        self.method = method
+        self.url = url
+        self.template = template
+        self.status = None
+        self.bytes_out = bytes_out
+        self.bytes_in = 0
+        self.timings = {}
+        self.connection_reused = None
+        self.retry = retry
+        self.request_id = None
+        self.error = None
+
+
+class Listener(object):
+    """Base class for request listeners; both hooks do nothing."""
+
+    def before_request(self, event):
+        pass
+
+    def after_request(self, event):
+        pass
+
+
+def notify(listeners, hook, event):
+    """Call ``hook`` on every listener. A failing listener is logged and
+    does not fail the request."""
+    for listener in listeners:
+        try:
+            getattr(listener, hook)(event)
+        except Exception:
+            _logger.exception("Request listener %r failed", listener)
+
+
+# Upper bounds of the latency buckets, in seconds.
+DEFAULT_BOUNDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                  10.0, 30.0)
+
+
+class _Series(object):
+
+    def __init__(self, size):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.buckets = [0] * size
+
+
+class LatencyHistogram(Listener):
+    """
+    Aggregates request latencies and sizes by method and templated URL,
+    in fixed buckets bounded by ``bounds`` (plus one for slower requests).
+    """
+
+    def __init__(self, bounds=DEFAULT_BOUNDS):
+        self.bounds = tuple(bounds)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def after_request(self, event):
+        elapsed = event.timings.get('total', 0.0)
+        key = (event.method, event.template)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(len(self.bounds) + 1)
+            series.count += 1
+            if event.error is not None or (event.status or 0) >= 400:
+                series.errors += 1
+            series.total += elapsed
+            series.maximum = max(series.maximum, elapsed)
+            series.bytes_in += event.bytes_in
+            series.bytes_out += event.bytes_out
+            series.buckets[bisect.bisect_left(self.bounds, elapsed)] += 1
+
+    def percentile(self, method, template, q):
+        """
+        Upper bound of the bucket holding the ``q`` (0 to 100) percentile
+        of the latencies of ``method`` requests to ``template``; None if
+        there were none. Requests slower than every bound report the
+        slowest seen.
+        """
+        with self._lock:
+            series = self._series.get((method, template))
+            if series is None or not series.count:
+                return None
+            rank = q / 100.0 * series.count
+            seen = 0
+            for i, count in enumerate(series.buckets):
+                seen += count
+                if count and seen >= rank:
+                    if i < len(self.bounds):
+                        return self.bounds[i]
+                    break
+            return series.maximum
+
+    def report(self):
+        """One dict per method and URL, the most total time first."""
+        with self._lock:
+            items = self._series.items()
+        rows = []
+        for (method, template), series in items:
+            rows.append({
+                'method': method,
+                'url': template,
+                'count': series.count,
+                'errors': series.errors,
+                'total': series.total,
+                'mean': series.total / series.count,
+                'max': series.maximum,
+                'p50': self.percentile(method, template, 50),
+                'p99': self.percentile(method, template, 99),
+                'bytes_in': series.bytes_in,
+                'bytes_out': series.bytes_out,
+            })
+        rows.sort(key=lambda row: row['total'], reverse=True)
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
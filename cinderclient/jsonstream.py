@@ -0,0 +1,137 @@
+# Copyright 2012 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Incremental decoding of large JSON list responses.
+
+Only one element of the array being iterated over is materialised at a
+time, instead of the whole document tree.
+"""
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',:]}'
+_decoder = json.JSONDecoder()
+
+
+class _Reader(object):
+    """Cursor over a JSON document held in a string or read from a file."""
+
+    def __init__(self, source, chunk_size):
+        if isinstance(source, basestring):
+            self.buf = source
+            self.fp = None
+        else:
+            self.buf = ''
+            self.fp = source
+        self.pos = 0
+        self.chunk_size = chunk_size
+
+    def _fill(self):
+        """Read more data, dropping what has already been consumed."""
+        if self.fp is None:
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.fp = None
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and \
+                    self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def take(self):
+        char = self.peek()
+        self.pos += 1
+        return char
+
+    def expect(self, chars):
+        char = self.take()
+        if char not in chars:
+            raise ValueError("Expected one of %r at offset %d, got %r" %
+                             (chars, self.pos - 1, char))
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, idx=self.pos)
+            except ValueError:
+                # NOTE: possibly just a value cut in half by a chunk
+                # boundary; only give up once the input is exhausted.
+                if not self._fill():
+                    raise
+                continue
+            if (end == len(self.buf) or
+                    self.buf[end] not in _DELIMITERS) and self._fill():
+                # NOTE: a number cut by a chunk boundary ("3." of "3.25")
+                # decodes fine on its own; make sure the value really ended.
+                continue
+            self.pos = end
+            return obj
+
+
+def _iter_elements(reader):
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.take()
+        return
+    while True:
+        yield reader.value()
+        if reader.expect(',]') == ']':
+            return
+
+
+def load_member(source, key, chunk_size=65536):
+    """
+    Find member ``key`` of the top-level JSON object in ``source``, which is
+    a string or a file-like object.
+
+    If the member is an array, an iterator decoding its elements one by one
+    is returned. Any other value is decoded in full and returned as is.
+    Raises KeyError if the member does not exist and ValueError if the
+    document is not valid JSON.
+    """
+    reader = _Reader(source, chunk_size)
+    reader.expect('{')
+    if reader.peek() == '}':
+        raise KeyError(key)
+
+    while True:
+        name = reader.value()
+        reader.expect(':')
+        if name == key:
+            if reader.peek() == '[':
+                return _iter_elements(reader)
+            return reader.value()
+
+        reader.value()
+        if reader.expect(',}') == '}':
+            raise KeyError(key)
@@ -0,0 +1,248 @@
+# Copyright 2012 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+In-memory cache of GET responses, for callers that keep asking for data
+that rarely changes (volume types, limits, quota defaults).
+"""
+
+import re
+import threading
+import time
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+
+# Seconds a response may be reused without asking the server again, by
+# path; the first matching pattern wins.
+DEFAULT_TTLS = (
+    (r'^/types(/|\?|$)', 3600),
+    (r'^/os-quota-sets/[^/]+/defaults', 3600),
+    (r'^/os-quota-class-sets/', 600),
+    (r'^/limits', 30),
+    (r'^/(volumes|snapshots)/(?!detail$)[^/]+$', 5),
+)
+
+# Writes to the first collection also change what the others report.
+DEFAULT_DEPENDENTS = {
+    'volumes': ('limits', 'os-quota-sets'),
+    'snapshots': ('limits', 'os-quota-sets'),
+}
+
+
+def _collection(url):
+    """The first segment of the path of ``url``: 'volumes' for
+    ``/volumes/1234/action``."""
+    return url.split('?', 1)[0].lstrip('/').split('/', 1)[0]
+
+
+class _Entry(object):
+
+    __slots__ = ('key', 'collection', 'resp', 'text', 'expires', 'etag',
+                 'last_modified', 'prev', 'next')
+
+    def __init__(self, key, collection, resp, text, expires):
+        self.key = key
+        self.collection = collection
+        self.resp = resp
+        self.text = text
+        self.expires = expires
+        self.etag = resp.get('etag')
+        self.last_modified = resp.get('last-modified')
+        self.prev = self.next = None
+
+    @property
+    def size(self):
+        return len(self.text)
+
+
+class ResponseCache(object):
+    """
+    Caches GET responses by URL and the identity making the request.
+
+    A response is reused for the TTL of its path (see ``ttls``, by default
+    :data:`DEFAULT_TTLS`, and ``default_ttl`` for other paths) or for its
+    ``Cache-Control: max-age``. Past that, a response with an ``ETag`` or
+    ``Last-Modified`` validator is revalidated with a conditional request
+    and reused if the server answers 304.
+
+    Responses are evicted, least recently used first, to stay under
+    ``max_bytes`` of response bodies. Any POST, PUT or DELETE drops the
+    cached responses of its collection and of the ones depending on it.
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024, ttls=DEFAULT_TTLS,
+                 default_ttl=0, dependents=DEFAULT_DEPENDENTS):
+        self.max_bytes = max_bytes
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in ttls]
+        self.default_ttl = default_ttl
+        self.dependents = dependents
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+        self._entries = {}
+        self._collections = {}
+        # NOTE: a doubly linked list, most recently used first, with a
+        #       sentinel at both ends; OrderedDict needs Python 2.7.
+        self._head = _Entry(None, None, {}, '', 0)
+        self._tail = _Entry(None, None, {}, '', 0)
+        self._head.next = self._tail
+        self._tail.prev = self._head
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def ttl_for(self, url, resp=None):
+        if resp is not None:
+            cache_control = resp.get('cache-control', '')
+            match = re.search(r'max-age=(\d+)', cache_control)
+            if match:
+                return int(match.group(1))
+        path = url.split('?', 1)[0]
+        for regex, ttl in self.ttls:
+            if regex.search(path):
+                return ttl
+        return self.default_ttl
+
+    def _unlink(self, entry):
+        entry.prev.next = entry.next
+        entry.next.prev = entry.prev
+
+    def _push_front(self, entry):
+        entry.prev = self._head
+        entry.next = self._head.next
+        self._head.next.prev = entry
+        self._head.next = entry
+
+    def _remove(self, entry):
+        self._unlink(entry)
+        del self._entries[entry.key]
+        keys = self._collections.get(entry.collection)
+        if keys is not None:
+            keys.discard(entry.key)
+        self.size -= entry.size
+
+    def _lookup(self, key, now):
+        """The entry for ``key`` and whether it is still fresh."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+            self._unlink(entry)
+            self._push_front(entry)
+            fresh = entry.expires > now
+            if fresh:
+                self.hits += 1
+            return entry, fresh
+
+    def _revalidate(self, entry, expires):
+        with self._lock:
+            self.revalidated += 1
+            entry.expires = expires
+
+    def _miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def _store(self, key, url, resp, text, ttl):
+        if len(text) > self.max_bytes:
+            return
+        entry = _Entry(key, _collection(url), resp, text, time.time() + ttl)
+        with self._lock:
+            old = self._entries.get(key)
+            if old is not None:
+                self._remove(old)
+            self._entries[key] = entry
+            self._collections.setdefault(entry.collection, set()).add(key)
+            self._push_front(entry)
+            self.size += entry.size
+            while self.size > self.max_bytes:
+                self._remove(self._tail.prev)
+                self.evictions += 1
+
+    @staticmethod
+    def _result(resp, text, stream):
+        if stream or not text:
+            return resp, text or None
+        try:
+            return resp, json.loads(text)
+        except ValueError:
+            return resp, text
+
+    def get(self, scope, url, send, **kwargs):
+        """
+        Return the response to a GET of ``url`` for ``scope``, from the
+        cache or through ``send(url, 'GET', **kwargs)``. The body is
+        decoded unless ``stream`` is given, as with
+        :meth:`cinderclient.client.HTTPClient.request`.
+        """
+        stream = kwargs.get('stream', False)
+        key = (scope, url)
+        now = time.time()
+        entry, fresh = self._lookup(key, now)
+        if fresh:
+            return self._result(entry.resp, entry.text, stream)
+
+        if entry is not None and (entry.etag or entry.last_modified):
+            headers = dict(kwargs.get('headers') or {})
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+            kwargs['headers'] = headers
+        resp, body = send(url, 'GET', **kwargs)
+
+        if resp.status == 304 and entry is not None:
+            self._revalidate(entry, now + self.ttl_for(url, resp))
+            return self._result(entry.resp, entry.text, stream)
+        self._miss()
+
+        ttl = self.ttl_for(url, resp)
+        if (body and resp.status == 200 and
+                'no-store' not in resp.get('cache-control', '') and
+                (ttl > 0 or resp.get('etag') or resp.get('last-modified'))):
+            text = body
+            if not isinstance(body, basestring):
+                # NOTE: keep decoded bodies as JSON text, so that every
+                #       hit hands out a fresh copy.
+                text = json.dumps(body)
+            self._store(key, url, resp, text, ttl)
+        return resp, body
+
+    def invalidate(self, url):
+        """Forget the responses made stale by a write to ``url``."""
+        collection = _collection(url)
+        collections = (collection,) + tuple(
+            self.dependents.get(collection, ()))
+        with self._lock:
+            for name in collections:
+                for key in list(self._collections.pop(name, ())):
+                    entry = self._entries.get(key)
+                    if entry is not None:
+                        self._remove(entry)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._collections.clear()
+            self._head.next = self._tail
+            self._tail.prev = self._head
+            self.size = 0
@@ -0,0 +1,215 @@
+# Copyright 2012 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Retrying requests that failed for transient reasons: rate limiting, an
+unavailable server or a dropped connection.
+"""
+
+import httplib
+import logging
+import random
+import re
+import socket
+import threading
+import time
+
+from cinderclient import exceptions
+
+
+_logger = logging.getLogger(__name__)
+
+_action_re = re.compile(r'^/volumes/[^/]+/action$')
+
+_state = threading.local()
+
+
+def current_attempt():
+    """Number of earlier attempts at the request this thread is making
+    on behalf of a :class:`RetryPolicy`; 0 outside of one."""
+    return getattr(_state, 'attempt', 0)
+
+
+class RetryBudget(object):
+    """
+    Caps retries at a fraction of the requests made, so that a failing
+    server is not hit with several times its usual load.
+
+    Every first attempt adds ``ratio`` to the balance and every retry
+    takes one from it; the balance starts at, and never exceeds,
+    ``reserve``. One budget may be shared by several policies.
+    """
+
+    def __init__(self, ratio=0.1, reserve=10):
+        self.ratio = ratio
+        self.reserve = reserve
+        self.balance = float(reserve)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.balance = min(self.balance + self.ratio, self.reserve)
+
+    def withdraw(self):
+        """Take one retry from the budget; False if there is none left."""
+        with self._lock:
+            if self.balance < 1:
+                return False
+            self.balance -= 1
+            return True
+
+
+class RetryMetrics(object):
+    """Counters of the work done by a :class:`RetryPolicy`."""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.gave_up = 0
+        self.budget_exhausted = 0
+        self.delay = 0.0
+        # Retries by cause: an HTTP status code or an exception name.
+        self.reasons = {}
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_retry(self, reason, delay):
+        with self._lock:
+            self.retries += 1
+            self.delay += delay
+            self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+    def record_give_up(self, budget_exhausted=False):
+        with self._lock:
+            self.gave_up += 1
+            if budget_exhausted:
+                self.budget_exhausted += 1
+
+
+class RetryPolicy(object):
+    """
+    Decides which failed requests to send again, and when.
+
+    Requests are retried after an error status in ``statuses`` or a
+    dropped connection, up to ``max_retries`` times, waiting a random time
+    between 0 and ``base_delay * 2 ** attempt`` (at most ``max_delay``)
+    seconds. A ``Retry-After`` given by the server is waited for instead,
+    unless it is longer than ``max_retry_after``.
+
+    Only requests that are safe to repeat are retried: those using one of
+    ``methods``, and POSTs to ``/volumes/{id}/action`` for the actions in
+    ``actions`` (or any action if it is True). A 413 carrying a
+    Retry-After was rejected by the rate limiter before doing anything, so
+    it is retried whatever the request.
+
+    :param budget: a :class:`RetryBudget`; retries are unlimited without
+    """
+
+    methods = ('GET', 'HEAD', 'PUT', 'DELETE')
+    statuses = (408, 413, 500, 502, 503, 504)
+
+    def __init__(self, max_retries=3, base_delay=0.5, max_delay=30,
+                 max_retry_after=60, actions=(), budget=None, methods=None,
+                 statuses=None):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.actions = actions
+        self.budget = budget
+        if methods is not None:
+            self.methods = methods
+        if statuses is not None:
+            self.statuses = statuses
+        self.metrics = RetryMetrics()
+
+    def is_idempotent(self, method, url, body=None):
+        if method in self.methods:
+            return True
+        if method != 'POST' or not self.actions:
+            return False
+        if not _action_re.match(url.split('?', 1)[0]):
+            return False
+        if self.actions is True:
+            return True
+        return (hasattr(body, 'keys') and len(body) == 1 and
+                body.keys()[0] in self.actions)
+
+    def backoff(self, attempt):
+        """Full jitter: uniform between 0 and the exponential bound."""
+        return random.uniform(0, min(self.max_delay,
+                                     self.base_delay * 2 ** attempt))
+
+    def classify(self, error, method, url, body):
+        """Return the reason to retry after ``error``, or None."""
+        if isinstance(error, exceptions.ConnectionError):
+            error = error.reason
+        if isinstance(error, exceptions.ClientException):
+            if error.code not in self.statuses:
+                return None
+            if (isinstance(error, exceptions.OverLimit) and
+                    error.retry_after is not None):
+                return error.code
+        elif not isinstance(error, (socket.error, httplib.HTTPException)):
+            return None
+        if not self.is_idempotent(method, url, body):
+            return None
+        if isinstance(error, exceptions.ClientException):
+            return error.code
+        return error.__class__.__name__
+
+    def delay(self, error, attempt):
+        """Seconds to wait before retry number ``attempt`` (from 0), or
+        None if the server asked us to wait too long."""
+        retry_after = getattr(error, 'retry_after', None)
+        if retry_after is None:
+            return self.backoff(attempt)
+        if retry_after > self.max_retry_after:
+            return None
+        return retry_after
+
+    def call(self, func, url, method, **kwargs):
+        """Run ``func(url, method, **kwargs)``, retrying it as allowed."""
+        self.metrics.record_request()
+        if self.budget:
+            self.budget.deposit()
+        body = kwargs.get('body')
+        attempt = 0
+        outer_attempt = current_attempt()
+        while True:
+            _state.attempt = attempt
+            try:
+                return func(url, method, **kwargs)
+            except Exception, e:
+                reason = self.classify(e, method, url, body)
+                if reason is None:
+                    raise
+                delay = self.delay(e, attempt)
+                if attempt >= self.max_retries or delay is None:
+                    self.metrics.record_give_up()
+                    raise
+                if self.budget and not self.budget.withdraw():
+                    self.metrics.record_give_up(budget_exhausted=True)
+                    raise
+                _logger.debug("Retrying %s %s in %.2fs after %s",
+                              method, url, delay, reason)
+                self.metrics.record_retry(reason, delay)
+                time.sleep(delay)
+                attempt += 1
+            finally:
+                _state.attempt = outer_attempt
@@ -17,17 +17,118 @@
 
 
 import cinderclient.exceptions
+from cinderclient import utils
+
+
+class Endpoint(object):
+    """
+    One endpoint of a service in the catalog, read only.
+
+    Besides ``service_type``, ``service_name`` and ``region``, its
+    attributes (``publicURL``, ``tenantId``, ...) are read with ``get()``
+    or indexing.
+    """
+    __slots__ = ('service_type', 'service_name', 'region', '_attributes')
+
+    def __init__(self, service_type, service_name, attributes):
+        object.__setattr__(self, 'service_type', service_type)
+        object.__setattr__(self, 'service_name', service_name)
+        object.__setattr__(self, 'region', attributes.get('region'))
+        object.__setattr__(self, '_attributes', dict(attributes))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Endpoint is read only")
+
+    def __getitem__(self, key):
+        return self._attributes[key]
+
+    def get(self, key, default=None):
+        return self._attributes.get(key, default)
+
+    def url(self, endpoint_type='publicURL'):
+        return self._attributes.get(endpoint_type)
+
+    def to_dict(self):
+        """A copy of the attributes, plus the serviceName."""
+        endpoint = dict(self._attributes)
+        endpoint['serviceName'] = self.service_name
+        return endpoint
+
+    def __repr__(self):
+        return "<Endpoint %s %s %s>" % (self.service_type, self.service_name,
+                                        self.region)
 
 
 class ServiceCatalog(object):
-    """Helper methods for dealing with a Keystone Service Catalog."""
+    """Helper methods for dealing with a Keystone Service Catalog.
+
+    The catalog is indexed once, when it is given, by service type, service
+    name, region and endpoint type; looking up an endpoint does not scan or
+    modify the catalog.
+    """
 
     def __init__(self, resource_dict):
         self.catalog = resource_dict
+        self._endpoints = ()
+        self._index = {}
+        self._build_index()
+
+    def _build_index(self):
+        try:
+            services = self.catalog['access']['serviceCatalog']
+        except (KeyError, TypeError):
+            return
+
+        endpoints = []
+        index = {}
+        for service in services:
+            service_type = service.get('type')
+            service_name = service.get('name')
+            for attributes in service.get('endpoints', []):
+                endpoint = Endpoint(service_type, service_name, attributes)
+                endpoints.append(endpoint)
+                # NOTE: also file the endpoint under None for the name and
+                #       region, so that lookups not filtering on them are
+                #       single dict accesses as well.
+                for name in set([service_name, None]):
+                    for region in set([endpoint.region, None]):
+                        for endpoint_type in attributes:
+                            if not endpoint_type.endswith('URL'):
+                                continue
+                            key = (service_type, name, region, endpoint_type)
+                            index.setdefault(key, []).append(endpoint)
+        self._endpoints = tuple(endpoints)
+        self._index = dict((key, tuple(matches))
+                           for key, matches in index.iteritems())
 
     def get_token(self):
         return self.catalog['access']['token']['id']
 
+    def get_token_expiry(self):
+        """Return when the token expires, in seconds since the epoch, or
+        None if the catalog does not say."""
+        try:
+            return utils.parse_isotime(
+                self.catalog['access']['token']['expires'])
+        except (KeyError, ValueError):
+            return None
+
+    def get_endpoints(self, service_type=None, endpoint_type='publicURL',
+                      service_name=None, region=None):
+        """
+        Return every :class:`Endpoint` with an ``endpoint_type`` URL,
+        optionally only those of one service type, service name or region;
+        e.g. to send the same request to each region in turn with the
+        token already obtained.
+        """
+        if service_type is not None:
+            return list(self._index.get(
+                (service_type, service_name, region, endpoint_type), ()))
+        return [endpoint for endpoint in self._endpoints
+                if endpoint.url(endpoint_type) is not None and
+                service_name in (None, endpoint.service_name) and
+                region in (None, endpoint.region)]
+
     def url_for(self, attr=None, filter_value=None,
                 service_type=None, endpoint_type='publicURL',
                 service_name=None, volume_service_name=None):
@@ -47,26 +148,24 @@ class ServiceCatalog(object):
         if not 'serviceCatalog' in self.catalog['access']:
             return None
 
-        # Full catalog ...
-        catalog = self.catalog['access']['serviceCatalog']
+        # The service name only narrows compute and volume lookups.
+        name = None
+        if service_type == 'compute':
+            name = service_name or None
+        elif service_type == 'volume':
+            name = volume_service_name or None
 
-        for service in catalog:
-            if service.get("type") != service_type:
-                continue
-
-            if (service_name and service_type == 'compute' and
-                    service.get('name') != service_name):
-                continue
-
-            if (volume_service_name and service_type == 'volume' and
-                    service.get('name') != volume_service_name):
-                continue
-
-            endpoints = service['endpoints']
-            for endpoint in endpoints:
-                if not filter_value or endpoint.get(attr) == filter_value:
-                    endpoint["serviceName"] = service.get("name")
-                    matching_endpoints.append(endpoint)
+        if filter_value and attr == 'region':
+            candidates = self._index.get(
+                (service_type, name, filter_value, endpoint_type), ())
+        else:
+            candidates = self._index.get(
+                (service_type, name, None, endpoint_type), ())
+            if filter_value:
+                candidates = [endpoint for endpoint in candidates
+                              if endpoint.get(attr) == filter_value]
+        matching_endpoints.extend(endpoint.to_dict()
+                                  for endpoint in candidates)
 
         if not matching_endpoints:
             raise cinderclient.exceptions.EndpointNotFound()
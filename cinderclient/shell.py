@@ -20,15 +20,15 @@ Command-line interface to the OpenStack Volume API.
 
 import argparse
 import glob
-import httplib2
-import imp
 import itertools
 import os
 import pkgutil
 import sys
 import logging
 
+from cinderclient import auth_cache
 from cinderclient import client
+from cinderclient import completion_cache
 from cinderclient import exceptions as exc
 import cinderclient.extension
 from cinderclient import utils
@@ -65,6 +65,9 @@ class CinderClientArgumentParser(argparse.ArgumentParser):
 
 class OpenStackCinderShell(object):
 
+    # Commands that need every subparser to be built.
+    FULL_COMMANDS = ('help', 'bash-completion', 'bash_completion')
+
     def get_base_parser(self):
         parser = CinderClientArgumentParser(
             prog='cinder',
@@ -163,6 +166,35 @@ class OpenStackCinderShell(object):
         parser.add_argument('--os_volume_api_version',
                             help=argparse.SUPPRESS)
 
+        parser.add_argument('--os-cache',
+                            default=utils.bool_from_str(
+                                utils.env('OS_CACHE', default=False)),
+                            action='store_true',
+                            help='Reuse tokens between invocations through '
+                                 'an on-disk cache. Defaults to '
+                                 'env[OS_CACHE].')
+        parser.add_argument('--os_cache',
+                            action='store_true',
+                            help=argparse.SUPPRESS)
+
+        parser.add_argument('--format',
+                            metavar='<format>',
+                            choices=['table', 'fixed', 'json', 'csv'],
+                            default=utils.env('CINDER_OUTPUT_FORMAT',
+                                              default='table'),
+                            help='Output format of listings: table, or '
+                                 'fixed (a table printed as rows arrive), '
+                                 'json (one object per line) or csv. '
+                                 'Defaults to env[CINDER_OUTPUT_FORMAT] '
+                                 'or table.')
+
+        parser.add_argument('--sort',
+                            default=False,
+                            action='store_true',
+                            help='Sort fixed, json and csv listings by '
+                                 'their first column. Large listings are '
+                                 'sorted through temporary files.')
+
         parser.add_argument('--insecure',
                             default=utils.env('CINDERCLIENT_INSECURE',
                                               default=False),
@@ -197,12 +229,35 @@ class OpenStackCinderShell(object):
 
         return parser
 
-    def get_subcommand_parser(self, version):
+    def get_subcommand_parser(self, version, command=None):
+        """
+        Build the parser for all subcommands, or only for ``command``.
+
+        Building a subparser means adding all of its arguments, so when the
+        command to run is known only its own subparser is built. Help, bash
+        completion and unknown commands still get every subparser.
+        """
         parser = self.get_base_parser()
 
         self.subcommands = {}
         subparsers = parser.add_subparsers(metavar='<subcommand>')
 
+        self._find_commands(version)
+        if command in self.commands and command not in self.FULL_COMMANDS:
+            self._add_subcommand(subparsers, command,
+                                 self._get_callback(command))
+        else:
+            for name in self.command_names:
+                self._add_subcommand(subparsers, name,
+                                     self._get_callback(name))
+
+        self._add_bash_completion_subparser(subparsers)
+
+        return parser
+
+    def _find_commands(self, version):
+        """Map each subcommand name to where its callback is found, without
+        building any parser."""
         try:
             actions_module = {
                 '1.1': shell_v1,
@@ -211,42 +266,64 @@ class OpenStackCinderShell(object):
         except KeyError:
             actions_module = shell_v1
 
-        self._find_actions(subparsers, actions_module)
-        self._find_actions(subparsers, self)
+        self.commands = {}
+        self.command_names = []
+        self._find_actions(actions_module)
+        self._find_actions(self)
 
+        # NOTE: extension modules are only imported once one of their
+        #       commands is actually used.
         for extension in self.extensions:
-            self._find_actions(subparsers, extension.module)
-
-        self._add_bash_completion_subparser(subparsers)
-
-        return parser
+            self._find_actions(extension, extension.commands)
 
     def _discover_extensions(self, version):
+        """
+        Find extensions on sys.path and in the contrib directory, reusing
+        the result of the previous run while none of the searched
+        directories changed.
+        """
+        search_dirs = sys.path + [self._contrib_path(version)]
+        index = cinderclient.extension.ExtensionIndex(version)
+        extensions = index.load(search_dirs)
+        if extensions is not None:
+            return extensions
+
         extensions = []
-        for name, module in itertools.chain(
+        for name, module, kind, location in itertools.chain(
                 self._discover_via_python_path(version),
                 self._discover_via_contrib_path(version)):
 
-            extension = cinderclient.extension.Extension(name, module)
+            extension = cinderclient.extension.Extension(
+                name, module, kind=kind, location=location)
             extensions.append(extension)
 
+        index.save(search_dirs, extensions)
         return extensions
 
     def _discover_via_python_path(self, version):
         for (module_loader, name, ispkg) in pkgutil.iter_modules():
             if name.endswith('python_cinderclient_ext'):
+                location = getattr(module_loader, 'path', None)
                 if not hasattr(module_loader, 'load_module'):
                     # Python 2.6 compat: actually get an ImpImporter obj
                     module_loader = module_loader.find_module(name)
 
                 module = module_loader.load_module(name)
-                yield name, module
+                if location and os.path.isdir(location):
+                    yield name, module, 'path', location
+                else:
+                    # NOTE: e.g. zipped eggs, which can't be indexed.
+                    yield name, module, None, None
 
-    def _discover_via_contrib_path(self, version):
+    def _contrib_path(self, version):
         module_path = os.path.dirname(os.path.abspath(__file__))
         version_str = "v%s" % version.replace('.', '_')
-        ext_path = os.path.join(module_path, version_str, 'contrib')
-        ext_glob = os.path.join(ext_path, "*.py")
+        return os.path.join(module_path, version_str, 'contrib')
+
+    def _discover_via_contrib_path(self, version):
+        version_str = "v%s" % version.replace('.', '_')
+        package = 'cinderclient.%s.contrib' % version_str
+        ext_glob = os.path.join(self._contrib_path(version), "*.py")
 
         for ext_path in glob.iglob(ext_glob):
             name = os.path.basename(ext_path)[:-3]
@@ -254,8 +331,10 @@ class OpenStackCinderShell(object):
             if name == "__init__":
                 continue
 
-            module = imp.load_source(name, ext_path)
-            yield name, module
+            # NOTE: a regular import, so that compiled files are reused.
+            module = cinderclient.extension.load_module('contrib', name,
+                                                        package)
+            yield name, module, 'contrib', package
 
     def _add_bash_completion_subparser(self, subparsers):
         subparser = subparsers.add_parser(
@@ -266,30 +345,42 @@ class OpenStackCinderShell(object):
         self.subcommands['bash_completion'] = subparser
         subparser.set_defaults(func=self.do_bash_completion)
 
-    def _find_actions(self, subparsers, actions_module):
-        for attr in (a for a in dir(actions_module) if a.startswith('do_')):
+    def _find_actions(self, actions_module, attrs=None):
+        if attrs is None:
+            attrs = [a for a in dir(actions_module) if a.startswith('do_')]
+        for attr in attrs:
             # I prefer to be hypen-separated instead of underscores.
             command = attr[3:].replace('_', '-')
-            callback = getattr(actions_module, attr)
-            desc = callback.__doc__ or ''
-            help = desc.strip().split('\n')[0]
-            arguments = getattr(callback, 'arguments', [])
-
-            subparser = subparsers.add_parser(
-                command,
-                help=help,
-                description=desc,
-                add_help=False,
-                formatter_class=OpenStackHelpFormatter)
-
-            subparser.add_argument('-h', '--help',
-                                   action='help',
-                                   help=argparse.SUPPRESS,)
-
-            self.subcommands[command] = subparser
-            for (args, kwargs) in arguments:
-                subparser.add_argument(*args, **kwargs)
-            subparser.set_defaults(func=callback)
+            if command not in self.commands:
+                self.command_names.append(command)
+            self.commands[command] = (actions_module, attr)
+
+    def _get_callback(self, command):
+        owner, attr = self.commands[command]
+        if isinstance(owner, cinderclient.extension.Extension):
+            owner = owner.module
+        return getattr(owner, attr)
+
+    def _add_subcommand(self, subparsers, command, callback):
+        desc = callback.__doc__ or ''
+        help = desc.strip().split('\n')[0]
+        arguments = getattr(callback, 'arguments', [])
+
+        subparser = subparsers.add_parser(
+            command,
+            help=help,
+            description=desc,
+            add_help=False,
+            formatter_class=OpenStackHelpFormatter)
+
+        subparser.add_argument('-h', '--help',
+                               action='help',
+                               help=argparse.SUPPRESS,)
+
+        self.subcommands[command] = subparser
+        for (args, kwargs) in arguments:
+            subparser.add_argument(*args, **kwargs)
+        subparser.set_defaults(func=callback)
 
     def setup_debugging(self, debug):
         if not debug:
@@ -301,6 +392,7 @@ class OpenStackCinderShell(object):
         logger.setLevel(logging.DEBUG)
         logger.addHandler(streamhandler)
 
+        import httplib2
         httplib2.debuglevel = 1
 
     def main(self, argv):
@@ -314,8 +406,11 @@ class OpenStackCinderShell(object):
             options.os_volume_api_version)
         self._run_extension_hooks('__pre_parse_args__')
 
+        command = None
+        if args and not options.help:
+            command = args[0]
         subcommand_parser = self.get_subcommand_parser(
-            options.os_volume_api_version)
+            options.os_volume_api_version, command)
         self.parser = subcommand_parser
 
         if options.help and len(args) == 0:
@@ -401,6 +496,14 @@ class OpenStackCinderShell(object):
                 "You must provide an auth url "
                 "via either --os-auth-url or env[OS_AUTH_URL]")
 
+        token_cache = None
+        if args.os_cache:
+            token_cache = auth_cache.AuthCache()
+
+        # NOTE: only the command line keeps IDs around for bash completion;
+        # library users opt in by passing their own CompletionCache.
+        id_cache = completion_cache.CompletionCache()
+
         self.cs = client.Client(options.os_volume_api_version, os_username,
                                 os_password, os_tenant_name, os_auth_url,
                                 insecure, region_name=os_region_name,
@@ -408,7 +511,9 @@ class OpenStackCinderShell(object):
                                 extensions=self.extensions,
                                 service_type=service_type,
                                 service_name=service_name,
-                                volume_service_name=volume_service_name)
+                                volume_service_name=volume_service_name,
+                                auth_cache=token_cache,
+                                completion_cache=id_cache)
 
         try:
             if not utils.isunauthenticated(args.func):
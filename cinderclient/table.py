@@ -0,0 +1,251 @@
+# Copyright 2012 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Column-oriented storage for large listings, for reports that aggregate a
+few fields over many resources.
+"""
+
+import array
+import functools
+import itertools
+import operator
+
+
+# Kinds of column. INTEGER values are kept in a machine-word array and
+# CATEGORY values (few distinct strings, like a status) as small integer
+# codes into a table of the distinct values. TEXT values are kept as is.
+INTEGER = 'integer'
+CATEGORY = 'category'
+TEXT = 'text'
+
+
+class _Column(object):
+
+    def __init__(self, kind):
+        self.kind = kind
+        if kind == INTEGER:
+            # NOTE: 'l' is 64 bits wide on LP64 platforms; the 'q' type code
+            # is not available before Python 3.3.
+            self.data = array.array('l')
+        elif kind == CATEGORY:
+            self.data = array.array('i')
+            self.values = []
+            self.codes = {}
+        elif kind == TEXT:
+            self.data = []
+        else:
+            raise ValueError("Unknown column kind: %s" % kind)
+
+    def append(self, value):
+        if self.kind == INTEGER:
+            self.data.append(int(value or 0))
+        elif self.kind == CATEGORY:
+            try:
+                code = self.codes[value]
+            except KeyError:
+                code = self.codes[value] = len(self.values)
+                self.values.append(value)
+            self.data.append(code)
+        else:
+            self.data.append(value)
+
+    def get(self, i):
+        if self.kind == CATEGORY:
+            return self.values[self.data[i]]
+        return self.data[i]
+
+    def decoded(self):
+        if self.kind == CATEGORY:
+            values = self.values
+            return [values[code] for code in self.data]
+        return list(self.data)
+
+    def take(self, indices):
+        """A new column holding the rows at ``indices``."""
+        column = _Column.__new__(_Column)
+        column.kind = self.kind
+        values = map(self.data.__getitem__, indices)
+        if self.kind == TEXT:
+            column.data = values
+        else:
+            column.data = array.array(self.data.typecode, values)
+        if self.kind == CATEGORY:
+            # NOTE: the distinct values are shared with the parent table.
+            column.values = self.values
+            column.codes = self.codes
+        return column
+
+    def matches(self, condition):
+        """Row numbers whose value equals ``condition``, or for which
+        ``condition(value)`` is true if it is callable."""
+        if self.kind == CATEGORY:
+            # NOTE: test each distinct value once, then compare codes.
+            if callable(condition):
+                hits = set(code for code, value in enumerate(self.values)
+                           if condition(value))
+                test = hits.__contains__
+            else:
+                code = self.codes.get(condition)
+                if code is None:
+                    return []
+                test = functools.partial(operator.eq, code)
+        elif callable(condition):
+            test = condition
+        else:
+            test = functools.partial(operator.eq, condition)
+        return list(itertools.compress(xrange(len(self.data)),
+                                       itertools.imap(test, self.data)))
+
+
+class ResultTable(object):
+    """
+    A listing stored column by column instead of as one
+    :class:`cinderclient.base.Resource` per item.
+
+    Subclasses declare their ``COLUMNS`` as ``(name, kind)`` pairs; other
+    fields of the listed items are dropped. Missing integers count as 0.
+
+        >>> table = cs.volumes.list(search_opts={'all_tenants': 1},
+        ...                         as_table=True)
+        >>> table.filter(status='available').group_by('volume_type', 'size')
+        {u'standard': 1200, u'ssd': 300}
+    """
+    COLUMNS = ()
+
+    def __init__(self, rows=None):
+        self._columns = {}
+        for name, kind in self.COLUMNS:
+            self._columns[name] = _Column(kind)
+        self._length = 0
+        if rows is not None:
+            self.extend(rows)
+
+    @property
+    def columns(self):
+        return [name for name, _kind in self.COLUMNS]
+
+    def append(self, row):
+        """Add one item, a dict as found in the API response."""
+        for name, column in self._columns.iteritems():
+            column.append(row.get(name))
+        self._length += 1
+
+    def extend(self, rows):
+        for row in rows:
+            if row:
+                self.append(row)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        """Rebuild the rows as dicts, one at a time."""
+        names = self.columns
+        columns = [self._columns[name] for name in names]
+        for i in xrange(self._length):
+            yield dict(itertools.izip(names,
+                                      [column.get(i) for column in columns]))
+
+    def column(self, name):
+        """All values of column ``name``, as a list."""
+        return self._columns[name].decoded()
+
+    def _select(self, indices):
+        table = self.__class__()
+        for name, column in self._columns.iteritems():
+            table._columns[name] = column.take(indices)
+        table._length = len(indices)
+        return table
+
+    def filter(self, **conditions):
+        """
+        Return a new table with the rows matching all ``conditions``.
+
+        Each condition is either a value the column must equal, or a
+        callable taking the column value and returning a boolean::
+
+            table.filter(status='available', size=lambda size: size > 100)
+        """
+        indices = None
+        for name, condition in conditions.iteritems():
+            hits = self._columns[name].matches(condition)
+            if indices is None:
+                indices = hits
+            else:
+                hits = set(hits)
+                indices = [i for i in indices if i in hits]
+        if indices is None:
+            indices = range(self._length)
+        return self._select(indices)
+
+    def sum(self, name):
+        """Total of integer column ``name``."""
+        column = self._columns[name]
+        if column.kind != INTEGER:
+            raise TypeError("Column %s is not an integer column" % name)
+        return sum(column.data)
+
+    def group_by(self, key, value=None):
+        """
+        Return a dict mapping each distinct value of column ``key`` to the
+        sum of integer column ``value`` over its rows, or to its number of
+        rows if ``value`` is None.
+        """
+        key_column = self._columns[key]
+        if value is not None and self._columns[value].kind != INTEGER:
+            raise TypeError("Column %s is not an integer column" % value)
+
+        if key_column.kind == CATEGORY:
+            totals = [0] * len(key_column.values)
+            if value is None:
+                for code in key_column.data:
+                    totals[code] += 1
+            else:
+                for code, amount in itertools.izip(
+                        key_column.data, self._columns[value].data):
+                    totals[code] += amount
+            present = set(key_column.data)
+            return dict((key_column.values[code], total)
+                        for code, total in enumerate(totals)
+                        if code in present)
+
+        totals = {}
+        if value is None:
+            for k in key_column.data:
+                totals[k] = totals.get(k, 0) + 1
+        else:
+            for k, amount in itertools.izip(key_column.data,
+                                            self._columns[value].data):
+                totals[k] = totals.get(k, 0) + amount
+        return totals
+
+    def to_numpy(self):
+        """
+        Return a dict of column name to NumPy array: native integer arrays
+        for integer columns and object arrays for the others.
+
+        Raises ImportError if NumPy is not installed.
+        """
+        import numpy
+
+        arrays = {}
+        for name, column in self._columns.iteritems():
+            if column.kind == INTEGER:
+                arrays[name] = numpy.frombuffer(column.data,
+                                                dtype=numpy.int_).copy()
+            else:
+                arrays[name] = numpy.array(column.decoded(), dtype=object)
+        return arrays
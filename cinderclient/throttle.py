@@ -0,0 +1,151 @@
+# Copyright 2012 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Client-side pacing of requests to stay within the server's rate limits.
+"""
+
+import logging
+import re
+import threading
+import time
+
+from cinderclient import utils
+
+
+_logger = logging.getLogger(__name__)
+
+UNIT_SECONDS = {
+    'SECOND': 1,
+    'MINUTE': 60,
+    'HOUR': 60 * 60,
+    'DAY': 60 * 60 * 24,
+}
+
+
+class TokenBucket(object):
+    """
+    Allows ``capacity`` requests at once, refilled at ``rate`` per second.
+
+    :param tokens: requests allowed right away, by default ``capacity``
+    :param not_before: epoch time before which no token is available
+    """
+
+    def __init__(self, rate, capacity, tokens=None, not_before=None):
+        self.rate = float(rate)
+        self.capacity = capacity
+        self.tokens = capacity if tokens is None else min(tokens, capacity)
+        self.updated = time.time()
+        if not_before is not None and not_before > self.updated:
+            # NOTE: start refilling so that the first token is ready
+            #       exactly when the server says.
+            self.tokens = 0
+            self.updated = not_before - 1 / self.rate
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token and return how many seconds to wait before using
+        it. Concurrent callers are queued one refill interval apart."""
+        with self._lock:
+            now = time.time()
+            if now > self.updated:
+                self.tokens = min(self.capacity, self.tokens +
+                                  (now - self.updated) * self.rate)
+                self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0
+            return max(self.updated - now, 0) - self.tokens / self.rate
+
+
+class RateLimiter(object):
+    """
+    Paces requests according to a set of server rate limits.
+
+    Each limit applies to requests with its verb whose URI matches its
+    regex, and gets its own :class:`TokenBucket`; a request waits for
+    every limit it matches.
+
+    :param fetch: callable returning the current
+                  :class:`cinderclient.v1.limits.RateLimit` list, e.g.
+                  ``lambda: cs.limits.get().rate``; called on first use and
+                  then every ``refresh_interval`` seconds.
+    """
+
+    def __init__(self, fetch=None, refresh_interval=300, rate_limits=None):
+        self.fetch = fetch
+        self.refresh_interval = refresh_interval
+        self.rules = []
+        self.refreshed_at = None
+        self.throttled = 0
+        self.throttled_time = 0.0
+        self._lock = threading.Lock()
+        if rate_limits is not None:
+            self.update(rate_limits)
+
+    def update(self, rate_limits):
+        """Replace the buckets with ones for ``rate_limits``."""
+        rules = []
+        for limit in rate_limits:
+            seconds = UNIT_SECONDS.get(str(limit.unit).upper())
+            if not seconds or not limit.value:
+                continue
+            not_before = None
+            if not limit.remain and limit.next_available:
+                try:
+                    not_before = utils.parse_isotime(limit.next_available)
+                except ValueError:
+                    pass
+            bucket = TokenBucket(float(limit.value) / seconds, limit.value,
+                                 tokens=limit.remain, not_before=not_before)
+            rules.append((limit.verb.upper(), re.compile(limit.regex),
+                          bucket))
+        self.rules = rules
+        self.refreshed_at = time.time()
+
+    def invalidate(self):
+        """Refresh the limits before the next request, e.g. after the
+        server answered 413 anyway."""
+        self.refreshed_at = None
+
+    def _maybe_refresh(self):
+        if self.fetch is None:
+            return
+        with self._lock:
+            now = time.time()
+            if (self.refreshed_at is not None and
+                    now - self.refreshed_at < self.refresh_interval):
+                return
+            # NOTE: mark the refresh first, so that the request fetching
+            #       the limits does not try to refresh them in turn.
+            self.refreshed_at = now
+        try:
+            self.update(list(self.fetch()))
+        except Exception, e:
+            _logger.debug("Could not refresh rate limits: %s", e)
+
+    def wait(self, method, url):
+        """Block until a ``method`` request to ``url`` is allowed."""
+        self._maybe_refresh()
+        delay = 0
+        method = method.upper()
+        for verb, regex, bucket in self.rules:
+            if verb == method and regex.search(url):
+                delay = max(delay, bucket.reserve())
+        if delay > 0:
+            self.throttled += 1
+            self.throttled_time += delay
+            time.sleep(delay)
+        return delay
@@ -0,0 +1,180 @@
+# Copyright 2012 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Keep-alive connection pooling for the HTTP client.
+"""
+
+import contextlib
+import httplib
+import socket
+import sys
+import threading
+import time
+import urlparse
+
+
+def is_connection_error(error):
+    """Whether ``error`` is a failure of the connection itself, raised
+    instead of a response."""
+    if isinstance(error, (socket.error, httplib.HTTPException)):
+        return True
+    # NOTE: only loaded once a connection has been made.
+    httplib2 = sys.modules.get('httplib2')
+    return httplib2 is not None and isinstance(error, httplib2.HttpLib2Error)
+
+
+class ConnectionPool(object):
+    """
+    A bounded, thread-safe pool of keep-alive HTTP connections.
+
+    Connections are grouped by scheme, host, port and TLS settings, so any
+    number of :class:`cinderclient.client.HTTPClient` instances talking to
+    the same endpoint can share them.
+
+    :param max_per_host: maximum number of idle connections kept per host
+    :param idle_timeout: seconds after which an idle connection is closed
+    """
+
+    def __init__(self, max_per_host=10, idle_timeout=60):
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(url, timeout, insecure):
+        scheme, netloc = urlparse.urlsplit(url)[:2]
+        return (scheme.lower(), netloc.lower(), timeout, bool(insecure))
+
+    @staticmethod
+    def _new_connection(timeout, insecure):
+        # NOTE: httplib2 pulls in the ssl and email packages, so it is only
+        #       imported once a connection is actually needed.
+        import httplib2
+        http = httplib2.Http(timeout=timeout)
+        # NOTE: let socket errors propagate instead of turning them into
+        #       made-up 400 and 408 responses, so that a refused or reset
+        #       connection can be told apart from a rejected request;
+        #       HTTPClient reports them as exceptions.ConnectionError.
+        http.force_exception_to_status_code = False
+        http.disable_ssl_certificate_validation = insecure
+        return http
+
+    @staticmethod
+    def _close(http):
+        for conn in http.connections.values():
+            try:
+                conn.close()
+            except Exception:
+                pass
+        http.connections.clear()
+
+    def _evict_expired(self, idle, now):
+        """Drop connections that have been idle for too long.
+
+        Must be called with the lock held. The list is ordered from least to
+        most recently used, so expired entries are always at the front.
+        """
+        expired = []
+        while idle and now - idle[0][1] > self.idle_timeout:
+            expired.append(idle.pop(0)[0])
+        self.evictions += len(expired)
+        return expired
+
+    def acquire(self, url, timeout=None, insecure=False):
+        """Check out a connection suitable for ``url``."""
+        key = self._key(url, timeout, insecure)
+        with self._lock:
+            idle = self._idle.get(key, [])
+            expired = self._evict_expired(idle, time.time())
+            if idle:
+                self.hits += 1
+                http = idle.pop()[0]
+            else:
+                self.misses += 1
+                http = None
+
+        for stale in expired:
+            self._close(stale)
+
+        if http is None:
+            http = self._new_connection(timeout, insecure)
+        return key, http
+
+    def release(self, key, http):
+        """Return a connection to the pool, closing it if the pool is full."""
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            expired = self._evict_expired(idle, time.time())
+            if len(idle) < self.max_per_host:
+                idle.append((http, time.time()))
+                http = None
+            else:
+                self.evictions += 1
+
+        for stale in expired:
+            self._close(stale)
+        if http is not None:
+            self._close(http)
+
+    @contextlib.contextmanager
+    def connection(self, url, timeout=None, insecure=False):
+        """
+        Context manager lending out a pooled connection for ``url``.
+
+        A connection that raised while in use is closed instead of being
+        returned to the pool since its state is unknown.
+        """
+        key, http = self.acquire(url, timeout=timeout, insecure=insecure)
+        try:
+            yield http
+        except Exception:
+            self._close(http)
+            raise
+        self.release(key, http)
+
+    def clear(self):
+        """Close every idle connection held by the pool."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for entries in idle.values():
+            for http, _last_used in entries:
+                self._close(http)
+
+    def get_stats(self):
+        """Return pool hit, miss and eviction counters."""
+        with self._lock:
+            idle = sum(len(entries) for entries in self._idle.values())
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'idle': idle}
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool():
+    """Return the process-wide pool shared by clients by default."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ConnectionPool()
+        return _default_pool
@@ -1,9 +1,8 @@
+import calendar
 import os
 import re
 import sys
-import uuid
-
-import prettytable
+import time
 
 from cinderclient import exceptions
 
@@ -28,6 +27,14 @@ def env(*vars, **kwargs):
     return kwargs.get('default', '')
 
 
+def bool_from_str(val):
+    """Interpret a string such as an environment variable as a boolean:
+    1, true and yes (in any case) are true, anything else is false."""
+    if isinstance(val, bool):
+        return val
+    return str(val).strip().lower() in ('1', 'true', 'yes')
+
+
 def add_arg(f, *args, **kwargs):
     """Bind CLI arguments to a shell.py `do_foo` function."""
 
@@ -123,11 +130,8 @@ def pretty_choice_list(l):
     return ', '.join("'%s'" % i for i in l)
 
 
-def print_list(objs, fields, formatters={}):
+def _list_rows(objs, fields, formatters):
     mixed_case_fields = ['serverId']
-    pt = prettytable.PrettyTable([f for f in fields], caching=False)
-    pt.aligns = ['l' for f in fields]
-
     for o in objs:
         row = []
         for field in fields:
@@ -140,12 +144,51 @@ def print_list(objs, fields, formatters={}):
                     field_name = field.lower().replace(' ', '_')
                 data = getattr(o, field_name, '')
                 row.append(data)
+        yield row
+
+
+def _write_rows(rows, fields, output_format, sort):
+    from cinderclient import formatters as output_formatters
+    output_formatters.write(rows, fields, output_format, sys.stdout,
+                            sort=sort)
+
+
+def print_list(objs, fields, formatters={}, output_format='table',
+               sort=False):
+    """
+    Print one row per object, with a column per field.
+
+    :param output_format: 'table', or one of the streaming formats of
+                          :mod:`cinderclient.formatters`, which print each
+                          row as soon as it is produced.
+    :param sort: whether streaming formats sort by the first field. Tables
+                 are always sorted.
+    """
+    rows = _list_rows(objs, fields, formatters)
+    if output_format != 'table':
+        _write_rows(rows, fields, output_format, sort)
+        return
+
+    import prettytable
+    pt = prettytable.PrettyTable([f for f in fields], caching=False)
+    pt.aligns = ['l' for f in fields]
+    for row in rows:
         pt.add_row(row)
 
     print pt.get_string(sortby=fields[0])
 
 
-def print_dict(d, property="Property"):
+def print_dict(d, property="Property", output_format='table', sort=False):
+    """
+    Print one row per key of ``d``, in ``output_format`` as for
+    :func:`print_list`.
+    """
+    if output_format != 'table':
+        _write_rows(([k, v] for k, v in d.iteritems()), [property, 'Value'],
+                    output_format, sort)
+        return
+
+    import prettytable
     pt = prettytable.PrettyTable([property, 'Value'], caching=False)
     pt.aligns = ['l', 'l']
     [pt.add_row(list(r)) for r in d.iteritems()]
@@ -163,33 +206,28 @@ def find_resource(manager, name_or_id):
 
     # now try to get entity as uuid
     try:
+        import uuid
         uuid.UUID(str(name_or_id))
         return manager.get(name_or_id)
     except (ValueError, exceptions.NotFound):
         pass
 
-    try:
-        try:
-            return manager.find(human_id=name_or_id)
-        except exceptions.NotFound:
-            pass
-
-        # finally try to find entity by name
-        try:
-            return manager.find(name=name_or_id)
-        except exceptions.NotFound:
-            try:
-                # Volumes does not have name, but display_name
-                return manager.find(display_name=name_or_id)
-            except exceptions.NotFound:
-                msg = "No %s with a name or ID of '%s' exists." % \
-                    (manager.resource_class.__name__.lower(), name_or_id)
-                raise exceptions.CommandError(msg)
-    except exceptions.NoUniqueMatch:
-        msg = ("Multiple %s matches found for '%s', use an ID to be more"
-               " specific." % (manager.resource_class.__name__.lower(),
-                               name_or_id))
-        raise exceptions.CommandError(msg)
+    # NOTE: list once and resolve every kind of name from the same
+    #       listing rather than running one find() (and listing) per kind.
+    index = manager.build_index(name=name_or_id)
+    for attr in ('human_id', 'name', 'display_name'):
+        matches = index.lookup(attr, name_or_id)
+        if len(matches) == 1:
+            return matches[0]
+        elif len(matches) > 1:
+            msg = ("Multiple %s matches found for '%s', use an ID to be more"
+                   " specific." % (manager.resource_class.__name__.lower(),
+                                   name_or_id))
+            raise exceptions.CommandError(msg)
+
+    msg = "No %s with a name or ID of '%s' exists." % \
+        (manager.resource_class.__name__.lower(), name_or_id)
+    raise exceptions.CommandError(msg)
 
 
 def _format_servers_list_networks(server):
@@ -240,12 +278,46 @@ def import_class(import_str):
     __import__(mod_str)
     return getattr(sys.modules[mod_str], class_str)
 
+_isotime_re = re.compile(r'^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})'
+                         r'(?:\.\d+)?'
+                         r'(Z|[+-]\d{2}:?\d{2})?$')
+
+
+def parse_isotime(timestr):
+    """
+    Parse an ISO 8601 timestamp as returned by Keystone into seconds since
+    the epoch (UTC). Raises ValueError if the string cannot be parsed.
+    """
+    match = _isotime_re.match(str(timestr).strip())
+    if not match:
+        raise ValueError("Invalid ISO 8601 timestamp: %s" % timestr)
+
+    stamp, offset = match.groups()
+    seconds = calendar.timegm(time.strptime(stamp, '%Y-%m-%dT%H:%M:%S'))
+    if offset and offset != 'Z':
+        sign = -1 if offset[0] == '-' else 1
+        offset = offset[1:].replace(':', '')
+        seconds -= sign * (int(offset[:2]) * 3600 + int(offset[2:]) * 60)
+    return seconds
+
 _slugify_strip_re = re.compile(r'[^\w\s-]')
 _slugify_hyphenate_re = re.compile(r'[-\s]+')
 
 
 # http://code.activestate.com/recipes/
 #   577257-slugify-make-a-string-usable-in-a-url-or-filename/
+def safe_unicode(value):
+    """
+    ``value`` as unicode, for comparing names and IDs that may come as
+    unicode from the API or as UTF-8 bytes from the command line.
+    """
+    if isinstance(value, unicode):
+        return value
+    if isinstance(value, str):
+        return value.decode('utf-8', 'replace')
+    return unicode(value)
+
+
 def slugify(value):
     """
     Normalizes string, converts to lowercase, removes non-alpha characters,
@@ -0,0 +1,96 @@
+# Copyright 2012 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Non-blocking flavour of the Volume API client.
+"""
+
+from cinderclient import base
+from cinderclient import executor
+from cinderclient.v1 import client
+
+
+class AsyncManager(object):
+    """
+    Wraps a regular manager so that each of its public methods returns a
+    :class:`cinderclient.executor.Future` instead of blocking.
+
+    Results are the same :class:`cinderclient.base.Resource` objects and
+    failures the same :mod:`cinderclient.exceptions` the wrapped manager
+    would produce; they are delivered through ``future.result()``.
+    """
+
+    def __init__(self, manager, executor):
+        self.manager = manager
+        self._executor = executor
+
+    def __getattr__(self, name):
+        if name == 'manager':
+            raise AttributeError(name)
+        attr = getattr(self.manager, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        def submit(*args, **kwargs):
+            return self._executor.submit(attr, *args, **kwargs)
+
+        submit.__name__ = name
+        submit.__doc__ = attr.__doc__
+        return submit
+
+    def __repr__(self):
+        return "<AsyncManager %r>" % self.manager
+
+
+class AsyncClient(object):
+    """
+    Top-level object to access the OpenStack Volume API without blocking.
+
+    Takes the same arguments as :class:`cinderclient.v1.client.Client`,
+    plus ``max_workers`` to bound how many requests are in flight::
+
+        >>> client = AsyncClient(USERNAME, PASSWORD, PROJECT_ID, AUTH_URL)
+        >>> futures = [client.volumes.get(id) for id in volume_ids]
+        >>> volumes = [f.result() for f in futures]
+
+    Requests run on a shared worker pool over pooled keep-alive
+    connections, so thousands of calls can be fanned out from one process.
+    Callbacks can be attached with ``future.add_done_callback()`` to hand
+    results back to an event loop.
+    """
+
+    def __init__(self, *args, **kwargs):
+        max_workers = kwargs.pop('max_workers', 10)
+        self.sync_client = (kwargs.pop('sync_client', None) or
+                            client.Client(*args, **kwargs))
+        self.executor = executor.Executor(max_workers)
+
+    def __getattr__(self, name):
+        if name == 'sync_client':
+            raise AttributeError(name)
+        attr = getattr(self.sync_client, name)
+        if isinstance(attr, base.Manager):
+            attr = AsyncManager(attr, self.executor)
+            # NOTE: cache the wrapper so later lookups skip __getattr__.
+            setattr(self, name, attr)
+        return attr
+
+    def authenticate(self):
+        """Authenticate in the background; returns a future."""
+        return self.executor.submit(self.sync_client.authenticate)
+
+    def close(self):
+        """Wait for outstanding requests and stop the worker threads."""
+        self.executor.shutdown()
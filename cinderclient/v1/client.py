@@ -1,10 +1,8 @@
+import sys
+import threading
+
 from cinderclient import client
-from cinderclient.v1 import limits
-from cinderclient.v1 import quota_classes
-from cinderclient.v1 import quotas
-from cinderclient.v1 import volumes
-from cinderclient.v1 import volume_snapshots
-from cinderclient.v1 import volume_types
+from cinderclient import throttle
 
 
 class Client(object):
@@ -24,30 +22,46 @@ class Client(object):
 
     """
 
+    # Managers are created, and their modules imported, on first access.
+    MANAGERS = {
+        'limits': ('cinderclient.v1.limits', 'LimitsManager'),
+        'volumes': ('cinderclient.v1.volumes', 'VolumeManager'),
+        'volume_snapshots': ('cinderclient.v1.volume_snapshots',
+                             'SnapshotManager'),
+        'volume_types': ('cinderclient.v1.volume_types', 'VolumeTypeManager'),
+        'quota_classes': ('cinderclient.v1.quota_classes',
+                          'QuotaClassSetManager'),
+        'quotas': ('cinderclient.v1.quotas', 'QuotaSetManager'),
+    }
+
     def __init__(self, username, api_key, project_id=None, auth_url='',
                  insecure=False, timeout=None, tenant_id=None,
                  proxy_tenant_id=None, proxy_token=None, region_name=None,
                  endpoint_type='publicURL', extensions=None,
                  service_type='volume', service_name=None,
-                 volume_service_name=None):
+                 volume_service_name=None, connection_pool=None,
+                 token_refresh_margin=None, auth_cache=None,
+                 completion_cache=None, compact_resources=False,
+                 rate_limit_refresh=None, retry_policy=None,
+                 listeners=None, request_log=None, response_cache=None):
         # FIXME(comstud): Rename the api_key argument above when we
         # know it's not being used as keyword argument
         password = api_key
-        self.limits = limits.LimitsManager(self)
-
-        # extensions
-        self.volumes = volumes.VolumeManager(self)
-        self.volume_snapshots = volume_snapshots.SnapshotManager(self)
-        self.volume_types = volume_types.VolumeTypeManager(self)
-        self.quota_classes = quota_classes.QuotaClassSetManager(self)
-        self.quotas = quotas.QuotaSetManager(self)
+        # NOTE: re-entrant, since a manager may touch another one while it
+        # is being built.
+        self._managers_lock = threading.RLock()
+        # NOTE: a cinderclient.completion_cache.CompletionCache; listings
+        # and creates only touch the disk when one is given.
+        self.completion_cache = completion_cache
+        # NOTE: build resources from Resource.compact_class(), which keeps
+        # their attributes in _info only.
+        self.compact_resources = compact_resources
 
         # Add in any extensions...
-        if extensions:
-            for extension in extensions:
-                if extension.manager_class:
-                    setattr(self, extension.name,
-                            extension.manager_class(self))
+        self._extensions = {}
+        for extension in extensions or []:
+            if extension.has_manager:
+                self._extensions[extension.name] = extension
 
         self.client = client.HTTPClient(
             username,
@@ -63,7 +77,44 @@ class Client(object):
             endpoint_type=endpoint_type,
             service_type=service_type,
             service_name=service_name,
-            volume_service_name=volume_service_name)
+            volume_service_name=volume_service_name,
+            connection_pool=connection_pool,
+            token_refresh_margin=token_refresh_margin,
+            auth_cache=auth_cache,
+            retry_policy=retry_policy,
+            listeners=listeners,
+            request_log=request_log,
+            response_cache=response_cache)
+
+        # NOTE: pace requests to stay within the server's rate limits,
+        # fetched on the first request and again every rate_limit_refresh
+        # seconds.
+        if rate_limit_refresh is not None:
+            self.client.rate_limiter = throttle.RateLimiter(
+                self._fetch_rate_limits, refresh_interval=rate_limit_refresh)
+
+    def _fetch_rate_limits(self):
+        return self.limits.get().rate
+
+    def __getattr__(self, name):
+        extension = self.__dict__.get('_extensions', {}).get(name)
+        if extension is not None:
+            manager_class = extension.manager_class
+        elif name in self.MANAGERS:
+            module_name, class_name = self.MANAGERS[name]
+            __import__(module_name)
+            manager_class = getattr(sys.modules[module_name], class_name)
+        else:
+            raise AttributeError(name)
+
+        with self._managers_lock:
+            # NOTE: another thread may have built it while we waited.
+            manager = self.__dict__.get(name)
+            if manager is None:
+                manager = manager_class(self)
+                # NOTE: cache the manager so later lookups skip __getattr__.
+                setattr(self, name, manager)
+        return manager
 
     def authenticate(self):
         """
@@ -65,12 +65,17 @@ def _find_volume_snapshot(cs, snapshot):
     return utils.find_resource(cs.volume_snapshots, snapshot)
 
 
-def _print_volume(volume):
-    utils.print_dict(volume._info)
+def _output(args):
+    """print_list and print_dict arguments from --format and --sort."""
+    return {'output_format': args.format, 'sort': args.sort}
 
 
-def _print_volume_snapshot(snapshot):
-    utils.print_dict(snapshot._info)
+def _print_volume(volume, args):
+    utils.print_dict(volume._info, **_output(args))
+
+
+def _print_volume_snapshot(snapshot, args):
+    utils.print_dict(snapshot._info, **_output(args))
 
 
 def _translate_volume_keys(collection):
@@ -136,15 +141,21 @@ def do_list(cs, args):
         'display_name': args.display_name,
         'status': args.status,
     }
-    volumes = cs.volumes.list(search_opts=search_opts)
-    _translate_volume_keys(volumes)
+    volumes = cs.volumes.list_iter(search_opts=search_opts,
+                                   cache_completions=True)
+
+    # NOTE: rows are prepared one at a time, so that streaming formats
+    #       print each page as it arrives.
+    def rows():
+        for vol in volumes:
+            _translate_volume_keys([vol])
+            # The servers to which the volume is attached
+            servers = [s.get('server_id') for s in vol.attachments]
+            setattr(vol, 'attached_to', ','.join(map(str, servers)))
+            yield vol
 
-    # Create a list of servers to which the volume is attached
-    for vol in volumes:
-        servers = [s.get('server_id') for s in vol.attachments]
-        setattr(vol, 'attached_to', ','.join(map(str, servers)))
-    utils.print_list(volumes, ['ID', 'Status', 'Display Name',
-                     'Size', 'Volume Type', 'Attached to'])
+    utils.print_list(rows(), ['ID', 'Status', 'Display Name',
+                     'Size', 'Volume Type', 'Attached to'], **_output(args))
 
 
 @utils.arg('volume', metavar='<volume>', help='ID of the volume.')
@@ -152,7 +163,7 @@ def do_list(cs, args):
 def do_show(cs, args):
     """Show details about a volume."""
     volume = _find_volume(cs, args.volume)
-    _print_volume(volume)
+    _print_volume(volume, args)
 
 
 @utils.arg('size',
@@ -221,15 +232,21 @@ def do_create(cs, args):
     if args.metadata is not None:
         volume_metadata = _extract_metadata(args.metadata)
 
+    # NOTE: check the type before creating anything; it may be given by
+    #       ID, but the API expects its name.
+    volume_type = None
+    if args.volume_type is not None:
+        volume_type = cs.volume_types.resolve(args.volume_type).name
+
     volume = cs.volumes.create(args.size,
                                args.snapshot_id,
                                args.display_name,
                                args.display_description,
-                               args.volume_type,
+                               volume_type,
                                availability_zone=args.availability_zone,
                                imageRef=args.image_id,
                                metadata=volume_metadata)
-    _print_volume(volume)
+    _print_volume(volume, args)
 
 
 @utils.arg('volume', metavar='<volume>', help='ID of the volume to delete.')
@@ -281,10 +298,17 @@ def do_snapshot_list(cs, args):
         'volume_id': args.volume_id,
     }
 
-    snapshots = cs.volume_snapshots.list(search_opts=search_opts)
-    _translate_volume_snapshot_keys(snapshots)
-    utils.print_list(snapshots,
-                     ['ID', 'Volume ID', 'Status', 'Display Name', 'Size'])
+    snapshots = cs.volume_snapshots.list_iter(search_opts=search_opts,
+                                              cache_completions=True)
+
+    def rows():
+        for snapshot in snapshots:
+            _translate_volume_snapshot_keys([snapshot])
+            yield snapshot
+
+    utils.print_list(rows(),
+                     ['ID', 'Volume ID', 'Status', 'Display Name', 'Size'],
+                     **_output(args))
 
 
 @utils.arg('snapshot', metavar='<snapshot>', help='ID of the snapshot.')
@@ -292,7 +316,7 @@ def do_snapshot_list(cs, args):
 def do_snapshot_show(cs, args):
     """Show details about a snapshot."""
     snapshot = _find_volume_snapshot(cs, args.snapshot)
-    _print_volume_snapshot(snapshot)
+    _print_volume_snapshot(snapshot, args)
 
 
 @utils.arg('volume_id',
@@ -327,7 +351,7 @@ def do_snapshot_create(cs, args):
                                           args.force,
                                           args.display_name,
                                           args.display_description)
-    _print_volume_snapshot(snapshot)
+    _print_volume_snapshot(snapshot, args)
 
 
 @utils.arg('snapshot_id',
@@ -340,15 +364,15 @@ def do_snapshot_delete(cs, args):
     snapshot.delete()
 
 
-def _print_volume_type_list(vtypes):
-    utils.print_list(vtypes, ['ID', 'Name'])
+def _print_volume_type_list(vtypes, args):
+    utils.print_list(vtypes, ['ID', 'Name'], **_output(args))
 
 
 @utils.service_type('volume')
 def do_type_list(cs, args):
     """Print a list of available 'volume types'."""
     vtypes = cs.volume_types.list()
-    _print_volume_type_list(vtypes)
+    _print_volume_type_list(vtypes, args)
 
 
 @utils.arg('name',
@@ -358,7 +382,7 @@ def do_type_list(cs, args):
 def do_type_create(cs, args):
     """Create a new volume type."""
     vtype = cs.volume_types.create(args.name)
-    _print_volume_type_list([vtype])
+    _print_volume_type_list([vtype], args)
 
 
 @utils.arg('id',
@@ -374,23 +398,24 @@ def do_endpoints(cs, args):
     """Discover endpoints that get returned from the authenticate services"""
     catalog = cs.client.service_catalog.catalog
     for e in catalog['access']['serviceCatalog']:
-        utils.print_dict(e['endpoints'][0], e['name'])
+        utils.print_dict(e['endpoints'][0], e['name'], **_output(args))
 
 
 def do_credentials(cs, args):
     """Show user credentials returned from auth"""
     catalog = cs.client.service_catalog.catalog
-    utils.print_dict(catalog['access']['user'], "User Credentials")
-    utils.print_dict(catalog['access']['token'], "Token")
+    utils.print_dict(catalog['access']['user'], "User Credentials",
+                     **_output(args))
+    utils.print_dict(catalog['access']['token'], "Token", **_output(args))
 
 _quota_resources = ['volumes', 'gigabytes']
 
 
-def _quota_show(quotas):
+def _quota_show(quotas, args):
     quota_dict = {}
     for resource in _quota_resources:
         quota_dict[resource] = getattr(quotas, resource, None)
-    utils.print_dict(quota_dict)
+    utils.print_dict(quota_dict, **_output(args))
 
 
 def _quota_update(manager, identifier, args):
@@ -410,7 +435,7 @@ def _quota_update(manager, identifier, args):
 def do_quota_show(cs, args):
     """List the quotas for a tenant."""
 
-    _quota_show(cs.quotas.get(args.tenant))
+    _quota_show(cs.quotas.get(args.tenant), args)
 
 
 @utils.arg('tenant', metavar='<tenant_id>',
@@ -419,7 +444,7 @@ def do_quota_show(cs, args):
 def do_quota_defaults(cs, args):
     """List the default quotas for a tenant."""
 
-    _quota_show(cs.quotas.defaults(args.tenant))
+    _quota_show(cs.quotas.defaults(args.tenant), args)
 
 
 @utils.arg('tenant', metavar='<tenant_id>',
@@ -445,7 +470,7 @@ def do_quota_update(cs, args):
 def do_quota_class_show(cs, args):
     """List the quotas for a quota class."""
 
-    _quota_show(cs.quota_classes.get(args.class_name))
+    _quota_show(cs.quota_classes.get(args.class_name), args)
 
 
 @utils.arg('class_name', metavar='<class>',
@@ -470,7 +495,7 @@ def do_absolute_limits(cs, args):
     """Print a list of absolute limits for a user"""
     limits = cs.limits.get().absolute
     columns = ['Name', 'Value']
-    utils.print_list(limits, columns)
+    utils.print_list(limits, columns, **_output(args))
 
 
 @utils.service_type('volume')
@@ -478,4 +503,4 @@ def do_rate_limits(cs, args):
     """Print a list of rate limits for a user"""
     limits = cs.limits.get().rate
     columns = ['Verb', 'URI', 'Value', 'Remain', 'Unit', 'Next_Available']
-    utils.print_list(limits, columns)
+    utils.print_list(limits, columns, **_output(args))
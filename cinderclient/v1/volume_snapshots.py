@@ -19,6 +19,7 @@ Volume snapshot interface (1.1 extension).
 
 import urllib
 from cinderclient import base
+from cinderclient import table
 
 
 class Snapshot(base.Resource):
@@ -43,11 +44,25 @@ class Snapshot(base.Resource):
         return self._info.get('os-extended-snapshot-attributes:project_id')
 
 
+class SnapshotTable(table.ResultTable):
+    """
+    Columns of a :class:`Snapshot` listing, for aggregating over many
+    snapshots.
+    """
+    COLUMNS = (('id', table.TEXT),
+               ('display_name', table.TEXT),
+               ('status', table.CATEGORY),
+               ('size', table.INTEGER),
+               ('volume_id', table.TEXT),
+               ('created_at', table.TEXT))
+
+
 class SnapshotManager(base.ManagerWithFind):
     """
     Manage :class:`Snapshot` resources.
     """
     resource_class = Snapshot
+    name_filter = "display_name"
 
     def create(self, volume_id, force=False,
                display_name=None, display_description=None):
@@ -77,10 +92,12 @@ class SnapshotManager(base.ManagerWithFind):
         """
         return self._get("/snapshots/%s" % snapshot_id, "snapshot")
 
-    def list(self, detailed=True, search_opts=None):
+    def list(self, detailed=True, search_opts=None, as_table=False):
         """
         Get a list of all snapshots.
 
+        :param as_table: Return a :class:`SnapshotTable` instead of
+                         one :class:`Snapshot` per item.
         :rtype: list of :class:`Snapshot`
         """
 
@@ -99,8 +116,37 @@ class SnapshotManager(base.ManagerWithFind):
         if detailed:
             detail = "/detail"
 
-        return self._list("/snapshots%s%s" % (detail, query_string),
-                          "snapshots")
+        url = "/snapshots%s%s" % (detail, query_string)
+        if as_table:
+            return self._list_table(url, "snapshots", SnapshotTable)
+        return self._list(url, "snapshots")
+
+    def list_iter(self, detailed=True, search_opts=None, page_size=1000,
+                  cache_completions=False):
+        """
+        Iterate over all snapshots, fetching them a page at a time.
+
+        Unlike :meth:`list`, results are yielded as each page arrives and
+        memory use is bounded by ``page_size``.
+
+        :param page_size: Number of snapshots requested per page.
+        :param cache_completions: Refresh the completion cache, as
+                                  :meth:`list` does, once every page has
+                                  been read.
+        :rtype: iterator of :class:`Snapshot`
+        """
+        qparams = {}
+
+        for opt, val in (search_opts or {}).iteritems():
+            if val:
+                qparams[opt] = val
+
+        detail = ""
+        if detailed:
+            detail = "/detail"
+
+        return self._list_iter("/snapshots%s" % detail, "snapshots", qparams,
+                               page_size, cache_completions=cache_completions)
 
     def delete(self, snapshot):
         """
@@ -109,3 +155,25 @@ class SnapshotManager(base.ManagerWithFind):
         :param snapshot: The :class:`Snapshot` to delete.
         """
         self._delete("/snapshots/%s" % base.getid(snapshot))
+
+    def get_many(self, snapshots, concurrency=10):
+        """
+        Get several snapshots concurrently.
+
+        :param snapshots: IDs or :class:`Snapshot` objects to get.
+        :param concurrency: Maximum number of requests in flight at once.
+        :rtype: list of :class:`cinderclient.base.BatchResult` whose
+                ``result`` is the :class:`Snapshot`
+        """
+        return self._run_many(lambda snapshot: self.get(base.getid(snapshot)),
+                              snapshots, concurrency)
+
+    def delete_many(self, snapshots, concurrency=10):
+        """
+        Delete several snapshots concurrently.
+
+        :param snapshots: IDs or :class:`Snapshot` objects to delete.
+        :param concurrency: Maximum number of requests in flight at once.
+        :rtype: list of :class:`cinderclient.base.BatchResult`
+        """
+        return self._run_many(self.delete, snapshots, concurrency)
@@ -18,7 +18,12 @@
 Volume Type interface.
 """
 
+import threading
+import time
+
 from cinderclient import base
+from cinderclient import exceptions
+from cinderclient import utils
 
 
 class VolumeType(base.Resource):
@@ -29,19 +34,112 @@ class VolumeType(base.Resource):
         return "<Volume Type: %s>" % self.name
 
 
+class VolumeTypeRegistry(object):
+    """
+    The volume types known at one point in time, indexed by ID and name.
+    """
+
+    def __init__(self, volume_types):
+        self.by_id = {}
+        self.by_name = {}
+        for volume_type in volume_types:
+            self.by_id[utils.safe_unicode(volume_type.id)] = volume_type
+            self.by_name[utils.safe_unicode(volume_type.name)] = volume_type
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __iter__(self):
+        return self.by_id.itervalues()
+
+    def get(self, name_or_id):
+        """The :class:`VolumeType` with this ID or name, or None."""
+        key = utils.safe_unicode(base.getid(name_or_id))
+        volume_type = self.by_id.get(key)
+        if volume_type is None:
+            volume_type = self.by_name.get(key)
+        return volume_type
+
+
 class VolumeTypeManager(base.ManagerWithFind):
     """
     Manage :class:`VolumeType` resources.
     """
     resource_class = VolumeType
 
+    # Seconds the registry of volume types is reused before being fetched
+    # again.
+    registry_ttl = 300
+
+    def __init__(self, api):
+        super(VolumeTypeManager, self).__init__(api)
+        self._registry = None
+        self._registry_expires = 0
+        self._registry_lock = threading.Lock()
+
     def list(self):
         """
         Get a list of all volume types.
 
+        The result also refreshes the registry used by :meth:`resolve`.
+
         :rtype: list of :class:`VolumeType`.
         """
-        return self._list("/types", "volume_types")
+        return self._fetch()[0]
+
+    def _fetch(self):
+        volume_types = self._list("/types", "volume_types")
+        registry = VolumeTypeRegistry(volume_types)
+        with self._registry_lock:
+            self._registry = registry
+            self._registry_expires = time.time() + self.registry_ttl
+        return volume_types, registry
+
+    def registry(self, refresh=False):
+        """
+        Return the :class:`VolumeTypeRegistry`, fetching the volume types
+        only if it is missing, older than ``registry_ttl`` or ``refresh``
+        is given.
+
+        A refresh always asks the server: the types are dropped from the
+        client's response cache first, if it has one.
+        """
+        with self._registry_lock:
+            registry = self._registry
+            if registry is not None and not refresh and \
+                    time.time() < self._registry_expires:
+                return registry
+        if refresh:
+            response_cache = getattr(self.api.client, 'response_cache', None)
+            if response_cache is not None:
+                response_cache.invalidate('/types')
+        return self._fetch()[1]
+
+    def invalidate(self):
+        """Fetch the volume types again on the next lookup."""
+        with self._registry_lock:
+            self._registry = None
+
+    def resolve(self, name_or_id):
+        """
+        Return the :class:`VolumeType` with this ID or name.
+
+        Lookups are answered from the registry; an unknown type only
+        causes the types to be fetched again once, in case it was created
+        since.
+
+        :raises: :exc:`exceptions.NotFound` if there is no such type.
+        """
+        with self._registry_lock:
+            reloaded = (self._registry is None or
+                        time.time() >= self._registry_expires)
+        volume_type = self.registry().get(name_or_id)
+        if volume_type is None and not reloaded:
+            volume_type = self.registry(refresh=True).get(name_or_id)
+        if volume_type is None:
+            raise exceptions.NotFound(404, "Volume type %s not found" %
+                                      name_or_id)
+        return volume_type
 
     def get(self, volume_type):
         """
@@ -59,6 +157,7 @@ class VolumeTypeManager(base.ManagerWithFind):
         :param volume_type: The ID of the :class:`VolumeType` to get.
         """
         self._delete("/types/%s" % base.getid(volume_type))
+        self.invalidate()
 
     def create(self, name):
         """
@@ -74,4 +173,6 @@ class VolumeTypeManager(base.ManagerWithFind):
             }
         }
 
-        return self._create("/types", body, "volume_type")
+        volume_type = self._create("/types", body, "volume_type")
+        self.invalidate()
+        return volume_type
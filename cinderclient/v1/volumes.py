@@ -17,8 +17,13 @@
 Volume interface (1.1 extension).
 """
 
+import time
 import urllib
+
 from cinderclient import base
+from cinderclient import exceptions
+from cinderclient import table
+from cinderclient.v1 import waiter
 
 
 class Volume(base.Resource):
@@ -90,11 +95,45 @@ class Volume(base.Resource):
         return self.manager.terminate_connection(self, connector)
 
 
+class VolumeTable(table.ResultTable):
+    """
+    Columns of a :class:`Volume` listing, for aggregating over many volumes.
+    """
+    COLUMNS = (('id', table.TEXT),
+               ('display_name', table.TEXT),
+               ('status', table.CATEGORY),
+               ('size', table.INTEGER),
+               ('volume_type', table.CATEGORY),
+               ('availability_zone', table.CATEGORY),
+               ('attach_status', table.CATEGORY),
+               ('snapshot_id', table.TEXT),
+               ('created_at', table.TEXT))
+
+
+class CreateResult(base.BatchResult):
+    """
+    Outcome of one volume of :meth:`VolumeManager.create_many`.
+
+    When the batch waited for the volumes, ``status`` is the one each
+    settled in and ``ready_after`` the seconds from the start of the batch
+    until then. A volume that ended in error has a
+    :class:`cinderclient.exceptions.ResourceInErrorState` as
+    ``exception``, and one still pending at the deadline the
+    :class:`cinderclient.exceptions.WaitTimeout`; neither is ``ok``.
+    """
+
+    def __init__(self, item, result=None, exception=None, elapsed=None):
+        super(CreateResult, self).__init__(item, result, exception, elapsed)
+        self.status = None
+        self.ready_after = None
+
+
 class VolumeManager(base.ManagerWithFind):
     """
     Manage :class:`Volume` resources.
     """
     resource_class = Volume
+    name_filter = "display_name"
 
     def create(self, size, snapshot_id=None,
                display_name=None, display_description=None,
@@ -146,10 +185,12 @@ class VolumeManager(base.ManagerWithFind):
         """
         return self._get("/volumes/%s" % volume_id, "volume")
 
-    def list(self, detailed=True, search_opts=None):
+    def list(self, detailed=True, search_opts=None, as_table=False):
         """
         Get a list of all volumes.
 
+        :param as_table: Return a :class:`VolumeTable` instead of
+                         one :class:`Volume` per item.
         :rtype: list of :class:`Volume`
         """
         if search_opts is None:
@@ -167,8 +208,37 @@ class VolumeManager(base.ManagerWithFind):
         if detailed:
             detail = "/detail"
 
-        return self._list("/volumes%s%s" % (detail, query_string),
-                          "volumes")
+        url = "/volumes%s%s" % (detail, query_string)
+        if as_table:
+            return self._list_table(url, "volumes", VolumeTable)
+        return self._list(url, "volumes")
+
+    def list_iter(self, detailed=True, search_opts=None, page_size=1000,
+                  cache_completions=False):
+        """
+        Iterate over all volumes, fetching them a page at a time.
+
+        Unlike :meth:`list`, results are yielded as each page arrives and
+        memory use is bounded by ``page_size``.
+
+        :param page_size: Number of volumes requested per page.
+        :param cache_completions: Refresh the completion cache, as
+                                  :meth:`list` does, once every page has
+                                  been read.
+        :rtype: iterator of :class:`Volume`
+        """
+        qparams = {}
+
+        for opt, val in (search_opts or {}).iteritems():
+            if val:
+                qparams[opt] = val
+
+        detail = ""
+        if detailed:
+            detail = "/detail"
+
+        return self._list_iter("/volumes%s" % detail, "volumes", qparams,
+                               page_size, cache_completions=cache_completions)
 
     def delete(self, volume):
         """
@@ -178,6 +248,168 @@ class VolumeManager(base.ManagerWithFind):
         """
         self._delete("/volumes/%s" % base.getid(volume))
 
+    def get_many(self, volumes, concurrency=10):
+        """
+        Get several volumes concurrently.
+
+        :param volumes: IDs or :class:`Volume` objects to get.
+        :param concurrency: Maximum number of requests in flight at once.
+        :rtype: list of :class:`cinderclient.base.BatchResult` whose
+                ``result`` is the :class:`Volume`
+        """
+        return self._run_many(lambda volume: self.get(base.getid(volume)),
+                              volumes, concurrency)
+
+    def delete_many(self, volumes, concurrency=10):
+        """
+        Delete several volumes concurrently.
+
+        :param volumes: IDs or :class:`Volume` objects to delete.
+        :param concurrency: Maximum number of requests in flight at once.
+        :rtype: list of :class:`cinderclient.base.BatchResult`
+        """
+        return self._run_many(self.delete, volumes, concurrency)
+
+    def quota_available(self, tenant_id=None):
+        """
+        Return how many more volumes and gigabytes can be created, as a
+        dict with 'volumes' and 'gigabytes' keys; an unlimited resource is
+        left out.
+
+        Usage comes from the absolute limits, which only report it for the
+        tenant authenticated as. The quota set of that tenant is also
+        honoured when its ID is known.
+
+        :raises: ValueError if ``tenant_id`` is another tenant, whose usage
+                 cannot be known.
+        """
+        own_tenant_id = self._own_tenant_id()
+        if tenant_id is not None and tenant_id != own_tenant_id and \
+                tenant_id != getattr(self.api.client, 'projectid', None):
+            raise ValueError("Usage of tenant %s is unknown: the limits "
+                             "only report that of the tenant authenticated "
+                             "as" % tenant_id)
+
+        absolute = dict((limit.name, limit.value)
+                        for limit in self.api.limits.get().absolute)
+        used = {'volumes': absolute.get('totalVolumesUsed') or 0,
+                'gigabytes': absolute.get('totalGigabytesUsed') or 0}
+        maxima = {'volumes': [absolute.get('maxTotalVolumes')],
+                  'gigabytes': [absolute.get('maxTotalVolumeGigabytes')]}
+
+        tenant_id = own_tenant_id or tenant_id
+        if tenant_id:
+            quota = self.api.quotas.get(tenant_id)
+            for key in maxima:
+                maxima[key].append(getattr(quota, key, None))
+
+        available = {}
+        for key, values in maxima.items():
+            # NOTE: -1 means unlimited.
+            values = [value for value in values
+                      if value is not None and value >= 0]
+            if values:
+                available[key] = max(min(values) - used[key], 0)
+        return available
+
+    def _own_tenant_id(self):
+        """ID of the tenant authenticated as, if known."""
+        client = self.api.client
+        tenant_id = getattr(client, 'tenant_id', None)
+        if tenant_id:
+            return tenant_id
+        catalog = getattr(client, 'service_catalog', None)
+        try:
+            return catalog.catalog['access']['token']['tenant']['id']
+        except (AttributeError, KeyError, TypeError):
+            return None
+
+    def create_many(self, specs, concurrency=10, tenant_id=None,
+                    check_quota=True, wait=False, timeout=None,
+                    poll_period=1):
+        """
+        Create several volumes concurrently.
+
+        Before anything is created, the volume types named by the specs
+        are checked to exist and, with ``check_quota``, the total count
+        and size of the batch are checked against :meth:`quota_available`.
+
+        :param specs: dicts of :meth:`create` arguments, one per volume.
+        :param concurrency: Maximum number of requests in flight at once.
+        :param tenant_id: Tenant whose quota applies; only the one
+                          authenticated as can be checked, see
+                          :meth:`quota_available`.
+        :param wait: Wait until every created volume is available or in
+                     error, polling them all with one listing at a time.
+        :param timeout: Seconds to wait for, or None to wait forever.
+        :rtype: list of :class:`CreateResult`, in the order of ``specs``
+        :raises: :exc:`exceptions.QuotaExceeded` if the batch does not fit
+                 in the quota; :exc:`exceptions.NotFound` for an unknown
+                 volume type.
+
+        Volume types may be given by ID or name; the specs are sent with
+        the name, which the API expects. Errors while waiting are recorded
+        on the volumes still pending, so every created volume is reported.
+        """
+        specs = [dict(spec) for spec in specs]
+        if not specs:
+            return []
+
+        type_names = {}
+        for spec in specs:
+            volume_type = spec.get('volume_type')
+            if volume_type:
+                if volume_type not in type_names:
+                    type_names[volume_type] = \
+                        self.api.volume_types.resolve(volume_type).name
+                spec['volume_type'] = type_names[volume_type]
+
+        if check_quota:
+            requested = {'volumes': len(specs),
+                         'gigabytes': sum(int(spec['size'])
+                                          for spec in specs)}
+            available = self.quota_available(tenant_id)
+            for key in available:
+                if requested[key] > available[key]:
+                    raise exceptions.QuotaExceeded(requested, available)
+
+        start = time.time()
+        results = [CreateResult(r.item, r.result, r.exception, r.elapsed)
+                   for r in self._run_many(lambda spec: self.create(**spec),
+                                           specs, concurrency)]
+        if wait:
+            self._wait_created(results, start, timeout, poll_period)
+        return results
+
+    def _wait_created(self, results, start, timeout, poll_period):
+        by_id = dict((str(result.result.id), result)
+                     for result in results if result.ok)
+        if not by_id:
+            return
+        status_waiter = waiter.StatusWaiter(
+            self, [result.result for result in by_id.itervalues()],
+            final_ok_states=('available',),
+            error_states=('error',), timeout=timeout,
+            poll_period=poll_period)
+        try:
+            for volume, status in status_waiter.wait():
+                result = by_id[str(base.getid(volume))]
+                result.result = volume
+                result.status = status
+                result.ready_after = time.time() - start
+                if status != 'available':
+                    result.exception = exceptions.ResourceInErrorState(
+                        volume, status)
+        except exceptions.WaitTimeout, e:
+            for volume in e.pending:
+                by_id[str(base.getid(volume))].exception = e
+        except Exception, e:
+            # NOTE: the volumes exist by now; report the failed poll on
+            #       each of those still pending rather than losing them all.
+            for result in by_id.itervalues():
+                if result.status is None:
+                    result.exception = e
+
     def create_server_volume(self, server_id, volume_id, device):
         """
         Attach a volume identified by the volume ID to the given server ID
@@ -0,0 +1,138 @@
+# Copyright 2012 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Wait for many volumes or snapshots to reach a final status at once.
+"""
+
+import random
+import time
+
+from cinderclient import base
+from cinderclient import exceptions
+
+
+class StatusWaiter(object):
+    """
+    Tracks the status of many volumes or snapshots with a single detailed
+    listing per tick, instead of one GET per object.
+
+    Polling starts every ``poll_period`` seconds and backs off by
+    ``backoff`` up to ``max_poll_period`` while nothing changes, with
+    +/- ``jitter`` randomisation so that many waiters do not poll in step.
+
+    :param manager: a :class:`cinderclient.v1.volumes.VolumeManager` or
+                    :class:`cinderclient.v1.volume_snapshots.SnapshotManager`
+    :param resources: IDs or resources to wait for
+    :param final_ok_states: statuses meaning the wait succeeded; include
+                            ``'deleted'`` to wait for objects to disappear
+    :param error_states: statuses meaning the wait failed; objects that
+                         vanish settle as ``'deleted'``, which is a failure
+                         unless it is one of ``final_ok_states``
+    :param timeout: overall deadline in seconds, or None to wait forever
+    :param search_opts: extra listing filters, e.g. ``{'all_tenants': 1}``
+    """
+
+    def __init__(self, manager, resources, final_ok_states=('available',),
+                 error_states=('error',), timeout=None, poll_period=1,
+                 max_poll_period=30, backoff=1.5, jitter=0.1,
+                 search_opts=None):
+        self.manager = manager
+        self.resources = list(resources)
+        self.final_ok_states = tuple(s.lower() for s in final_ok_states)
+        self.error_states = tuple(s.lower() for s in error_states)
+        self.timeout = timeout
+        self.poll_period = poll_period
+        self.max_poll_period = max_poll_period
+        self.backoff = backoff
+        self.jitter = jitter
+        self.search_opts = search_opts or {}
+
+    def _poll(self, pending):
+        # NOTE: the listing is never filtered on status: an object missing
+        #       from a filtered listing could equally have vanished or just
+        #       not be there yet, and vanished objects must settle.
+        #       The server caps plain listings, so page through them when
+        #       the manager supports it.
+        list_fn = getattr(self.manager, 'list_iter', self.manager.list)
+        found = {}
+        for obj in list_fn(search_opts=dict(self.search_opts)):
+            found[str(obj.id)] = obj
+
+        settled = []
+        for key, orig in pending.items():
+            obj = found.get(key)
+            if obj is None:
+                # Gone from the listing: a success when waiting for
+                # deletion, a failure for anything else.
+                settled.append((key, orig, 'deleted'))
+                continue
+
+            status = obj.status.lower()
+            if status in self.final_ok_states or status in self.error_states:
+                settled.append((key, obj, status))
+        return settled
+
+    def wait(self):
+        """
+        Generator yielding ``(resource, status)`` as each object settles.
+
+        The resource is the freshly listed one, or what was passed in for
+        objects that vanished, whose status is ``'deleted'``. Raises
+        :class:`cinderclient.exceptions.WaitTimeout` carrying the objects
+        still pending if the deadline passes first.
+        """
+        pending = {}
+        for resource in self.resources:
+            pending[str(base.getid(resource))] = resource
+
+        deadline = None
+        if self.timeout is not None:
+            deadline = time.time() + self.timeout
+        interval = self.poll_period
+
+        while pending:
+            settled = self._poll(pending)
+            for key, obj, status in settled:
+                del pending[key]
+                yield obj, status
+
+            if not pending:
+                break
+
+            if settled:
+                interval = self.poll_period
+            else:
+                interval = min(interval * self.backoff, self.max_poll_period)
+            delay = interval * random.uniform(1 - self.jitter,
+                                              1 + self.jitter)
+
+            if deadline is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise exceptions.WaitTimeout(pending.values())
+                delay = min(delay, remaining)
+            time.sleep(delay)
+
+    def wait_all(self):
+        """Wait for every object and return a dict of ID to final status."""
+        return dict((base.getid(obj), status) for obj, status in self.wait())
+
+
+def wait_for_status(manager, resources, final_ok_states=('available',),
+                    **kwargs):
+    """Shortcut for ``StatusWaiter(...).wait_all()``."""
+    return StatusWaiter(manager, resources, final_ok_states,
+                        **kwargs).wait_all()
@@ -0,0 +1,71 @@
+import httplib2
+import mock
+import os
+import shutil
+import stat
+import tempfile
+
+from cinderclient import auth_cache
+from cinderclient import client
+from tests import utils
+
+
+class AuthCacheTest(utils.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = auth_cache.AuthCache(os.path.join(self.cache_dir, 'c'))
+        self.key = self.cache.make_key('http://auth/v2.0', 'user', 'tenant')
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_roundtrip(self):
+        self.assertEqual(self.cache.get(self.key), None)
+        self.cache.set(self.key, {'auth_token': 'token', 'expires': None})
+        self.assertEqual(self.cache.get(self.key),
+                         {'auth_token': 'token', 'expires': None})
+        self.cache.delete(self.key)
+        self.assertEqual(self.cache.get(self.key), None)
+
+    def test_permissions(self):
+        self.cache.set(self.key, {'auth_token': 'token', 'expires': None})
+        path = os.path.join(self.cache.cache_dir, self.key)
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0600)
+        self.assertEqual(stat.S_IMODE(os.stat(self.cache.cache_dir).st_mode),
+                         0700)
+
+    def test_expired(self):
+        self.cache.set(self.key, {'auth_token': 'token', 'expires': 100})
+        with mock.patch('time.time', mock.Mock(return_value=200)):
+            self.assertEqual(self.cache.get(self.key), None)
+        self.assertFalse(os.path.exists(
+            os.path.join(self.cache.cache_dir, self.key)))
+
+    def test_keys_differ_per_tenant(self):
+        self.assertNotEqual(self.key,
+                            self.cache.make_key('http://auth/v2.0', 'user',
+                                                'other'))
+
+    def test_client_skips_authentication(self):
+        def get_client():
+            return client.HTTPClient("username", "password", "project_id",
+                                     "http://auth/v2.0",
+                                     auth_cache=self.cache)
+
+        cl = get_client()
+        cl.auth_token = "token"
+        cl.management_url = "http://example.com"
+        cl._save_auth_cache()
+
+        mock_request = mock.Mock()
+
+        @mock.patch.object(httplib2.Http, "request", mock_request)
+        def test_auth_call():
+            cl = get_client()
+            cl.authenticate()
+            self.assertEqual(cl.auth_token, "token")
+            self.assertEqual(cl.management_url, "http://example.com")
+
+        test_auth_call()
+        self.assertFalse(mock_request.called)
@@ -46,3 +46,37 @@ class BaseTest(utils.TestCase):
         self.assertRaises(exceptions.NotFound,
                           cs.volumes.find,
                           vegetable='carrot')
+
+    def test_compact_resource(self):
+        Compact = volumes.Volume.compact_class()
+        self.assertTrue(Compact is volumes.Volume.compact_class())
+        self.assertEqual(Compact.__name__, 'Volume')
+
+        info = {'id': 1234, 'status': 'available', 'display_name': 'vol'}
+        v = Compact(None, info, loaded=True)
+        self.assertEqual(v.status, 'available')
+        self.assertEqual(getattr(v, 'display_name'), 'vol')
+        self.assertEqual(getattr(v, 'size', None), None)
+        self.assertTrue(v._info is info)
+        self.assertEqual(repr(v), "<Volume: 1234>")
+        self.assertFalse(hasattr(v, '__dict__') and v.__dict__)
+
+        # Compact and regular resources compare the same way
+        self.assertEqual(v, volumes.Volume(None, {'id': 1234}))
+        self.assertEqual(volumes.Volume(None, {'id': 1234}), v)
+        self.assertNotEqual(v, base.Resource(None, {'id': 1234}))
+
+        v.extra = 'spam'
+        self.assertEqual(v.extra, 'spam')
+        self.assertEqual(v._info, info)
+
+    def test_compact_resource_lazy_load(self):
+        compact_cs = fakes.FakeClient()
+        compact_cs.compact_resources = True
+        v = compact_cs.volumes.get('1234')
+        self.assertTrue(isinstance(v, volumes.Volume.compact_class()))
+
+        v = volumes.Volume.compact_class()(compact_cs.volumes, {'id': 1234})
+        self.assertEqual(v.name, 'sample-volume')
+        compact_cs.assert_called('GET', '/volumes/1234')
+        self.assertRaises(AttributeError, getattr, v, 'vegetable')
@@ -16,3 +16,15 @@ class ClientTest(utils.TestCase):
     def test_get_client_class_unknown(self):
         self.assertRaises(cinderclient.exceptions.UnsupportedVersion,
                           cinderclient.client.get_client_class, '0')
+
+    def test_rate_limit_refresh(self):
+        cs = cinderclient.v1.client.Client('user', 'pass', 'project',
+                                           'http://auth',
+                                           rate_limit_refresh=60)
+        self.assertEqual(cs.client.rate_limiter.refresh_interval, 60)
+        self.assertEqual(cs.client.rate_limiter.fetch, cs._fetch_rate_limits)
+
+    def test_no_rate_limit_by_default(self):
+        cs = cinderclient.v1.client.Client('user', 'pass', 'project',
+                                           'http://auth')
+        self.assertEqual(cs.client.rate_limiter, None)
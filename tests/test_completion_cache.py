@@ -0,0 +1,100 @@
+import mock
+import os
+import shutil
+import tempfile
+
+from cinderclient import base
+from cinderclient import completion_cache
+from tests import utils
+
+UUID1 = '8e8ec658-c7b0-4243-bdf8-6f7f2952c0d0'
+UUID2 = '11111111-1111-1111-1111-111111111111'
+
+
+class NamedResource(base.Resource):
+    HUMAN_ID = True
+
+
+class FakeManager(base.Manager):
+    resource_class = NamedResource
+
+
+class FakeAPI(object):
+
+    def __init__(self, cache, body):
+        self.completion_cache = cache
+        self.client = mock.Mock()
+        self.client.get.return_value = (None, body)
+        self.client.post.return_value = (None, body)
+
+
+class CompletionCacheTest(utils.TestCase):
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+        self.cache = completion_cache.CompletionCache(self.base_dir,
+                                                      'user', 'http://url')
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir)
+
+    def test_list_replaces(self):
+        self.cache.record('namedresource', ['old'], [], replace=True)
+        api = FakeAPI(self.cache, {'things': [{'id': UUID1, 'name': 'One'},
+                                              {'id': 42, 'name': 'Two'}]})
+        FakeManager(api)._list('/things', 'things')
+
+        self.assertEqual(self.cache.load('namedresource', 'uuid'), [UUID1])
+        self.assertEqual(self.cache.load('namedresource', 'human_id'),
+                         ['one', 'two'])
+
+    def test_list_iter_replaces_when_done(self):
+        self.cache.record('namedresource', ['old'], [], replace=True)
+        api = FakeAPI(self.cache, {'things': [{'id': UUID1, 'name': 'One'},
+                                              {'id': 42, 'name': 'Two'}]})
+        things = FakeManager(api)._list_iter('/things', 'things',
+                                             cache_completions=True)
+        things.next()
+        self.assertEqual(self.cache.load('namedresource', 'uuid'), ['old'])
+        list(things)
+        self.assertEqual(self.cache.load('namedresource', 'uuid'), [UUID1])
+
+    def test_create_appends(self):
+        self.cache.record('namedresource', [UUID1], ['one'], replace=True)
+        api = FakeAPI(self.cache, {'thing': {'id': UUID2, 'name': 'Two'}})
+        FakeManager(api)._create('/things', {}, 'thing')
+
+        self.assertEqual(self.cache.load('namedresource', 'uuid'),
+                         [UUID1, UUID2])
+        self.assertEqual(self.cache.load('namedresource', 'human_id'),
+                         ['one', 'two'])
+
+    def test_write_to_completion_cache(self):
+        self.cache.record('namedresource', [UUID1], ['one'], replace=True)
+        manager = FakeManager(FakeAPI(self.cache, {}))
+        manager.write_to_completion_cache('uuid', UUID2)
+        manager.write_to_completion_cache('human_id', 'two')
+        manager.write_to_completion_cache('bogus', 'three')
+
+        self.assertEqual(self.cache.load('namedresource', 'uuid'),
+                         [UUID1, UUID2])
+        self.assertEqual(self.cache.load('namedresource', 'human_id'),
+                         ['one', 'two'])
+
+    def test_no_temporary_files_left(self):
+        self.cache.record('volume', [UUID1], ['one'])
+        self.assertEqual(sorted(os.listdir(self.cache.cache_dir)),
+                         ['volume-human-id-cache', 'volume-uuid-cache'])
+
+    def test_unwritable_dir_ignored(self):
+        cache = completion_cache.CompletionCache('/proc/nonexistent')
+        cache.record('volume', [UUID1], ['one'])
+        self.assertEqual(cache.load('volume', 'uuid'), [])
+
+    def test_disabled_touches_no_files(self):
+        api = FakeAPI(None, {'things': [{'id': UUID1, 'name': 'One'}]})
+        with mock.patch('os.makedirs') as makedirs:
+            with mock.patch('tempfile.mkstemp') as mkstemp:
+                FakeManager(api)._list('/things', 'things')
+        self.assertFalse(makedirs.called)
+        self.assertFalse(mkstemp.called)
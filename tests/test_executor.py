@@ -0,0 +1,63 @@
+import threading
+
+from cinderclient import executor
+from tests import utils
+
+
+class ExecutorTest(utils.TestCase):
+
+    def test_submit(self):
+        with executor.Executor(2) as pool:
+            future = pool.submit(lambda x, y: x + y, 1, y=2)
+            self.assertEqual(future.result(), 3)
+            self.assertTrue(future.done())
+            self.assertEqual(future.exception(), None)
+
+    def test_exception(self):
+        def fail():
+            raise ValueError("boom")
+
+        with executor.Executor(2) as pool:
+            future = pool.submit(fail)
+            self.assertRaises(ValueError, future.result)
+            self.assertTrue(isinstance(future.exception(), ValueError))
+
+    def test_map(self):
+        with executor.Executor(3) as pool:
+            self.assertEqual(pool.map(lambda x: x * 2, range(10)),
+                             range(0, 20, 2))
+
+    def test_bounded(self):
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+        release = threading.Event()
+
+        def task():
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            release.wait(1)
+            with lock:
+                running[0] -= 1
+
+        pool = executor.Executor(3)
+        futures = [pool.submit(task) for i in range(10)]
+        release.set()
+        [f.result() for f in futures]
+        pool.shutdown()
+        self.assertTrue(peak[0] <= 3)
+        self.assertEqual(len(pool._workers), 3)
+
+    def test_done_callback(self):
+        done = []
+        with executor.Executor(1) as pool:
+            future = pool.submit(lambda: 42)
+            future.result()
+            future.add_done_callback(lambda f: done.append(f.result()))
+        self.assertEqual(done, [42])
+
+    def test_submit_after_shutdown(self):
+        pool = executor.Executor(1)
+        pool.shutdown()
+        self.assertRaises(RuntimeError, pool.submit, lambda: None)
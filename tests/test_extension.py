@@ -0,0 +1,86 @@
+import os
+import shutil
+import sys
+import tempfile
+
+from cinderclient import extension
+from cinderclient.v1 import client
+from tests import utils
+
+NAME = 'fake_python_cinderclient_ext'
+
+MODULE = """
+from cinderclient import base
+
+
+class FakeManager(base.Manager):
+    pass
+
+
+def do_fake(cs, args):
+    pass
+"""
+
+
+class ExtensionIndexTest(utils.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.ext_dir = os.path.join(self.tmp_dir, 'site-packages')
+        os.mkdir(self.ext_dir)
+        with open(os.path.join(self.ext_dir, NAME + '.py'), 'w') as f:
+            f.write(MODULE)
+        self.index = extension.ExtensionIndex(
+            '1', os.path.join(self.tmp_dir, 'cache', 'extensions.json'))
+
+    def tearDown(self):
+        sys.modules.pop(NAME, None)
+        shutil.rmtree(self.tmp_dir)
+
+    def _save(self):
+        module = extension.load_module('path', NAME, self.ext_dir)
+        ext = extension.Extension(NAME, module, kind='path',
+                                  location=self.ext_dir)
+        self.index.save([self.ext_dir], [ext])
+        del sys.modules[NAME]
+
+    def test_lazy_load(self):
+        self._save()
+        extensions = self.index.load([self.ext_dir])
+        self.assertEqual(len(extensions), 1)
+        ext = extensions[0]
+        self.assertEqual(ext.name, NAME)
+        self.assertEqual(ext.commands, ['do_fake'])
+        self.assertTrue(ext.has_manager)
+        self.assertFalse(NAME in sys.modules)
+
+        self.assertEqual(ext.manager_class.__name__, 'FakeManager')
+        self.assertTrue(NAME in sys.modules)
+
+    def test_invalidated_by_mtime(self):
+        self._save()
+        mtime = os.stat(self.ext_dir).st_mtime
+        os.utime(self.ext_dir, (mtime + 10, mtime + 10))
+        self.assertEqual(self.index.load([self.ext_dir]), None)
+
+    def test_invalidated_by_search_path(self):
+        self._save()
+        self.assertEqual(self.index.load([self.ext_dir, self.tmp_dir]), None)
+
+    def test_missing_or_corrupt(self):
+        self.assertEqual(self.index.load([self.ext_dir]), None)
+        os.mkdir(os.path.dirname(self.index.path))
+        with open(self.index.path, 'w') as f:
+            f.write('{"extensions": ')
+        self.assertEqual(self.index.load([self.ext_dir]), None)
+
+    def test_client_manager_created_on_use(self):
+        self._save()
+        extensions = self.index.load([self.ext_dir])
+        cs = client.Client("user", "password", "project_id", "auth_url",
+                           extensions=extensions)
+        self.assertFalse(NAME in sys.modules)
+        manager = getattr(cs, NAME)
+        self.assertEqual(manager.__class__.__name__, 'FakeManager')
+        self.assertTrue(getattr(cs, NAME) is manager)
+        self.assertRaises(AttributeError, getattr, cs, 'vegetables')
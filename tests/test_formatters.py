@@ -0,0 +1,78 @@
+import cStringIO
+import json
+import mock
+import sys
+
+from cinderclient import formatters
+from cinderclient import utils
+from tests import utils as test_utils
+
+
+FIELDS = ['ID', 'Status', 'Size']
+ROWS = [['b', 'available', 1], ['a', 'in-use', None], ['c', u'\xe9t\xe9', 3]]
+
+
+class FormattersTest(test_utils.TestCase):
+
+    def _write(self, output_format, rows=ROWS, **kwargs):
+        stream = cStringIO.StringIO()
+        formatters.write(rows, FIELDS, output_format, stream, **kwargs)
+        return stream.getvalue()
+
+    def test_json(self):
+        lines = self._write('json').splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[1]),
+                         {'ID': 'a', 'Status': 'in-use', 'Size': None})
+
+    def test_csv(self):
+        self.assertEqual(self._write('csv'),
+                         'ID,Status,Size\r\n'
+                         'b,available,1\r\n'
+                         'a,in-use,\r\n'
+                         'c,\xc3\xa9t\xc3\xa9,3\r\n')
+
+    def test_fixed(self):
+        self.assertEqual(self._write('fixed', sample_size=1),
+                         '+----+-----------+------+\n'
+                         '| ID | Status    | Size |\n'
+                         '+----+-----------+------+\n'
+                         '| b  | available | 1    |\n'
+                         '| a  | in-use    |      |\n'
+                         '| c  | \xc3\xa9t\xc3\xa9       | 3    |\n'
+                         '+----+-----------+------+\n')
+
+    def test_fixed_truncates(self):
+        out = self._write('fixed', widths=[2, 6, 4])
+        self.assertTrue('| b  | ava... | 1    |' in out)
+
+    def test_sort(self):
+        out = self._write('csv', sort=True).splitlines()
+        self.assertEqual([line[0] for line in out[1:]], ['a', 'b', 'c'])
+
+    def test_unknown_format(self):
+        self.assertRaises(ValueError, self._write, 'yaml')
+
+    def test_sorted_rows_spills(self):
+        rows = [[i % 7, i] for i in range(50)]
+        result = list(formatters.sorted_rows(iter(rows), chunk_size=8))
+        self.assertEqual(result, sorted(rows))
+
+    def test_sorted_rows_is_lazy_on_input(self):
+        def rows():
+            yield ['b']
+            yield ['a']
+        self.assertEqual(list(formatters.sorted_rows(rows())),
+                         [['a'], ['b']])
+
+    def test_print_list_streaming(self):
+        class Obj(object):
+            id = 'x'
+            status = 'available'
+            size = 2
+
+        with mock.patch('sys.stdout', cStringIO.StringIO()):
+            utils.print_list([Obj()], FIELDS, output_format='json')
+            out = sys.stdout.getvalue()
+        self.assertEqual(json.loads(out),
+                         {'ID': 'x', 'Status': 'available', 'Size': 2})
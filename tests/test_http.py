@@ -1,5 +1,8 @@
 import httplib2
 import mock
+import socket
+import threading
+import time
 
 from cinderclient import client
 from cinderclient import exceptions
@@ -44,6 +47,31 @@ class ClientTest(utils.TestCase):
 
         test_get_call()
 
+    def test_get_stream(self):
+        cl = get_authed_client()
+
+        @mock.patch.object(httplib2.Http, "request", mock_request)
+        def test_get_call():
+            resp, body = cl.get("/hi", stream=True)
+            self.assertEqual(body, fake_body)
+            self.assertFalse('stream' in mock_request.call_args[1])
+
+        test_get_call()
+
+    def test_connection_errors(self):
+        cl = get_authed_client()
+        for error, code in ((socket.error(111, 'Connection refused'), 400),
+                            (socket.timeout('timed out'), 408)):
+            request = mock.Mock(side_effect=error)
+            with mock.patch.object(httplib2.Http, "request", request):
+                try:
+                    cl.get("/hi")
+                except exceptions.ConnectionError, e:
+                    self.assertEqual(e.code, code)
+                    self.assertTrue(e.reason is error)
+                else:
+                    self.fail("ConnectionError not raised")
+
     def test_post(self):
         cl = get_authed_client()
 
@@ -71,3 +99,128 @@ class ClientTest(utils.TestCase):
             self.assertRaises(exceptions.AuthorizationFailure, cl.authenticate)
 
         test_auth_call()
+
+    def test_reauth_on_unauthorized(self):
+        cl = get_authed_client()
+
+        def fake_request(http, url, method, headers=None, **kwargs):
+            if headers["X-Auth-Token"] == "token":
+                return httplib2.Response({"status": 401}), ""
+            return fake_response, fake_body
+
+        def fake_authenticate():
+            cl.auth_token = "new-token"
+
+        @mock.patch.object(httplib2.Http, "request", fake_request)
+        @mock.patch.object(cl, "authenticate", fake_authenticate)
+        def test_reauth_call():
+            resp, body = cl.get("/hi")
+            self.assertEqual(body, {"hi": "there"})
+            self.assertEqual(cl.auth_token, "new-token")
+
+        test_reauth_call()
+
+    def test_single_flight_reauth(self):
+        """N threads hitting an expired token authenticate only once."""
+        cl = get_authed_client()
+        auth_calls = []
+        start = threading.Event()
+
+        def fake_request(http, url, method, headers=None, **kwargs):
+            if headers["X-Auth-Token"] == "token":
+                return httplib2.Response({"status": 401}), ""
+            return fake_response, fake_body
+
+        def fake_authenticate():
+            auth_calls.append(1)
+            # Keep the refresh in flight long enough for the other threads
+            # to pile up behind it.
+            time.sleep(0.05)
+            cl.auth_token = "new-token"
+
+        results = []
+
+        def worker():
+            start.wait()
+            results.append(cl.get("/hi")[1])
+
+        @mock.patch.object(httplib2.Http, "request", fake_request)
+        @mock.patch.object(cl, "authenticate", fake_authenticate)
+        def test_concurrent_calls():
+            threads = [threading.Thread(target=worker) for i in range(32)]
+            for thread in threads:
+                thread.start()
+            start.set()
+            for thread in threads:
+                thread.join()
+
+        test_concurrent_calls()
+        self.assertEqual(len(auth_calls), 1)
+        self.assertEqual(results, [{"hi": "there"}] * 32)
+
+    def test_proactive_token_refresh(self):
+        cl = get_authed_client()
+        cl.token_refresh_margin = 60
+        cl.auth_token_expires = 1000
+        auth_calls = []
+
+        def fake_authenticate():
+            auth_calls.append(1)
+            cl.auth_token = "new-token"
+            cl.auth_token_expires = 5000
+
+        @mock.patch.object(httplib2.Http, "request", mock_request)
+        @mock.patch.object(cl, "authenticate", fake_authenticate)
+        def test_refresh_call():
+            with mock.patch('time.time', mock.Mock(return_value=900)):
+                cl.get("/hi")
+            self.assertEqual(auth_calls, [])
+
+            with mock.patch('time.time', mock.Mock(return_value=950)):
+                cl.get("/hi")
+            self.assertEqual(auth_calls, [1])
+            headers = mock_request.call_args[1]['headers']
+            self.assertEqual(headers['X-Auth-Token'], "new-token")
+
+        test_refresh_call()
+
+    def test_schedule_token_refresh(self):
+        cl = get_authed_client()
+        cl.token_refresh_margin = 60
+        cl.auth_token_expires = 1000
+        timer = mock.Mock()
+
+        @mock.patch('threading.Timer', mock.Mock(return_value=timer))
+        @mock.patch('time.time', mock.Mock(return_value=900))
+        def test_schedule_call():
+            cl._schedule_token_refresh()
+            self.assertEqual(threading.Timer.call_args[0][0], 40)
+            self.assertTrue(timer.start.called)
+
+            cl.auth_token_expires = None
+            cl._schedule_token_refresh()
+            self.assertTrue(timer.cancel.called)
+            self.assertEqual(cl._refresh_timer, None)
+
+        test_schedule_call()
+
+    def test_token_refresh_margin_too_long(self):
+        cl = get_authed_client()
+        cl.token_refresh_margin = 3600
+        timer = mock.Mock()
+
+        @mock.patch('threading.Timer', mock.Mock(return_value=timer))
+        @mock.patch('time.time', mock.Mock(return_value=900))
+        def test_schedule_call():
+            cl.auth_token_expires = 1000
+            cl._schedule_token_refresh()
+            self.assertFalse(threading.Timer.called)
+            self.assertFalse(cl._token_expiring())
+
+            cl.token_refresh_margin = 99
+            cl._schedule_token_refresh()
+            self.assertEqual(threading.Timer.call_args[0][0],
+                             cl.min_token_refresh_delay)
+            self.assertFalse(cl._token_expiring())
+
+        test_schedule_call()
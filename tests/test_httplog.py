@@ -0,0 +1,137 @@
+import httplib2
+import json
+import logging
+import mock
+
+from cinderclient import client
+from cinderclient import httplog
+from tests import utils
+
+
+AUTH_BODY = json.dumps({"auth": {"passwordCredentials": {
+    "username": "user", "password": 's3"cret'}}})
+TOKEN_BODY = json.dumps({"access": {"token": {"expires": "2012",
+                                              "id": "FAKE_ID"}}})
+
+
+class ListHandler(logging.Handler):
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class RedactionTest(utils.TestCase):
+
+    def test_headers(self):
+        headers = {'X-Auth-Token': 'secret', 'Accept': 'application/json'}
+        self.assertEqual(httplog.redact_headers(headers),
+                         {'X-Auth-Token': '***',
+                          'Accept': 'application/json'})
+        self.assertEqual(headers['X-Auth-Token'], 'secret')
+
+    def test_bodies(self):
+        self.assertFalse('cret' in httplog.redact_body(AUTH_BODY))
+        self.assertEqual(json.loads(httplog.redact_body(TOKEN_BODY)),
+                         {"access": {"token": {"expires": "2012",
+                                               "id": "***"}}})
+
+    def test_token_after_nested_object(self):
+        body = json.dumps({"access": {"token": {
+            "expires": "2012", "tenant": {"id": "t1", "name": "demo"},
+            "id": "SECRETTOKEN"}}})
+        redacted = json.loads(httplog.redact_body(body))
+        self.assertEqual(redacted['access']['token']['id'], '***')
+        self.assertEqual(redacted['access']['token']['tenant']['id'], 't1')
+
+    def test_body_not_json(self):
+        body = AUTH_BODY[:-2]
+        self.assertFalse('cret' in httplog.redact_body(body))
+        self.assertEqual(httplog.redact_body('not json'), 'not json')
+
+    def test_truncate(self):
+        self.assertEqual(httplog.truncate('abcdef', 4),
+                         'abcd... (2 more bytes)')
+        self.assertEqual(httplog.truncate('abcdef', None), 'abcdef')
+
+
+class RequestLogTest(utils.TestCase):
+
+    def setUp(self):
+        self.logger = logging.getLogger('tests.httplog')
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self.handler = ListHandler()
+        self.logger.addHandler(self.handler)
+        self.resp = httplib2.Response({'status': 200,
+                                       'x-subject-token': 'tok'})
+        self.args = ('http://example.com/tokens', 'POST')
+        self.kwargs = {'headers': {'X-Auth-Token': 'tok'},
+                       'body': AUTH_BODY}
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+
+    def test_curl_lines(self):
+        httplog.RequestLog(max_body=20).log(self.logger, self.args,
+                                            self.kwargs, self.resp,
+                                            TOKEN_BODY)
+        text = '\n'.join(self.handler.messages)
+        self.assertTrue(text.startswith('REQ: curl -i '
+                                        'http://example.com/tokens -X POST '
+                                        '-H "X-Auth-Token: ***"'))
+        self.assertFalse('tok"' in text)
+        self.assertTrue('more bytes' in text)
+
+    def test_structured(self):
+        httplog.RequestLog(structured=True).log(self.logger, self.args,
+                                                self.kwargs, self.resp,
+                                                TOKEN_BODY)
+        entry = json.loads(self.handler.messages[0])
+        self.assertEqual(entry['status'], 200)
+        self.assertEqual(entry['headers'], {'X-Auth-Token': '***'})
+        self.assertEqual(entry['response_headers']['x-subject-token'], '***')
+        self.assertFalse('FAKE_ID' in entry['response_body'])
+
+    def test_sampling_keeps_errors(self):
+        request_log = httplog.RequestLog(sample_rate=0)
+        request_log.log(self.logger, self.args, self.kwargs, self.resp, None)
+        self.assertEqual(self.handler.messages, [])
+        request_log.log(self.logger, self.args, self.kwargs,
+                        httplib2.Response({'status': 500}), None)
+        self.assertEqual(len(self.handler.messages), 3)
+
+    def test_formatted_when_emitted(self):
+        request_log = httplog.RequestLog()
+        with mock.patch.object(request_log, 'format_request') as fmt:
+            self.logger.removeHandler(self.handler)
+            request_log.log(self.logger, self.args, self.kwargs, self.resp,
+                            None)
+            self.assertFalse(fmt.called)
+
+    def test_queue_handler(self):
+        self.logger.removeHandler(self.handler)
+        queue_handler = httplog.QueueHandler(self.handler, maxsize=10)
+        self.logger.addHandler(queue_handler)
+        try:
+            self.logger.debug("one %s", 1)
+            queue_handler.flush()
+            self.assertEqual(self.handler.messages, ['one 1'])
+        finally:
+            self.logger.removeHandler(queue_handler)
+            queue_handler.close()
+
+
+class HTTPClientLogTest(utils.TestCase):
+
+    def test_http_log_skipped_without_debug(self):
+        cl = client.HTTPClient("username", "password", "project_id",
+                               "auth_test",
+                               request_log=mock.Mock())
+        with mock.patch.object(client._logger, 'isEnabledFor',
+                               return_value=False):
+            cl.http_log(('http://x', 'GET'), {}, None, None)
+        self.assertFalse(cl.request_log.log.called)
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import mock
+
+from tests import utils
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+SCRIPT = """
+import sys
+sys.path.insert(0, %r)
+import cinderclient.v1.client
+cs = cinderclient.v1.client.Client('user', 'password', 'project', 'url')
+print ' '.join(sorted(sys.modules))
+"""
+
+
+class ImportTimeTest(utils.TestCase):
+
+    def _import(self):
+        proc = subprocess.Popen([sys.executable, '-c', SCRIPT % ROOT],
+                                stdout=subprocess.PIPE)
+        out = proc.communicate()[0]
+        self.assertEqual(proc.returncode, 0)
+        return set(out.split())
+
+    def test_heavy_modules_deferred(self):
+        modules = self._import()
+        for name in ('httplib2', 'prettytable', 'uuid', 'argparse',
+                     'cinderclient.shell', 'cinderclient.base',
+                     'cinderclient.v1.volumes'):
+            self.assertFalse(name in modules, "%s was imported" % name)
+
+    def test_manager_imported_on_access(self):
+        from cinderclient.v1 import client
+        from cinderclient.v1 import volumes
+        cs = client.Client('user', 'password', 'project', 'url')
+        self.assertFalse('volumes' in cs.__dict__)
+        self.assertTrue(isinstance(cs.volumes, volumes.VolumeManager))
+        self.assertTrue(cs.volumes is cs.volumes)
+        self.assertRaises(AttributeError, getattr, cs, 'vegetables')
+
+    def test_manager_created_once(self):
+        from cinderclient.v1 import client
+        from cinderclient.v1 import volumes
+        cs = client.Client('user', 'password', 'project', 'url')
+        created = []
+
+        class SlowManager(volumes.VolumeManager):
+            def __init__(self, api):
+                created.append(self)
+                time.sleep(0.01)
+                super(SlowManager, self).__init__(api)
+
+        seen = []
+        with mock.patch.object(volumes, 'VolumeManager', SlowManager):
+            threads = [threading.Thread(target=lambda: seen.append(cs.volumes))
+                       for _i in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(created), 1)
+        self.assertTrue(all(manager is created[0] for manager in seen))
@@ -0,0 +1,147 @@
+import httplib2
+import mock
+import socket
+
+from cinderclient import client
+from cinderclient import exceptions
+from cinderclient import instrumentation
+from cinderclient import retry
+from tests import utils
+
+
+UUID = '8e8ec658-c7b0-4243-bdf8-6f7f2952c0d0'
+
+
+class Recorder(instrumentation.Listener):
+
+    def __init__(self):
+        self.before = []
+        self.after = []
+
+    def before_request(self, event):
+        self.before.append(event)
+
+    def after_request(self, event):
+        self.after.append(event)
+
+
+def get_authed_client(listener):
+    cl = client.HTTPClient("username", "password", "project_id",
+                           "auth_test", listeners=[listener])
+    cl.management_url = "http://example.com/v1/tenant"
+    cl.auth_token = "token"
+    return cl
+
+
+def response(status, body='', **headers):
+    headers['status'] = status
+    return mock.Mock(return_value=(httplib2.Response(headers), body))
+
+
+def event(method='GET', template='/volumes', elapsed=0.0, status=200):
+    event = instrumentation.RequestEvent(method, 'http://x' + template,
+                                         template)
+    event.status = status
+    event.timings['total'] = elapsed
+    return event
+
+
+class TemplateURLTest(utils.TestCase):
+
+    def test_ids_replaced(self):
+        self.assertEqual(
+            instrumentation.template_url(
+                'http://example.com/v1/tenant/volumes/%s/action' % UUID,
+                'http://example.com/v1/tenant'),
+            '/volumes/{id}/action')
+        self.assertEqual(
+            instrumentation.template_url('/snapshots/1234?detail=1'),
+            '/snapshots/{id}')
+
+    def test_outside_base_url(self):
+        self.assertEqual(
+            instrumentation.template_url('http://auth/v2.0/tokens',
+                                         'http://example.com/v1/tenant'),
+            '/v2.0/tokens')
+
+
+class LatencyHistogramTest(utils.TestCase):
+
+    def test_report(self):
+        histogram = instrumentation.LatencyHistogram(bounds=(0.1, 1.0))
+        for elapsed in (0.05, 0.05, 0.5, 3.0):
+            histogram.after_request(event(elapsed=elapsed))
+        histogram.after_request(event('POST', elapsed=0.02, status=413))
+
+        rows = histogram.report()
+        self.assertEqual([(row['method'], row['count'], row['errors'])
+                          for row in rows], [('GET', 4, 0), ('POST', 1, 1)])
+        self.assertEqual(rows[0]['max'], 3.0)
+        self.assertEqual(histogram.percentile('GET', '/volumes', 50), 0.1)
+        self.assertEqual(histogram.percentile('GET', '/volumes', 75), 1.0)
+        self.assertEqual(histogram.percentile('GET', '/volumes', 99), 3.0)
+        self.assertEqual(histogram.percentile('GET', '/nothing', 50), None)
+
+        histogram.reset()
+        self.assertEqual(histogram.report(), [])
+
+
+class HTTPClientListenerTest(utils.TestCase):
+
+    def test_events(self):
+        recorder = Recorder()
+        cl = get_authed_client(recorder)
+        request = response(200, '{"volume": {}}',
+                           **{'x-compute-request-id': 'req-1'})
+        with mock.patch.object(httplib2.Http, "request", request):
+            cl.post("/volumes/%s/action" % UUID, body={'os-reserve': None})
+
+        self.assertEqual(recorder.before, recorder.after)
+        event = recorder.after[0]
+        self.assertEqual(event.method, 'POST')
+        self.assertEqual(event.template, '/volumes/{id}/action')
+        self.assertEqual(event.status, 200)
+        self.assertEqual(event.bytes_out, len('{"os-reserve": null}'))
+        self.assertEqual(event.bytes_in, len('{"volume": {}}'))
+        self.assertEqual(event.request_id, 'req-1')
+        self.assertEqual(event.retry, 0)
+        self.assertEqual(sorted(event.timings), ['connection', 'total'])
+
+    def test_connection_error(self):
+        recorder = Recorder()
+        cl = get_authed_client(recorder)
+        request = mock.Mock(side_effect=socket.error(104, 'reset'))
+        with mock.patch.object(httplib2.Http, "request", request):
+            self.assertRaises(exceptions.ConnectionError, cl.get, "/volumes")
+        self.assertEqual(recorder.after[0].status, None)
+        self.assertTrue(isinstance(recorder.after[0].error, socket.error))
+
+    def test_retries_counted(self):
+        recorder = Recorder()
+        cl = get_authed_client(recorder)
+        cl.retry_policy = retry.RetryPolicy()
+        request = mock.Mock(side_effect=[
+            (httplib2.Response({'status': 503}), ''),
+            (httplib2.Response({'status': 200}), '')])
+        with mock.patch.object(httplib2.Http, "request", request):
+            with mock.patch('time.sleep'):
+                cl.get("/volumes")
+        self.assertEqual([(e.status, e.retry) for e in recorder.after],
+                         [(503, 0), (200, 1)])
+
+    def test_failing_listener_ignored(self):
+        listener = mock.Mock()
+        listener.after_request.side_effect = ValueError()
+        cl = get_authed_client(listener)
+        with mock.patch.object(httplib2.Http, "request", response(404)):
+            self.assertRaises(exceptions.NotFound, cl.get, "/volumes")
+        self.assertTrue(listener.before_request.called)
+
+    def test_remove_listener(self):
+        recorder = Recorder()
+        cl = get_authed_client(recorder)
+        cl.remove_listener(recorder)
+        self.assertEqual(cl.listeners, [])
+        with mock.patch.object(httplib2.Http, "request", response(200)):
+            cl.get("/volumes")
+        self.assertEqual(recorder.after, [])
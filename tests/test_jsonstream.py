@@ -0,0 +1,51 @@
+import json
+import StringIO
+
+from cinderclient import jsonstream
+from tests import utils
+
+
+DOC = json.dumps({
+    'volumes_links': [{'rel': 'next', 'href': 'http://x/volumes?marker=2'}],
+    'volumes': [{'id': 1, 'size': 12345, 'name': u'\xe9t\xe9'},
+                {'id': 2, 'size': 10, 'metadata': {'a': [1, 2]}},
+                3.25],
+    'count': 3,
+})
+
+
+class LoadMemberTest(utils.TestCase):
+
+    def test_string(self):
+        items = jsonstream.load_member(DOC, 'volumes')
+        self.assertEqual(list(items), json.loads(DOC)['volumes'])
+
+    def test_lazy(self):
+        items = jsonstream.load_member(DOC, 'volumes')
+        self.assertEqual(items.next()['id'], 1)
+
+    def test_file_small_chunks(self):
+        for chunk_size in (1, 2, 3, 7):
+            items = jsonstream.load_member(StringIO.StringIO(DOC), 'volumes',
+                                           chunk_size=chunk_size)
+            self.assertEqual(list(items), json.loads(DOC)['volumes'])
+
+    def test_scalar_member(self):
+        self.assertEqual(jsonstream.load_member(DOC, 'count'), 3)
+
+    def test_object_member(self):
+        doc = '{"types": {"values": [1, 2]}}'
+        self.assertEqual(jsonstream.load_member(doc, 'types'),
+                         {'values': [1, 2]})
+
+    def test_empty_array(self):
+        self.assertEqual(list(jsonstream.load_member('{"v": [ ]}', 'v')), [])
+
+    def test_missing_key(self):
+        self.assertRaises(KeyError, jsonstream.load_member, DOC, 'snapshots')
+        self.assertRaises(KeyError, jsonstream.load_member, '{}', 'volumes')
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, jsonstream.load_member, '[]', 'v')
+        items = jsonstream.load_member('{"v": [1, 2', 'v')
+        self.assertRaises(ValueError, list, items)
@@ -0,0 +1,142 @@
+import httplib2
+import mock
+
+from cinderclient import client
+from cinderclient import response_cache
+from tests import utils
+from tests.v1 import fakes
+
+
+def response(status=200, **headers):
+    headers['status'] = status
+    return httplib2.Response(headers)
+
+
+class ResponseCacheTest(utils.TestCase):
+
+    def setUp(self):
+        self.cache = response_cache.ResponseCache()
+        self.now = mock.Mock(return_value=1000.0)
+        self.patcher = mock.patch('time.time', self.now)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_ttl(self):
+        send = mock.Mock(return_value=(response(), {'volume': {'id': 1}}))
+        resp, body = self.cache.get('scope', '/volumes/1', send)
+        resp, body = self.cache.get('scope', '/volumes/1', send)
+        self.assertEqual(body, {'volume': {'id': 1}})
+        self.assertEqual(send.call_count, 1)
+        self.assertEqual(self.cache.hits, 1)
+
+        body['volume']['id'] = 2
+        self.assertEqual(self.cache.get('scope', '/volumes/1', send)[1],
+                         {'volume': {'id': 1}})
+
+        self.now.return_value += 5
+        self.cache.get('scope', '/volumes/1', send)
+        self.assertEqual(send.call_count, 2)
+
+    def test_scope(self):
+        send = mock.Mock(return_value=(response(), {'volume_types': []}))
+        self.cache.get('admin', '/types', send)
+        self.cache.get('demo', '/types', send)
+        self.assertEqual(send.call_count, 2)
+
+    def test_not_cached(self):
+        send = mock.Mock(return_value=(response(), {'volumes': []}))
+        self.cache.get('scope', '/volumes/detail', send)
+        self.cache.get('scope', '/volumes/detail', send)
+        self.assertEqual(send.call_count, 2)
+        self.assertEqual(len(self.cache), 0)
+
+        send.return_value = (response(**{'cache-control': 'no-store'}),
+                             {'volume_types': []})
+        self.cache.get('scope', '/types', send)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_conditional_request(self):
+        send = mock.Mock(return_value=(response(etag='"v1"'),
+                                       '{"volumes": []}'))
+        self.cache.get('scope', '/volumes/detail', send, stream=True)
+
+        send.return_value = (response(304), None)
+        resp, body = self.cache.get('scope', '/volumes/detail', send,
+                                    stream=True)
+        self.assertEqual(body, '{"volumes": []}')
+        self.assertEqual(send.call_args[1],
+                         {'stream': True,
+                          'headers': {'If-None-Match': '"v1"'}})
+        self.assertEqual(self.cache.revalidated, 1)
+
+    def test_lru_eviction(self):
+        self.cache.max_bytes = 45
+        send = mock.Mock(return_value=(response(), '{"volume": {"id": 1}}'))
+        self.cache.get('scope', '/volumes/1', send)
+        self.cache.get('scope', '/volumes/2', send)
+        self.cache.get('scope', '/volumes/1', send)
+        self.cache.get('scope', '/volumes/3', send)
+
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertEqual(sorted(url for scope, url in self.cache._entries),
+                         ['/volumes/1', '/volumes/3'])
+        self.assertEqual(self.cache.size, 2 * len('{"volume": {"id": 1}}'))
+
+    def test_invalidate(self):
+        send = mock.Mock(return_value=(response(), {'x': 1}))
+        for url in ('/volumes/1', '/types', '/limits', '/snapshots/1'):
+            self.cache.get('scope', url, send)
+        self.cache.invalidate('/volumes/1/action')
+        self.assertEqual(sorted(url for scope, url in self.cache._entries),
+                         ['/snapshots/1', '/types'])
+
+
+class ClientResponseCacheTest(utils.TestCase):
+
+    def setUp(self):
+        self.cs = fakes.FakeClient()
+        self.cs.client.response_cache = response_cache.ResponseCache()
+
+    def test_get_cached_until_write(self):
+        self.cs.volumes.get(1234)
+        self.cs.volumes.get(1234)
+        self.assertEqual(len(self.cs.client.callstack), 1)
+
+        self.cs.volumes.reserve(1234)
+        self.cs.volumes.get(1234)
+        self.cs.assert_called('GET', '/volumes/1234')
+        self.assertEqual(len(self.cs.client.callstack), 3)
+
+    def test_quota_defaults(self):
+        first = self.cs.quotas.defaults('test')
+        second = self.cs.quotas.defaults('test')
+        self.assertEqual(first.volumes, second.volumes)
+        self.assertEqual(len(self.cs.client.callstack), 1)
+
+
+class SharedResponseCacheTest(utils.TestCase):
+
+    def test_regions_not_shared(self):
+        def authenticate(cl):
+            cl.management_url = 'http://%s/v1/tenant' % cl.region_name
+            cl.auth_token = 'token'
+
+        cache = response_cache.ResponseCache()
+        clients = [client.HTTPClient('user', 'password', 'project',
+                                     'http://auth/v2.0', region_name=region,
+                                     response_cache=cache)
+                   for region in ('A', 'B')]
+        request = mock.Mock(return_value=(response(), '{"volume_types": []}'))
+        with mock.patch.object(client.HTTPClient, 'authenticate',
+                               authenticate):
+            with mock.patch.object(httplib2.Http, 'request', request):
+                for cl in clients:
+                    cl.get('/types')
+                    cl.get('/types')
+
+        self.assertEqual([call[0][0] for call in request.call_args_list],
+                         ['http://A/v1/tenant/types',
+                          'http://B/v1/tenant/types'])
+        self.assertEqual(cache.hits, 2)
@@ -0,0 +1,155 @@
+import httplib2
+import mock
+import socket
+
+from cinderclient import client
+from cinderclient import exceptions
+from cinderclient import retry
+from cinderclient import transport
+from tests import utils
+from tests.v1 import fakes
+
+
+VOLUME = (200, {'volume': {'id': 1234}})
+
+
+def over_limit(retry_after=None):
+    return exceptions.OverLimit(413, retry_after=retry_after)
+
+
+class RetryTest(utils.TestCase):
+
+    def setUp(self):
+        self.cs = fakes.FakeClient()
+        self.policy = retry.RetryPolicy(max_retries=2)
+        self.cs.client.retry_policy = self.policy
+        self.sleep = mock.patch('time.sleep').start()
+        mock.patch('random.uniform', lambda low, high: high).start()
+
+    def tearDown(self):
+        mock.patch.stopall()
+
+    def fail_then(self, callback, *results):
+        mock.patch.object(fakes.FakeHTTPClient, callback,
+                          mock.Mock(side_effect=results)).start()
+
+    def test_get_retried_with_backoff(self):
+        self.fail_then('get_volumes_1234',
+                       exceptions.ClientException(503),
+                       socket.error(104, 'Connection reset by peer'),
+                       VOLUME)
+        self.cs.volumes.get(1234)
+        self.assertEqual(self.sleep.call_args_list,
+                         [mock.call(0.5), mock.call(1.0)])
+        self.assertEqual(self.policy.metrics.retries, 2)
+        self.assertEqual(self.policy.metrics.reasons,
+                         {503: 1, 'error': 1})
+
+    def test_gives_up_after_max_retries(self):
+        self.fail_then('get_volumes_1234',
+                       *[exceptions.ClientException(503)] * 3)
+        self.assertRaises(exceptions.ClientException,
+                          self.cs.volumes.get, 1234)
+        self.assertEqual(self.policy.metrics.gave_up, 1)
+        self.assertEqual(self.sleep.call_count, 2)
+
+    def test_client_errors_not_retried(self):
+        self.fail_then('get_volumes_1234', exceptions.NotFound(404), VOLUME)
+        self.assertRaises(exceptions.NotFound, self.cs.volumes.get, 1234)
+        self.assertFalse(self.sleep.called)
+
+    def test_retry_after_honored(self):
+        self.fail_then('get_volumes_1234', over_limit(7), VOLUME)
+        self.cs.volumes.get(1234)
+        self.sleep.assert_called_once_with(7)
+
+    def test_retry_after_too_long(self):
+        self.fail_then('get_volumes_1234', over_limit(3600), VOLUME)
+        self.assertRaises(exceptions.OverLimit, self.cs.volumes.get, 1234)
+
+    def test_post_not_retried(self):
+        self.fail_then('post_volumes_1234_action',
+                       exceptions.ClientException(503), (202, None))
+        self.assertRaises(exceptions.ClientException,
+                          self.cs.volumes.reserve, 1234)
+
+    def test_rate_limited_post_retried(self):
+        self.fail_then('post_volumes_1234_action', over_limit(1),
+                       (202, None))
+        self.cs.volumes.reserve(1234)
+        self.sleep.assert_called_once_with(1)
+
+    def test_action_opt_in(self):
+        self.policy.actions = ('os-reserve',)
+        self.fail_then('post_volumes_1234_action',
+                       exceptions.ClientException(503), (202, None),
+                       exceptions.ClientException(503), (202, None))
+        self.cs.volumes.reserve(1234)
+        self.assertRaises(exceptions.ClientException,
+                          self.cs.volumes.unreserve, 1234)
+
+    def test_budget(self):
+        self.policy.budget = retry.RetryBudget(ratio=0.5, reserve=1)
+        self.fail_then('get_volumes_1234',
+                       exceptions.ClientException(503), VOLUME,
+                       exceptions.ClientException(503), VOLUME)
+        self.cs.volumes.get(1234)
+        self.assertRaises(exceptions.ClientException,
+                          self.cs.volumes.get, 1234)
+        self.assertEqual(self.policy.metrics.budget_exhausted, 1)
+
+
+def refused_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+class HTTPClientRetryTest(utils.TestCase):
+
+    def test_connection_refused_retried(self):
+        policy = retry.RetryPolicy(max_retries=2)
+        cl = client.HTTPClient("username", "password", "project_id",
+                               "auth_test", retry_policy=policy,
+                               connection_pool=transport.ConnectionPool())
+        cl.management_url = "http://127.0.0.1:%d/v1" % refused_port()
+        cl.auth_token = "token"
+        with mock.patch('time.sleep') as sleep:
+            self.assertRaises(exceptions.ConnectionError, cl.get, "/volumes")
+        self.assertEqual(sleep.call_count, 2)
+        self.assertEqual(policy.metrics.reasons, {'error': 2})
+
+    def test_request_timeout_retried(self):
+        policy = retry.RetryPolicy(max_retries=1)
+        self.assertEqual(
+            policy.classify(exceptions.ClientException(408), 'GET',
+                            '/volumes', None), 408)
+
+
+class RetryAfterTest(utils.TestCase):
+
+    def test_header(self):
+        resp = httplib2.Response({'status': 413, 'retry-after': '30'})
+        error = exceptions.from_response(resp, None)
+        self.assertEqual(error.retry_after, 30)
+
+    def test_http_date(self):
+        resp = httplib2.Response({'status': 503, 'retry-after':
+                                  'Thu, 01 Jan 1970 00:01:00 GMT'})
+        with mock.patch('time.time', mock.Mock(return_value=20)):
+            error = exceptions.from_response(resp, None)
+        self.assertEqual(error.retry_after, 40)
+
+    def test_body(self):
+        resp = httplib2.Response({'status': 413})
+        body = {'overLimit': {'message': 'slow down', 'retryAfter': '5'}}
+        error = exceptions.from_response(resp, body)
+        self.assertEqual(error.retry_after, 5)
+        self.assertEqual(error.message, 'slow down')
+
+    def test_none(self):
+        error = exceptions.from_response(httplib2.Response({'status': 500}),
+                                         None)
+        self.assertEqual(error.retry_after, None)
@@ -1,3 +1,5 @@
+import copy
+
 from cinderclient import exceptions
 from cinderclient import service_catalog
 from tests import utils
@@ -125,3 +127,48 @@ class ServiceCatalogTest(utils.TestCase):
 
         self.assertRaises(exceptions.EndpointNotFound, sc.url_for,
                           "region", "North", service_type='volume')
+
+    def test_token_expiry(self):
+        sc = service_catalog.ServiceCatalog(SERVICE_CATALOG)
+        # 2010-11-01T03:32:15-05:00 is 08:32:15 UTC
+        self.assertEqual(sc.get_token_expiry(), 1288600335)
+
+        sc = service_catalog.ServiceCatalog({'access': {'token': {}}})
+        self.assertEqual(sc.get_token_expiry(), None)
+
+    def test_catalog_not_modified(self):
+        catalog = copy.deepcopy(SERVICE_CATALOG)
+        sc = service_catalog.ServiceCatalog(catalog)
+        sc.url_for('tenantId', '1', service_type='volume')
+        self.assertEqual(catalog, SERVICE_CATALOG)
+
+    def test_region_and_endpoint_type(self):
+        sc = service_catalog.ServiceCatalog(SERVICE_CATALOG)
+        self.assertRaises(exceptions.AmbiguousEndpoints, sc.url_for,
+                          'region', 'South', service_type='volume',
+                          endpoint_type='internalURL')
+        self.assertRaises(exceptions.EndpointNotFound, sc.url_for,
+                          service_type='volume', endpoint_type='adminURL')
+        self.assertRaises(exceptions.EndpointNotFound, sc.url_for,
+                          service_type='volume',
+                          volume_service_name='Cinder')
+        self.assertRaises(exceptions.AmbiguousEndpoints, sc.url_for,
+                          service_type='volume',
+                          volume_service_name='Nova Volumes')
+
+    def test_get_endpoints(self):
+        sc = service_catalog.ServiceCatalog(SERVICE_CATALOG)
+        self.assertEqual(len(sc.get_endpoints()), 4)
+
+        endpoints = sc.get_endpoints('volume', region='South')
+        self.assertEqual([e.url() for e in endpoints],
+                         ["https://volume1.host/v1/1234",
+                          "https://volume1.host/v1/3456"])
+        self.assertEqual(endpoints[0].service_name, "Nova Volumes")
+        self.assertEqual(endpoints[0]['tenantId'], "1")
+        self.assertRaises(AttributeError, setattr, endpoints[0], 'region',
+                          'North')
+
+        self.assertEqual(sc.get_endpoints('volume', region='North'), [])
+        self.assertEqual(len(sc.get_endpoints(region='North')), 2)
+        self.assertEqual(sc.get_endpoints(endpoint_type='adminURL'), [])
@@ -1,7 +1,9 @@
 import cStringIO
 import os
 import httplib2
+import shutil
 import sys
+import tempfile
 
 from cinderclient import exceptions
 import cinderclient.shell
@@ -13,11 +15,14 @@ class ShellTest(utils.TestCase):
     # Patch os.environ to avoid required auth info.
     def setUp(self):
         global _old_env
+        # NOTE: keep the discovered extensions cache out of $HOME.
+        self.cache_dir = tempfile.mkdtemp()
         fake_env = {
             'OS_USERNAME': 'username',
             'OS_PASSWORD': 'password',
             'OS_TENANT_NAME': 'tenant_name',
             'OS_AUTH_URL': 'http://no.where',
+            'CINDERCLIENT_EXTENSION_CACHE_DIR': self.cache_dir,
         }
         _old_env, os.environ = os.environ, fake_env.copy()
 
@@ -40,6 +45,7 @@ class ShellTest(utils.TestCase):
     def tearDown(self):
         global _old_env
         os.environ = _old_env
+        shutil.rmtree(self.cache_dir)
 
     def test_help_unknown_command(self):
         self.assertRaises(exceptions.CommandError, self.shell, 'help foofoo')
@@ -49,6 +55,16 @@ class ShellTest(utils.TestCase):
         self.shell('--debug help')
         assert httplib2.debuglevel == 1
 
+    def test_os_cache_from_env(self):
+        _shell = cinderclient.shell.OpenStackCinderShell()
+        for value, expected in (('1', True), ('yes', True), ('True', True),
+                                ('0', False), ('false', False), ('no', False),
+                                ('', False)):
+            os.environ['OS_CACHE'] = value
+            parser = _shell.get_base_parser()
+            options, _args = parser.parse_known_args([])
+            self.assertEqual(options.os_cache, expected, value)
+
     def test_help(self):
         required = [
             '^usage: ',
@@ -60,6 +76,23 @@ class ShellTest(utils.TestCase):
             for r in required:
                 self.assertRegexpMatches(help_text, r)
 
+    def test_only_invoked_subcommand_built(self):
+        _shell = cinderclient.shell.OpenStackCinderShell()
+        _shell.extensions = []
+        parser = _shell.get_subcommand_parser('1.1', 'list')
+        self.assertEqual(sorted(_shell.subcommands.keys()),
+                         ['bash_completion', 'list'])
+        self.assertTrue('create' in _shell.commands)
+        args = parser.parse_args(['list', '--status', 'available'])
+        self.assertEqual(args.func, _shell._get_callback('list'))
+        self.assertEqual(args.status, 'available')
+
+        for command in ('help', 'foofoo', None):
+            _shell.get_subcommand_parser('1.1', command)
+            self.assertEqual(sorted(_shell.subcommands.keys()),
+                             sorted(_shell.commands.keys() +
+                                    ['bash_completion']))
+
     def test_help_on_subcommand(self):
         required = [
             '^usage: cinder list',
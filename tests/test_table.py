@@ -0,0 +1,74 @@
+from cinderclient import table
+from tests import utils
+
+
+class FakeTable(table.ResultTable):
+    COLUMNS = (('id', table.TEXT),
+               ('status', table.CATEGORY),
+               ('size', table.INTEGER),
+               ('zone', table.CATEGORY))
+
+
+ROWS = [
+    {'id': 'a', 'status': 'available', 'size': 10, 'zone': 'nova'},
+    {'id': 'b', 'status': 'in-use', 'size': 20, 'zone': 'nova'},
+    {'id': 'c', 'status': 'available', 'size': 30, 'zone': 'east'},
+    {'id': 'd', 'status': 'error', 'zone': 'east', 'ignored': True},
+]
+
+
+class ResultTableTest(utils.TestCase):
+
+    def setUp(self):
+        self.table = FakeTable(ROWS)
+
+    def test_columns(self):
+        self.assertEqual(len(self.table), 4)
+        self.assertEqual(self.table.columns, ['id', 'status', 'size', 'zone'])
+        self.assertEqual(self.table.column('size'), [10, 20, 30, 0])
+        self.assertEqual(self.table.column('status'),
+                         ['available', 'in-use', 'available', 'error'])
+        self.assertEqual(list(self.table)[3],
+                         {'id': 'd', 'status': 'error', 'size': 0,
+                          'zone': 'east'})
+
+    def test_category_values_shared(self):
+        statuses = self.table._columns['status']
+        self.assertEqual(statuses.values, ['available', 'in-use', 'error'])
+        self.assertEqual(list(statuses.data), [0, 1, 0, 2])
+
+    def test_filter(self):
+        available = self.table.filter(status='available')
+        self.assertEqual(available.column('id'), ['a', 'c'])
+
+        big_nova = self.table.filter(zone='nova', size=lambda s: s > 15)
+        self.assertEqual(big_nova.column('id'), ['b'])
+
+        self.assertEqual(len(self.table.filter(status='deleting')), 0)
+        self.assertEqual(len(self.table.filter()), 4)
+
+    def test_sum(self):
+        self.assertEqual(self.table.sum('size'), 60)
+        self.assertRaises(TypeError, self.table.sum, 'status')
+
+    def test_group_by(self):
+        self.assertEqual(self.table.group_by('zone', 'size'),
+                         {'nova': 30, 'east': 30})
+        self.assertEqual(self.table.group_by('status'),
+                         {'available': 2, 'in-use': 1, 'error': 1})
+        self.assertEqual(self.table.filter(zone='east').group_by('status'),
+                         {'available': 1, 'error': 1})
+        self.assertEqual(self.table.group_by('id', 'size'),
+                         {'a': 10, 'b': 20, 'c': 30, 'd': 0})
+        self.assertRaises(TypeError, self.table.group_by, 'zone', 'status')
+
+    def test_to_numpy(self):
+        try:
+            import numpy
+        except ImportError:
+            self.assertRaises(ImportError, self.table.to_numpy)
+            return
+        arrays = self.table.to_numpy()
+        self.assertEqual(arrays['size'].sum(), 60)
+        self.assertEqual(list(arrays['status']),
+                         ['available', 'in-use', 'available', 'error'])
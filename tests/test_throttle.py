@@ -0,0 +1,130 @@
+import httplib2
+import mock
+
+from cinderclient import client
+from cinderclient import exceptions
+from cinderclient import throttle
+from cinderclient.v1 import limits
+from tests import utils
+
+
+def rate_limit(verb, regex, value, remain, unit='MINUTE',
+               next_available='1970-01-01T00:00:00Z'):
+    return limits.RateLimit(verb, '*', regex, value, remain, unit,
+                            next_available)
+
+
+class FakeClock(object):
+
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class ThrottleTest(utils.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.patchers = [mock.patch('time.time', self.clock.time),
+                         mock.patch('time.sleep', self.clock.sleep)]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+
+    def test_bucket_burst_then_paced(self):
+        bucket = throttle.TokenBucket(rate=2, capacity=3)
+        delays = [bucket.reserve() for i in range(5)]
+        self.assertEqual(delays, [0, 0, 0, 0.5, 1.0])
+
+    def test_bucket_refills(self):
+        bucket = throttle.TokenBucket(rate=1, capacity=2, tokens=0)
+        self.clock.now += 10
+        self.assertEqual([bucket.reserve() for i in range(3)], [0, 0, 1.0])
+
+    def test_bucket_not_before(self):
+        bucket = throttle.TokenBucket(rate=1, capacity=5, tokens=0,
+                                      not_before=self.clock.now + 30)
+        self.assertEqual(bucket.reserve(), 30)
+
+    def test_wait_matches_verb_and_regex(self):
+        limiter = throttle.RateLimiter(rate_limits=[
+            rate_limit('POST', '^/volumes', 60, 1),
+            rate_limit('GET', '.*', 120, 100),
+        ])
+        self.assertEqual(limiter.wait('post', '/volumes'), 0)
+        self.assertEqual(limiter.wait('POST', '/snapshots'), 0)
+        self.assertEqual(limiter.wait('POST', '/volumes'), 1.0)
+        self.assertEqual(self.clock.slept, [1.0])
+        self.assertEqual(limiter.wait('GET', '/volumes'), 0)
+        self.assertEqual(limiter.throttled, 1)
+
+    def test_unknown_unit_ignored(self):
+        limiter = throttle.RateLimiter(rate_limits=[
+            rate_limit('POST', '.*', 10, 0, unit='FORTNIGHT')])
+        self.assertEqual(limiter.rules, [])
+
+    def test_exhausted_limit_waits_for_next_available(self):
+        limiter = throttle.RateLimiter(rate_limits=[
+            rate_limit('POST', '.*', 10, 0,
+                       next_available='1970-01-01T00:17:00Z')])
+        self.assertEqual(limiter.wait('POST', '/volumes'), 20)
+
+    def test_refresh(self):
+        fetch = mock.Mock(return_value=[rate_limit('POST', '.*', 60, 5)])
+        limiter = throttle.RateLimiter(fetch, refresh_interval=300)
+        limiter.wait('POST', '/volumes')
+        limiter.wait('POST', '/volumes')
+        self.assertEqual(fetch.call_count, 1)
+
+        self.clock.now += 300
+        limiter.wait('POST', '/volumes')
+        self.assertEqual(fetch.call_count, 2)
+
+        limiter.invalidate()
+        limiter.wait('POST', '/volumes')
+        self.assertEqual(fetch.call_count, 3)
+
+    def test_refresh_failure_keeps_limits(self):
+        limiter = throttle.RateLimiter(
+            mock.Mock(side_effect=exceptions.ClientException(500)),
+            rate_limits=[rate_limit('POST', '.*', 60, 0)])
+        limiter.invalidate()
+        self.assertEqual(limiter.wait('POST', '/volumes'), 1.0)
+
+    def test_http_client_paced(self):
+        cl = client.HTTPClient("username", "password", "project_id",
+                               "auth_test")
+        cl.management_url = "http://example.com"
+        cl.auth_token = "token"
+        cl.rate_limiter = throttle.RateLimiter(rate_limits=[
+            rate_limit('GET', '^/volumes', 60, 1)])
+
+        response = httplib2.Response({"status": 200})
+        with mock.patch.object(httplib2.Http, "request",
+                               mock.Mock(return_value=(response, None))):
+            cl.get("/volumes")
+            cl.get("/volumes")
+        self.assertEqual(self.clock.slept, [1.0])
+
+    def test_http_client_over_limit_invalidates(self):
+        cl = client.HTTPClient("username", "password", "project_id",
+                               "auth_test")
+        cl.management_url = "http://example.com"
+        cl.auth_token = "token"
+        cl.rate_limiter = throttle.RateLimiter(rate_limits=[])
+
+        response = httplib2.Response({"status": 413})
+        with mock.patch.object(httplib2.Http, "request",
+                               mock.Mock(return_value=(response, None))):
+            self.assertRaises(exceptions.OverLimit, cl.get, "/volumes")
+        self.assertEqual(cl.rate_limiter.refreshed_at, None)
@@ -0,0 +1,93 @@
+import httplib2
+import mock
+
+from cinderclient import client
+from cinderclient import transport
+from tests import utils
+
+
+fake_response = httplib2.Response({"status": 200})
+mock_request = mock.Mock(return_value=(fake_response, '{}'))
+
+
+def get_authed_client(pool):
+    cl = client.HTTPClient("username", "password", "project_id",
+                           "auth_test", connection_pool=pool)
+    cl.management_url = "http://example.com"
+    cl.auth_token = "token"
+    return cl
+
+
+class ConnectionPoolTest(utils.TestCase):
+
+    def test_reuse_connection(self):
+        pool = transport.ConnectionPool()
+        key, http = pool.acquire("http://example.com/v1/volumes")
+        pool.release(key, http)
+        key2, http2 = pool.acquire("http://EXAMPLE.com/v1/types")
+        self.assertEqual(key, key2)
+        self.assertTrue(http is http2)
+        stats = pool.get_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_keyed_by_tls_settings(self):
+        pool = transport.ConnectionPool()
+        key, http = pool.acquire("https://example.com", insecure=False)
+        pool.release(key, http)
+        key2, http2 = pool.acquire("https://example.com", insecure=True)
+        self.assertNotEqual(key, key2)
+        self.assertFalse(http is http2)
+        self.assertTrue(http2.disable_ssl_certificate_validation)
+
+    def test_max_per_host(self):
+        pool = transport.ConnectionPool(max_per_host=1)
+        key, http1 = pool.acquire("http://example.com")
+        key, http2 = pool.acquire("http://example.com")
+        pool.release(key, http1)
+        pool.release(key, http2)
+        stats = pool.get_stats()
+        self.assertEqual(stats['idle'], 1)
+        self.assertEqual(stats['evictions'], 1)
+
+    def test_idle_eviction(self):
+        pool = transport.ConnectionPool(idle_timeout=10)
+        with mock.patch('time.time', mock.Mock(return_value=100)):
+            key, http = pool.acquire("http://example.com")
+            pool.release(key, http)
+        with mock.patch('time.time', mock.Mock(return_value=111)):
+            key, http2 = pool.acquire("http://example.com")
+        self.assertFalse(http is http2)
+        stats = pool.get_stats()
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['evictions'], 1)
+
+    def test_failed_connection_not_reused(self):
+        pool = transport.ConnectionPool()
+
+        def use_connection():
+            with pool.connection("http://example.com"):
+                raise ValueError()
+
+        self.assertRaises(ValueError, use_connection)
+        self.assertEqual(pool.get_stats()['idle'], 0)
+
+    def test_shared_between_clients(self):
+        pool = transport.ConnectionPool()
+        cl1 = get_authed_client(pool)
+        cl2 = get_authed_client(pool)
+
+        @mock.patch.object(httplib2.Http, "request", mock_request)
+        def test_get_call():
+            cl1.get("/hi")
+            cl2.get("/hi")
+
+        test_get_call()
+        stats = pool.get_stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 1)
+
+    def test_default_pool(self):
+        cl = client.HTTPClient("username", "password", "project_id",
+                               "auth_test")
+        self.assertTrue(cl.connection_pool is transport.get_default_pool())
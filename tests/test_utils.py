@@ -39,6 +39,7 @@ class FakeManager(base.ManagerWithFind):
         raise exceptions.NotFound(resource_id)
 
     def list(self):
+        self.list_calls += 1
         return self.resources
 
 
@@ -46,6 +47,7 @@ class FindResourceTestCase(test_utils.TestCase):
 
     def setUp(self):
         self.manager = FakeManager(None)
+        self.manager.list_calls = 0
 
     def test_find_none(self):
         self.assertRaises(exceptions.CommandError,
@@ -72,3 +74,58 @@ class FindResourceTestCase(test_utils.TestCase):
     def test_find_by_str_displayname(self):
         output = utils.find_resource(self.manager, 'entity_three')
         self.assertEqual(output, self.manager.get('4242'))
+
+    def test_find_lists_once(self):
+        utils.find_resource(self.manager, 'entity_three')
+        self.assertEqual(self.manager.list_calls, 1)
+        self.assertRaises(exceptions.CommandError,
+                          utils.find_resource,
+                          self.manager,
+                          'asdf')
+        self.assertEqual(self.manager.list_calls, 2)
+
+    def test_find_multiple_matches(self):
+        self.manager.resources = self.manager.resources + [
+            FakeResource('4343', {'display_name': 'entity_three'})]
+        self.assertRaises(exceptions.CommandError,
+                          utils.find_resource,
+                          self.manager,
+                          'entity_three')
+
+    def test_find_non_ascii_name(self):
+        self.manager.resources = self.manager.resources + [
+            FakeResource('7777', {'display_name': u'caf\xe9'})]
+        output = utils.find_resource(self.manager, 'entity_one')
+        self.assertEqual(output, self.manager.get('1234'))
+        for name in (u'caf\xe9', 'caf\xc3\xa9'):
+            output = utils.find_resource(self.manager, name)
+            self.assertEqual(output, self.manager.get('7777'))
+
+
+class ParseIsotimeTestCase(test_utils.TestCase):
+
+    def test_utc(self):
+        self.assertEqual(utils.parse_isotime('2012-10-03T16:58:01Z'),
+                         1349283481)
+
+    def test_fractional_seconds(self):
+        self.assertEqual(utils.parse_isotime('2012-10-03T16:58:01.123456Z'),
+                         1349283481)
+
+    def test_offset(self):
+        self.assertEqual(utils.parse_isotime('2012-10-03T18:58:01+02:00'),
+                         1349283481)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, utils.parse_isotime, '12345')
+
+
+class BoolFromStrTestCase(test_utils.TestCase):
+
+    def test_true(self):
+        for value in ('1', 'true', 'True', 'YES', ' yes ', True):
+            self.assertTrue(utils.bool_from_str(value), value)
+
+    def test_false(self):
+        for value in ('', '0', 'false', 'no', 'off', 'bogus', False):
+            self.assertFalse(utils.bool_from_str(value), value)
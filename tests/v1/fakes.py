@@ -49,6 +49,7 @@ class FakeHTTPClient(base_client.HTTPClient):
         self.username = 'username'
         self.password = 'password'
         self.auth_url = 'auth_url'
+        self.management_url = 'http://localhost:8776/v1/tenant'
         self.callstack = []
 
     def _cs_request(self, url, method, **kwargs):
@@ -90,6 +91,12 @@ class FakeHTTPClient(base_client.HTTPClient):
             _stub_snapshot(),
         ]})
 
+    def get_snapshots_1234(self, **kw):
+        return (200, {'snapshot': _stub_snapshot(id='1234')})
+
+    def delete_snapshots_1234(self, **kw):
+        return (202, None)
+
     #
     # volumes
     #
@@ -145,6 +152,44 @@ class FakeHTTPClient(base_client.HTTPClient):
     def delete_volumes_1234(self, **kw):
         return (202, None)
 
+    #
+    # Volume types
+    #
+
+    def get_types(self, **kw):
+        return (200, {'volume_types': [
+            {'id': 1, 'name': 'standard', 'extra_specs': {}},
+            {'id': 2, 'name': 'ssd', 'extra_specs': {}},
+            {'id': 4, 'name': u'caf\xe9', 'extra_specs': {}},
+        ]})
+
+    def get_types_1(self, **kw):
+        return (200, {'volume_type': {'id': 1, 'name': 'standard',
+                                      'extra_specs': {}}})
+
+    def post_types(self, body, **kw):
+        return (202, {'volume_type': {'id': 3,
+                                      'name': body['volume_type']['name'],
+                                      'extra_specs': {}}})
+
+    def delete_types_1(self, **kw):
+        return (202, None)
+
+    #
+    # Limits
+    #
+
+    def get_limits(self, **kw):
+        return (200, {'limits': {
+            'rate': [],
+            'absolute': {
+                'maxTotalVolumes': 10,
+                'maxTotalVolumeGigabytes': 1000,
+                'totalVolumesUsed': 2,
+                'totalGigabytesUsed': 100,
+            },
+        }})
+
     #
     # Quotas
     #
@@ -0,0 +1,37 @@
+from cinderclient.v1 import async_client
+from cinderclient.v1 import volumes
+from tests import utils
+from tests.v1 import fakes
+
+
+class AsyncClientTest(utils.TestCase):
+
+    def setUp(self):
+        self.cs = fakes.FakeClient()
+        self.async_cs = async_client.AsyncClient(sync_client=self.cs,
+                                                 max_workers=4)
+
+    def tearDown(self):
+        self.async_cs.close()
+
+    def test_get(self):
+        future = self.async_cs.volumes.get('1234')
+        volume = future.result()
+        self.assertTrue(isinstance(volume, volumes.Volume))
+        self.cs.assert_called('GET', '/volumes/1234')
+
+    def test_list(self):
+        vols = self.async_cs.volumes.list().result()
+        self.assertEqual([v.id for v in vols], [1234])
+
+    def test_fan_out(self):
+        futures = [self.async_cs.volumes.get('1234') for i in range(20)]
+        self.assertEqual(set(f.result().id for f in futures), set([1234]))
+
+    def test_errors_propagate(self):
+        future = self.async_cs.volumes.get('5678')
+        self.assertRaises(AssertionError, future.result)
+
+    def test_non_manager_attributes(self):
+        self.assertTrue(self.async_cs.client is self.cs.client)
+        self.assertTrue(self.async_cs.volumes.manager is self.cs.volumes)
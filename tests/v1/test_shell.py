@@ -15,9 +15,16 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import cStringIO
+import mock
 import os
+import shutil
+import sys
+import tempfile
+import urlparse
 
 from cinderclient import client
+from cinderclient import exceptions
 from cinderclient import shell
 from tests.v1 import fakes
 from tests import utils
@@ -29,7 +36,10 @@ class ShellTest(utils.TestCase):
     def setUp(self):
         """Run before each test."""
         self.old_environment = os.environ.copy()
+        # NOTE: keep the discovered extensions cache out of $HOME.
+        self.cache_dir = tempfile.mkdtemp()
         os.environ = {
+            'CINDERCLIENT_EXTENSION_CACHE_DIR': self.cache_dir,
             'CINDER_USERNAME': 'username',
             'CINDER_PASSWORD': 'password',
             'CINDER_PROJECT_ID': 'project_id',
@@ -45,6 +55,7 @@ class ShellTest(utils.TestCase):
 
     def tearDown(self):
         os.environ = self.old_environment
+        shutil.rmtree(self.cache_dir)
         # For some method like test_image_meta_bad_action we are
         # testing a SystemExit to be thrown and object self.shell has
         # no time to get instantatiated which is OK in this case, so
@@ -64,22 +75,76 @@ class ShellTest(utils.TestCase):
     def assert_called_anytime(self, method, url, body=None):
         return self.shell.cs.assert_called_anytime(method, url, body)
 
+    def assert_listed(self, url):
+        """Assert that the listing was paged through from ``url``."""
+        method, called = self.shell.cs.client.callstack[0][0:2]
+        path, query = urlparse.urlsplit(called)[2:4]
+        params = dict(urlparse.parse_qsl(query))
+        self.assertEqual(params.pop('limit'), '1000')
+        self.assertFalse('marker' in params)
+        expected_path, expected_query = urlparse.urlsplit(url)[2:4]
+        self.assertEqual((method, path, params),
+                         ('GET', expected_path,
+                          dict(urlparse.parse_qsl(expected_query))))
+
     def test_list(self):
         self.run_command('list')
         # NOTE(jdg): we default to detail currently
-        self.assert_called('GET', '/volumes/detail')
+        self.assert_listed('/volumes/detail')
+
+    def test_list_format_csv(self):
+        with mock.patch('sys.stdout', cStringIO.StringIO()):
+            self.run_command('--format csv list')
+            out = sys.stdout.getvalue()
+        self.assert_listed('/volumes/detail')
+        self.assertEqual(out.splitlines()[0],
+                         'ID,Status,Display Name,Size,Volume Type,'
+                         'Attached to')
+
+    def test_list_streamed(self):
+        writes = []
+        shell = self.shell
+
+        class Output(object):
+            def write(self, text):
+                writes.append((text, len(shell.cs.client.callstack)))
+
+            def flush(self):
+                pass
+
+        with mock.patch('sys.stdout', Output()):
+            self.run_command('--format csv list')
+        # The row was written before the next page was asked for.
+        rows = [calls for text, calls in writes if text.startswith('1234')]
+        self.assertEqual(rows, [1])
+        self.assertEqual(len(shell.cs.client.callstack), 2)
+
+    def test_format_not_kept(self):
+        with mock.patch('sys.stdout', cStringIO.StringIO()):
+            self.run_command('--format csv list')
+        with mock.patch('sys.stdout', cStringIO.StringIO()):
+            self.run_command('list')
+            out = sys.stdout.getvalue()
+        self.assertTrue(out.startswith('+'))
+
+    def test_show_format_json(self):
+        with mock.patch('sys.stdout', cStringIO.StringIO()):
+            self.run_command('--format json show 1234')
+            out = sys.stdout.getvalue()
+        self.assertTrue('{"Property": "id", "Value": 1234}' in
+                        out.splitlines())
 
     def test_list_filter_status(self):
         self.run_command('list --status=available')
-        self.assert_called('GET', '/volumes/detail?status=available')
+        self.assert_listed('/volumes/detail?status=available')
 
     def test_list_filter_display_name(self):
         self.run_command('list --display-name=1234')
-        self.assert_called('GET', '/volumes/detail?display_name=1234')
+        self.assert_listed('/volumes/detail?display_name=1234')
 
     def test_list_all_tenants(self):
         self.run_command('list --all-tenants=1')
-        self.assert_called('GET', '/volumes/detail?all_tenants=1')
+        self.assert_listed('/volumes/detail?all_tenants=1')
 
     def test_show(self):
         self.run_command('show 1234')
@@ -88,11 +153,24 @@ class ShellTest(utils.TestCase):
     def test_delete(self):
         self.run_command('delete 1234')
 
+    def test_create_volume_type_resolved(self):
+        self.run_command('create 1 --volume-type 2')
+        body = self.shell.cs.client.callstack[-1][2]
+        self.assertEqual(body['volume']['volume_type'], 'ssd')
+        self.assert_called_anytime('GET', '/types')
+        self.assertRaises(exceptions.NotFound, self.run_command,
+                          'create 1 --volume-type gold')
+
+    def test_create_volume_type_non_ascii(self):
+        self.run_command('create 1 --volume-type caf\xc3\xa9')
+        body = self.shell.cs.client.callstack[-1][2]
+        self.assertEqual(body['volume']['volume_type'], u'caf\xe9')
+
     def test_snapshot_list_filter_volume_id(self):
         self.run_command('snapshot-list --volume-id=1234')
-        self.assert_called('GET', '/snapshots/detail?volume_id=1234')
+        self.assert_listed('/snapshots/detail?volume_id=1234')
 
     def test_snapshot_list_filter_status_and_volume_id(self):
         self.run_command('snapshot-list --status=available --volume-id=1234')
-        self.assert_called('GET', '/snapshots/detail?'
+        self.assert_listed('/snapshots/detail?'
                            'status=available&volume_id=1234')
@@ -0,0 +1,41 @@
+from cinderclient.v1 import volume_snapshots
+from tests import utils
+from tests.v1 import fakes
+
+
+cs = fakes.FakeClient()
+
+
+class SnapshotsTest(utils.TestCase):
+
+    def test_list(self):
+        snapshots = cs.volume_snapshots.list()
+        cs.assert_called('GET', '/snapshots/detail')
+        for snapshot in snapshots:
+            self.assertTrue(isinstance(snapshot, volume_snapshots.Snapshot))
+
+    def test_list_as_table(self):
+        snapshots = cs.volume_snapshots.list(as_table=True)
+        cs.assert_called('GET', '/snapshots/detail')
+        self.assertTrue(isinstance(snapshots, volume_snapshots.SnapshotTable))
+        self.assertEqual(snapshots.group_by('status', 'size'),
+                         {'available': 1})
+
+    def test_delete(self):
+        cs.volume_snapshots.delete('1234')
+        cs.assert_called('DELETE', '/snapshots/1234')
+
+    def test_get_many(self):
+        results = cs.volume_snapshots.get_many(['1234', '1234'])
+        self.assertEqual([r.result.id for r in results], ['1234', '1234'])
+
+    def test_delete_many(self):
+        results = cs.volume_snapshots.delete_many(['1234', '9999'],
+                                                  concurrency=1)
+        self.assertTrue(results[0].ok)
+        self.assertFalse(results[1].ok)
+
+    def test_list_iter(self):
+        snapshots = list(cs.volume_snapshots.list_iter(page_size=10))
+        cs.assert_called_anytime('GET', '/snapshots/detail?limit=10')
+        self.assertEqual(len(snapshots), 1)
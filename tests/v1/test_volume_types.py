@@ -0,0 +1,72 @@
+import mock
+
+from cinderclient import exceptions
+from cinderclient import response_cache
+from cinderclient.v1 import volume_types
+from tests import utils
+from tests.v1 import fakes
+
+
+class VolumeTypesTest(utils.TestCase):
+
+    def setUp(self):
+        self.cs = fakes.FakeClient()
+
+    def test_list(self):
+        tl = self.cs.volume_types.list()
+        self.cs.assert_called('GET', '/types')
+        for t in tl:
+            self.assertTrue(isinstance(t, volume_types.VolumeType))
+
+    def test_create(self):
+        t = self.cs.volume_types.create('test-type-3')
+        self.cs.assert_called('POST', '/types',
+                              {'volume_type': {'name': 'test-type-3'}})
+        self.assertTrue(isinstance(t, volume_types.VolumeType))
+
+    def test_delete(self):
+        self.cs.volume_types.delete(1)
+        self.cs.assert_called('DELETE', '/types/1')
+
+    def test_resolve_by_name_and_id(self):
+        manager = self.cs.volume_types
+        self.assertEqual(manager.resolve('ssd').id, 2)
+        self.assertEqual(manager.resolve(1).name, 'standard')
+        self.assertEqual(manager.resolve('2').name, 'ssd')
+        self.assertEqual(manager.resolve(u'caf\xe9').id, 4)
+        self.assertEqual(len(self.cs.client.callstack), 1)
+
+    def test_resolve_unknown_refreshes_once(self):
+        manager = self.cs.volume_types
+        manager.resolve('ssd')
+        self.assertRaises(exceptions.NotFound, manager.resolve, 'gold')
+        self.assertEqual(len(self.cs.client.callstack), 2)
+
+    def test_refresh_bypasses_response_cache(self):
+        self.cs.client.response_cache = response_cache.ResponseCache()
+        manager = self.cs.volume_types
+        manager.resolve('ssd')
+        self.assertRaises(exceptions.NotFound, manager.resolve, 'gold')
+        self.assertEqual(len(self.cs.client.callstack), 2)
+
+    def test_registry_expires(self):
+        manager = self.cs.volume_types
+        with mock.patch('time.time', mock.Mock(return_value=1000)):
+            manager.resolve('ssd')
+        with mock.patch('time.time', mock.Mock(return_value=1299)):
+            manager.resolve('ssd')
+        self.assertEqual(len(self.cs.client.callstack), 1)
+        with mock.patch('time.time', mock.Mock(return_value=1300)):
+            manager.resolve('ssd')
+        self.assertEqual(len(self.cs.client.callstack), 2)
+
+    def test_writes_invalidate(self):
+        manager = self.cs.volume_types
+        manager.resolve('ssd')
+        manager.create('gold')
+        manager.resolve('ssd')
+        self.cs.assert_called('GET', '/types')
+        manager.delete(1)
+        manager.resolve('ssd')
+        self.cs.assert_called('GET', '/types')
+        self.assertEqual(len(self.cs.client.callstack), 5)
@@ -1,3 +1,8 @@
+import httplib2
+import mock
+import urlparse
+
+from cinderclient import exceptions
 from cinderclient.v1 import volumes
 from tests import utils
 from tests.v1 import fakes
@@ -17,6 +22,17 @@ class VolumesTest(utils.TestCase):
         cs.volumes.delete(v)
         cs.assert_called('DELETE', '/volumes/1234')
 
+    def test_build_index_filters_by_name(self):
+        index = cs.volumes.build_index('sample-volume')
+        cs.assert_called('GET', '/volumes/detail?display_name=sample-volume')
+        self.assertEqual([v.id for v in index.lookup('id', '1234')], [1234])
+
+    def test_list_as_table(self):
+        vols = cs.volumes.list(search_opts={'all_tenants': 1}, as_table=True)
+        cs.assert_called('GET', '/volumes/detail?all_tenants=1')
+        self.assertTrue(isinstance(vols, volumes.VolumeTable))
+        self.assertEqual(vols.column('id'), [1234])
+
     def test_create_keypair(self):
         kp = cs.volumes.create(1)
         cs.assert_called('POST', '/volumes')
@@ -60,3 +76,199 @@ class VolumesTest(utils.TestCase):
         v = cs.volumes.get('1234')
         cs.volumes.terminate_connection(v, {})
         cs.assert_called('POST', '/volumes/1234/action')
+
+    def test_get_many(self):
+        results = cs.volumes.get_many(['1234', '5678'], concurrency=2)
+        self.assertEqual([r.item for r in results], ['1234', '5678'])
+        self.assertTrue(results[0].ok)
+        self.assertEqual(results[0].result.id, 1234)
+        # The unknown volume fails on its own without aborting the batch.
+        self.assertFalse(results[1].ok)
+        self.assertTrue(isinstance(results[1].exception, AssertionError))
+
+    def test_delete_many(self):
+        v = cs.volumes.get('1234')
+        results = cs.volumes.delete_many([v, '1234'])
+        self.assertTrue(all(r.ok for r in results))
+        cs.assert_called('DELETE', '/volumes/1234')
+
+    def test_delete_many_empty(self):
+        self.assertEqual(cs.volumes.delete_many([]), [])
+
+    def test_get_many_no_concurrency(self):
+        for concurrency in (0, -1):
+            self.assertRaises(ValueError, cs.volumes.get_many, ['1234'],
+                              concurrency=concurrency)
+
+    def paged_get(self, urls, max_limit=None):
+        all_volumes = [{'id': str(i), 'status': 'available'}
+                       for i in range(5)]
+
+        def fake_get(url, **kwargs):
+            urls.append(url)
+            query = dict(urlparse.parse_qsl(urlparse.urlsplit(url)[3]))
+            start = 0
+            if 'marker' in query:
+                start = int(query['marker']) + 1
+            limit = min(int(query['limit']), max_limit or 1000)
+            page = all_volumes[start:start + limit]
+            return httplib2.Response({'status': 200}), {'volumes': page}
+        return fake_get
+
+    def test_list_iter_pages(self):
+        urls = []
+        with mock.patch.object(cs.client, 'get', self.paged_get(urls)):
+            vols = cs.volumes.list_iter(search_opts={'status': 'available'},
+                                        page_size=2)
+            self.assertEqual(urls, [])
+            self.assertEqual([v.id for v in vols], ['0', '1', '2', '3', '4'])
+
+        self.assertEqual(len(urls), 4)
+        self.assertTrue(urls[0].startswith('/volumes/detail?'))
+        self.assertTrue('status=available' in urls[1])
+        self.assertTrue('marker=1' in urls[1])
+        self.assertTrue('marker=3' in urls[2])
+        self.assertTrue('marker=4' in urls[3])
+
+    def test_list_iter_limit_capped_by_server(self):
+        urls = []
+        with mock.patch.object(cs.client, 'get',
+                               self.paged_get(urls, max_limit=2)):
+            vols = list(cs.volumes.list_iter(page_size=3))
+        self.assertEqual([v.id for v in vols], ['0', '1', '2', '3', '4'])
+        self.assertEqual(len(urls), 4)
+
+    def test_list_iter_marker_ignored(self):
+        def fake_get(url, **kwargs):
+            page = [{'id': '0'}, {'id': '1'}]
+            return httplib2.Response({'status': 200}), {'volumes': page}
+
+        with mock.patch.object(cs.client, 'get', fake_get):
+            vols = list(cs.volumes.list_iter(page_size=2))
+        self.assertEqual([v.id for v in vols], ['0', '1'])
+
+
+class CreateManyTest(utils.TestCase):
+
+    def setUp(self):
+        self.cs = fakes.FakeClient()
+        self.statuses = {'vol-a': 'available', 'vol-b': 'error'}
+
+        def post_volumes(client, body, **kw):
+            name = body['volume']['display_name']
+            if name == 'bad':
+                raise exceptions.BadRequest(400)
+            return (202, {'volume': {'id': 'vol-%s' % name,
+                                     'status': 'creating'}})
+
+        def get_volumes_detail(client, **kw):
+            return (200, {'volumes': [{'id': id, 'status': status}
+                                      for id, status in
+                                      self.statuses.items()]})
+
+        self.patchers = [
+            mock.patch.object(fakes.FakeHTTPClient, 'post_volumes',
+                              post_volumes),
+            mock.patch.object(fakes.FakeHTTPClient, 'get_volumes_detail',
+                              get_volumes_detail),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+
+    def test_quota_available(self):
+        self.assertEqual(self.cs.volumes.quota_available(),
+                         {'volumes': 8, 'gigabytes': 900})
+        self.cs.client.tenant_id = 'test'
+        self.assertEqual(self.cs.volumes.quota_available(),
+                         {'volumes': 0, 'gigabytes': 0})
+        self.cs.assert_called('GET', '/os-quota-sets/test')
+
+    def test_quota_of_other_tenant_refused(self):
+        self.cs.client.tenant_id = 'test'
+        self.assertRaises(ValueError, self.cs.volumes.quota_available,
+                          'other')
+        self.assertRaises(ValueError, self.cs.volumes.create_many,
+                          [{'size': 1}], tenant_id='other')
+
+    def test_quota_exceeded(self):
+        specs = [{'size': 500, 'display_name': 'a'},
+                 {'size': 500, 'display_name': 'b'}]
+        try:
+            self.cs.volumes.create_many(specs)
+        except exceptions.QuotaExceeded, e:
+            self.assertEqual(e.requested, {'volumes': 2, 'gigabytes': 1000})
+            self.assertEqual(str(e), "Quota exceeded (gigabytes: 1000 "
+                                     "requested, 900 available)")
+        else:
+            self.fail("QuotaExceeded not raised")
+        self.cs.assert_called('GET', '/limits')
+
+    def test_unknown_volume_type(self):
+        self.assertRaises(exceptions.NotFound, self.cs.volumes.create_many,
+                          [{'size': 1, 'volume_type': 'gold'}])
+        self.assertFalse(('POST', '/volumes', mock.ANY) in
+                         self.cs.client.callstack)
+
+    def test_report(self):
+        specs = [{'size': 1, 'display_name': 'a', 'volume_type': 'ssd'},
+                 {'size': 1, 'display_name': 'bad'},
+                 {'size': 2, 'display_name': 'b'}]
+        results = self.cs.volumes.create_many(specs, concurrency=2)
+        self.assertEqual([r.item for r in results], specs)
+        self.assertEqual([r.ok for r in results], [True, False, True])
+        self.assertEqual(results[0].result.id, 'vol-a')
+        self.assertTrue(isinstance(results[1].exception,
+                                   exceptions.BadRequest))
+        self.assertTrue(all(r.elapsed >= 0 for r in results))
+        self.assertEqual(results[0].status, None)
+
+    def test_volume_type_id_sent_as_name(self):
+        results = self.cs.volumes.create_many(
+            [{'size': 1, 'display_name': 'a', 'volume_type': 2}])
+        self.assertEqual(results[0].item['volume_type'], 'ssd')
+        body = [c[2] for c in self.cs.client.callstack if c[0] == 'POST']
+        self.assertEqual(body[0]['volume']['volume_type'], 'ssd')
+
+    def test_wait_poll_failure(self):
+        self.statuses['vol-c'] = 'creating'
+        failure = exceptions.ClientException(503)
+        specs = [{'size': 1, 'display_name': 'c'}]
+        with mock.patch.object(fakes.FakeHTTPClient, 'get_volumes_detail',
+                               mock.Mock(side_effect=failure)):
+            results = self.cs.volumes.create_many(specs, check_quota=False,
+                                                  wait=True)
+        self.assertEqual(results[0].result.id, 'vol-c')
+        self.assertTrue(results[0].exception is failure)
+        self.assertFalse(results[0].ok)
+
+    def test_wait_vanished(self):
+        specs = [{'size': 1, 'display_name': 'gone'}]
+        results = self.cs.volumes.create_many(specs, check_quota=False,
+                                              wait=True)
+        self.assertEqual(results[0].status, 'deleted')
+        self.assertEqual(results[0].result.id, 'vol-gone')
+        self.assertTrue(isinstance(results[0].exception,
+                                   exceptions.ResourceInErrorState))
+
+    def test_wait(self):
+        self.statuses['vol-c'] = 'creating'
+        specs = [{'size': 1, 'display_name': name}
+                 for name in ('a', 'b', 'c')]
+        with mock.patch('time.sleep'):
+            results = self.cs.volumes.create_many(specs, check_quota=False,
+                                                  wait=True, timeout=0)
+        self.assertEqual([r.status for r in results],
+                         ['available', 'error', None])
+        self.assertEqual([r.ok for r in results], [True, False, False])
+        self.assertTrue(results[0].ready_after >= 0)
+        self.assertTrue(isinstance(results[1].exception,
+                                   exceptions.ResourceInErrorState))
+        self.assertTrue(isinstance(results[2].exception,
+                                   exceptions.WaitTimeout))
+        # One listing: its page, then the one that finds nothing more.
+        self.assertEqual(
+            len([c for c in self.cs.client.callstack if c[0] == 'GET']), 2)
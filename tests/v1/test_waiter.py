@@ -0,0 +1,77 @@
+import mock
+
+from cinderclient import base
+from cinderclient import exceptions
+from cinderclient.v1 import waiter
+from tests import utils
+
+
+class FakeManager(object):
+    """Returns one canned listing per call."""
+
+    def __init__(self, listings):
+        self.listings = listings
+        self.calls = []
+
+    def list(self, search_opts=None):
+        self.calls.append(search_opts)
+        return [base.Resource(self, {'id': id, 'status': status})
+                for id, status in self.listings.pop(0)]
+
+
+@mock.patch('time.sleep', mock.Mock())
+class StatusWaiterTest(utils.TestCase):
+
+    def test_one_listing_per_tick(self):
+        manager = FakeManager([
+            [('1', 'creating'), ('2', 'available'), ('3', 'creating')],
+            [('1', 'available'), ('2', 'available'), ('3', 'error')],
+        ])
+        w = waiter.StatusWaiter(manager, ['1', '2', '3'])
+        events = [(obj.id, status) for obj, status in w.wait()]
+        self.assertEqual(events, [('2', 'available'), ('1', 'available'),
+                                  ('3', 'error')])
+        self.assertEqual(len(manager.calls), 2)
+
+    def test_wait_for_deletion(self):
+        manager = FakeManager([
+            [('1', 'deleting'), ('2', 'deleting')],
+            [('2', 'deleting')],
+            [],
+        ])
+        result = waiter.wait_for_status(manager, ['1', '2'], ('deleted',))
+        self.assertEqual(result, {'1': 'deleted', '2': 'deleted'})
+
+    def test_vanished_is_failure(self):
+        manager = FakeManager([
+            [('1', 'creating'), ('2', 'creating')],
+            [('2', 'available')],
+        ])
+        result = waiter.wait_for_status(manager, ['1', '2'])
+        self.assertEqual(result, {'1': 'deleted', '2': 'available'})
+
+    def test_search_opts_not_filtered_on_status(self):
+        manager = FakeManager([[('1', 'available')]])
+        w = waiter.StatusWaiter(manager, ['1'], error_states=(),
+                                search_opts={'all_tenants': 1})
+        w.wait_all()
+        self.assertEqual(manager.calls, [{'all_tenants': 1}])
+
+    def test_backoff(self):
+        manager = FakeManager([[('1', 'creating')]] * 4 +
+                              [[('1', 'available')]])
+        w = waiter.StatusWaiter(manager, ['1'], poll_period=1, backoff=2,
+                                max_poll_period=5, jitter=0)
+        w.wait_all()
+        delays = [c[0][0] for c in waiter.time.sleep.call_args_list[-4:]]
+        self.assertEqual(delays, [2, 4, 5, 5])
+
+    def test_timeout(self):
+        manager = FakeManager([[('1', 'creating'), ('2', 'available')]])
+        w = waiter.StatusWaiter(manager, ['1', '2'], timeout=0)
+        try:
+            w.wait_all()
+        except exceptions.WaitTimeout, e:
+            self.assertEqual(e.pending, ['1'])
+        else:
+            self.fail("WaitTimeout not raised")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Measure Manager._list over a large volume listing with and without a
+completion cache.
+
+Usage: tools/bench_completion_cache.py [NUM_VOLUMES] [REPEAT]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from cinderclient import completion_cache
+from cinderclient.v1 import volumes
+
+
+class FakeHTTPClient(object):
+
+    def __init__(self, body):
+        self.body = body
+
+    def get(self, url, **kwargs):
+        return None, self.body
+
+
+class FakeAPI(object):
+
+    def __init__(self, body, cache):
+        self.client = FakeHTTPClient(body)
+        self.completion_cache = cache
+
+
+def make_body(count):
+    return {'volumes': [{'id': '%08d-0000-0000-0000-000000000000' % i,
+                         'display_name': 'volume-%d' % i,
+                         'status': 'available',
+                         'size': 1}
+                        for i in xrange(count)]}
+
+
+def timed(manager, repeat):
+    best = None
+    for _i in xrange(repeat):
+        start = time.time()
+        manager._list('/volumes/detail', 'volumes')
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    body = make_body(count)
+
+    base_dir = tempfile.mkdtemp()
+    try:
+        cache = completion_cache.CompletionCache(base_dir, 'bench', 'url')
+        for label, api in (('disabled', FakeAPI(body, None)),
+                           ('enabled', FakeAPI(body, cache))):
+            best = timed(volumes.VolumeManager(api), repeat)
+            print "%-8s volumes=%d best=%.4fs" % (label, count, best)
+    finally:
+        shutil.rmtree(base_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Compare decoding a large /volumes/detail response in full with json.loads
+against the incremental decoder in cinderclient.jsonstream.
+
+Each mode runs in its own process so that peak RSS is measured in
+isolation. Usage: tools/bench_list_decode.py [NUM_VOLUMES]
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from cinderclient import jsonstream
+
+
+def make_body(count):
+    # NOTE: serialise one volume at a time so that building the input
+    # does not itself set the peak RSS high-water mark.
+    volumes = []
+    for i in xrange(count):
+        volumes.append(json.dumps({
+            'id': '%08d-0000-0000-0000-000000000000' % i,
+            'status': 'available',
+            'display_name': 'volume-%d' % i,
+            'display_description': 'benchmark volume %d' % i,
+            'size': i % 100,
+            'volume_type': 'standard',
+            'availability_zone': 'nova',
+            'created_at': '2012-10-03T16:58:01.000000',
+            'snapshot_id': None,
+            'attachments': [],
+            'metadata': {'owner': 'bench', 'index': str(i)},
+        }))
+    return '{"volumes": [%s]}' % ', '.join(volumes)
+
+
+def run(mode, count):
+    body = make_body(count)
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.time()
+    first = None
+    seen = 0
+    if mode == 'full':
+        items = json.loads(body)['volumes']
+    else:
+        items = jsonstream.load_member(body, 'volumes')
+    for item in items:
+        if first is None:
+            first = time.time() - start
+        seen += 1
+    total = time.time() - start
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print "%-8s items=%d first_item=%.4fs total=%.3fs extra_peak_rss=%dKB" % (
+        mode, seen, first, total, peak_rss - base_rss)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    if len(sys.argv) > 2:
+        run(sys.argv[2], count)
+        return
+    for mode in ('full', 'stream'):
+        subprocess.check_call([sys.executable, __file__, str(count), mode])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Compare building regular Volume resources, compact ones and a VolumeTable
+from a large listing: construction time, the time to total the sizes of
+the available volumes, and the memory held.
+
+Each mode runs in its own process so that peak RSS is measured in
+isolation. Usage: tools/bench_resources.py [NUM_VOLUMES]
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from cinderclient.v1 import volumes
+
+
+def make_info(count):
+    return [{'id': '%08d-0000-0000-0000-000000000000' % i,
+             'status': 'available',
+             'display_name': 'volume-%d' % i,
+             'display_description': 'benchmark volume %d' % i,
+             'size': i % 100,
+             'volume_type': 'standard',
+             'availability_zone': 'nova',
+             'created_at': '2012-10-03T16:58:01.000000',
+             'snapshot_id': None,
+             'attachments': [],
+             'metadata': {}} for i in xrange(count)]
+
+
+def run(mode, count):
+    infos = make_info(count)
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.time()
+    if mode == 'table':
+        objs = volumes.VolumeTable(infos)
+    else:
+        cls = volumes.Volume
+        if mode == 'compact':
+            cls = cls.compact_class()
+        objs = [cls(None, info, loaded=True) for info in infos]
+    built = time.time() - start
+    # NOTE: drop the decoded JSON, as the manager would after a listing.
+    del infos
+
+    start = time.time()
+    if mode == 'table':
+        objs.filter(status='available').sum('size')
+    else:
+        sum(obj.size for obj in objs if obj.status == 'available')
+    read = time.time() - start
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print ("%-8s volumes=%d build=%.3fs report=%.3fs extra_peak_rss=%dKB" %
+           (mode, len(objs), built, read, peak_rss - base_rss))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    if len(sys.argv) > 2:
+        run(sys.argv[2], count)
+        return
+    for mode in ('regular', 'compact', 'table'):
+        subprocess.check_call([sys.executable, __file__, str(count), mode])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# Copyright 2012 OpenStack LLC.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""
+Measure the start up of the cinder shell up to the point where the command
+line has been parsed: wall time, modules imported and subparsers built.
+
+Each case runs in a fresh interpreter. Usage:
+    tools/bench_startup.py [REPEAT]
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+CASES = (
+    ('list', ['list']),
+    ('show', ['show', '1234']),
+    ('help', ['help']),
+)
+
+SCRIPT = """
+import sys
+import time
+start = time.time()
+before = len(sys.modules)
+sys.path.insert(0, %(root)r)
+from cinderclient import shell
+s = shell.OpenStackCinderShell()
+parser = s.get_base_parser()
+options, args = parser.parse_known_args(%(argv)r)
+s.extensions = s._discover_extensions(options.os_volume_api_version)
+parser = s.get_subcommand_parser(options.os_volume_api_version,
+                                 args[0] if args else None)
+parser.parse_args(%(argv)r)
+print time.time() - start, len(sys.modules) - before, len(s.subcommands)
+"""
+
+
+def run(argv):
+    out = subprocess.Popen(
+        [sys.executable, '-c', SCRIPT % {'root': ROOT, 'argv': argv}],
+        stdout=subprocess.PIPE).communicate()[0]
+    elapsed, modules, subparsers = out.split()
+    return float(elapsed), int(modules), int(subparsers)
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for label, argv in CASES:
+        results = [run(argv) for _i in xrange(repeat)]
+        best = min(r[0] for r in results)
+        print "%-6s best=%.4fs modules=%d subparsers=%d" % (
+            label, best, results[0][1], results[0][2])
+
+
+if __name__ == '__main__':
+    main()